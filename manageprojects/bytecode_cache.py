@@ -0,0 +1,116 @@
+"""
+    Persistent Jinja bytecode cache for cookiecutter renders.
+
+    The compiled templates are stored by a hash of the template source (plus the template name and
+    the Jinja environment settings) and not by the file path. So the same template file content is
+    compiled only once, independent of the template checkout and shared between processes.
+    Jinja validates the Python/Jinja version of the bytecode itself.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+from pathlib import Path
+
+from cookiecutter.environment import StrictEnvironment
+from jinja2 import Environment
+from jinja2.bccache import Bucket, FileSystemBytecodeCache
+
+from manageprojects.constants import JINJA_BYTECODE_CACHE_MAX_ENTRIES
+from manageprojects.utilities.user_config import get_mp_cache_path
+
+
+logger = logging.getLogger(__name__)
+
+CACHE_FILE_PATTERN = '__jinja2_%s.cache'
+
+
+def get_environment_signature(environment: Environment) -> tuple:
+    """
+    All settings of the Jinja environment that change the compiled code.
+    """
+    return (
+        sorted(f'{type(ext).__module__}.{type(ext).__qualname__}' for ext in environment.extensions.values()),
+        environment.block_start_string,
+        environment.block_end_string,
+        environment.variable_start_string,
+        environment.variable_end_string,
+        environment.comment_start_string,
+        environment.comment_end_string,
+        environment.line_statement_prefix,
+        environment.line_comment_prefix,
+        environment.trim_blocks,
+        environment.lstrip_blocks,
+        environment.newline_sequence,
+        environment.keep_trailing_newline,
+        environment.optimized,
+        repr(environment.autoescape),
+    )
+
+
+class ContentBytecodeCache(FileSystemBytecodeCache):
+    def __init__(self, directory: Path):
+        directory.mkdir(parents=True, exist_ok=True)
+        super().__init__(directory=str(directory), pattern=CACHE_FILE_PATTERN)
+        self.hits = 0
+        self.misses = 0
+
+    def get_bucket(self, environment: Environment, name: str, filename: str | None, source: str) -> Bucket:
+        checksum = self.get_source_checksum(source)
+        key_data = repr((name, checksum, get_environment_signature(environment)))
+        key = hashlib.sha256(key_data.encode('UTF-8')).hexdigest()
+        bucket = Bucket(environment, key, checksum)
+        self.load_bytecode(bucket)
+        return bucket
+
+    def load_bytecode(self, bucket: Bucket) -> None:
+        super().load_bytecode(bucket)
+        if bucket.code is None:
+            self.misses += 1
+            return
+        self.hits += 1
+        try:
+            # Mark as recently used, see: prune()
+            os.utime(self._get_cache_filename(bucket))
+        except OSError:
+            pass
+
+    def prune(self, max_entries: int = JINJA_BYTECODE_CACHE_MAX_ENTRIES) -> None:
+        """
+        Remove the least recently used entries, if the cache contains more than `max_entries`.
+        """
+        entries = []
+        for entry in os.scandir(self.directory):
+            try:
+                entries.append((entry.stat().st_mtime, entry.path))
+            except OSError:
+                pass  # Removed by a other process in the meantime
+        if len(entries) <= max_entries:
+            return
+        entries.sort()
+        remove_count = len(entries) - max_entries
+        logger.info('Remove %i old entries from Jinja bytecode cache', remove_count)
+        for _mtime, path in entries[:remove_count]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def get_bytecode_cache() -> ContentBytecodeCache:
+    return ContentBytecodeCache(directory=get_mp_cache_path() / 'jinja_bytecode')
+
+
+class BytecodeCacheEnvironmentFactory:
+    """
+    Replacement of cookiecutter's StrictEnvironment in cookiecutter.generate that uses the bytecode cache.
+    """
+
+    def __init__(self, bytecode_cache: ContentBytecodeCache):
+        self.bytecode_cache = bytecode_cache
+
+    def __call__(self, **kwargs) -> StrictEnvironment:
+        kwargs.setdefault('bytecode_cache', self.bytecode_cache)
+        return StrictEnvironment(**kwargs)
@@ -9,6 +9,7 @@ import shutil
 import subprocess
 import sys
 from pathlib import Path
+from typing import Any
 
 import rich_click as click
 from bx_py_utils.path import assert_is_dir
@@ -17,12 +18,15 @@ from cli_base.cli_tools.verbosity import OPTION_KWARGS_VERBOSE
 from cli_base.cli_tools.version_info import print_version
 from rich import print  # noqa
 from rich.console import Console
+from rich.table import Table
 from rich.traceback import install as rich_traceback_install
 from rich_click import RichGroup
 
 import manageprojects
-from manageprojects import constants
+from manageprojects import constants, fleet
 from manageprojects.constants import (
+    DEFAULT_DIFF_ENGINE,
+    DIFF_ENGINES,
     FORMAT_PY_FILE_DARKER_PRE_FIXES,
     FORMAT_PY_FILE_DEFAULT_MAX_LINE_LENGTH,
     FORMAT_PY_FILE_DEFAULT_MIN_PYTON_VERSION,
@@ -35,18 +39,46 @@ from manageprojects.cookiecutter_templates import (
 )
 from manageprojects.data_classes import CookiecutterResult
 from manageprojects.format_file import format_one_file
+from manageprojects.outdated import get_outdated, print_outdated_summary
+from manageprojects.project_index import IndexedProject, ProjectIndex
+from manageprojects.update_plan import UpdatePlan
 from manageprojects.utilities.log_utils import log_config
 
 
 logger = logging.getLogger(__name__)
 
 
-OPTION_ARGS_DEFAULT_TRUE = dict(is_flag=True, show_default=True, default=True)
-OPTION_ARGS_DEFAULT_FALSE = dict(is_flag=True, show_default=True, default=False)
-ARGUMENT_EXISTING_DIR = dict(
+OPTION_ARGS_DEFAULT_TRUE: dict[str, Any] = dict(is_flag=True, show_default=True, default=True)
+OPTION_CACHE: dict[str, Any] = dict(
+    is_flag=True,
+    show_default=True,
+    default=True,
+    help='Reuse cached renders of the same Cookiecutter template revision and context.',
+)
+OPTION_MERGE: dict[str, Any] = dict(
+    is_flag=True,
+    show_default=True,
+    default=False,
+    help=(
+        'Overwrite: Three-way merge files that were changed since the last render,'
+        ' instead of skipping them. Conflict markers are only inserted for overlapping changes.'
+    ),
+)
+OPTION_INCREMENTAL: dict[str, Any] = dict(
+    is_flag=True,
+    show_default=True,
+    default=False,
+    help=(
+        'Render only the template files that changed between the old and new template version.'
+        ' Changes of files that are only used via Jinja "include" are not detected!'
+        ' Templates with hooks are always rendered completely.'
+    ),
+)
+OPTION_ARGS_DEFAULT_FALSE: dict[str, Any] = dict(is_flag=True, show_default=True, default=False)
+ARGUMENT_EXISTING_DIR: dict[str, Any] = dict(
     type=click.Path(exists=True, file_okay=False, dir_okay=True, readable=True, path_type=Path)
 )
-ARGUMENT_NOT_EXISTING_DIR = dict(
+ARGUMENT_NOT_EXISTING_DIR: dict[str, Any] = dict(
     type=click.Path(
         exists=False,
         file_okay=False,
@@ -56,7 +88,7 @@ ARGUMENT_NOT_EXISTING_DIR = dict(
         path_type=Path,
     )
 )
-ARGUMENT_EXISTING_FILE = dict(
+ARGUMENT_EXISTING_FILE: dict[str, Any] = dict(
     type=click.Path(exists=True, file_okay=True, dir_okay=False, readable=True, path_type=Path)
 )
 
@@ -195,6 +227,35 @@ cli.add_command(start_project)
     **OPTION_ARGS_DEFAULT_TRUE,
     help='Cleanup created temporary files',
 )
+@click.option(
+    '--diff-engine',
+    type=click.Choice(DIFF_ENGINES),
+    default=DEFAULT_DIFF_ENGINE,
+    show_default=True,
+    help=(
+        'How to create the patch between the old and new template version:'
+        ' "git" diffs both versions as tree objects in a temporary git repository'
+        ' or reuses the render of the old version that is stored in the project repository,'
+        ' "in-process" compares both trees without git and always renders both versions.'
+    ),
+)
+@click.option('--cache/--no-cache', **OPTION_CACHE)
+@click.option('--incremental/--no-incremental', **OPTION_INCREMENTAL)
+@click.option('--merge/--no-merge', **OPTION_MERGE)
+@click.option(
+    '--plan/--no-plan',
+    **OPTION_ARGS_DEFAULT_FALSE,
+    help=(
+        'Do not change the project: Print the added, removed and modified files, the changed lines'
+        ' and the files that the update patch will not apply cleanly to.'
+    ),
+)
+@click.option(
+    '--plan-json',
+    default=None,
+    type=click.Path(dir_okay=False, writable=True, path_type=Path),
+    help='Write the update plan as JSON into this file. (Implies --plan)',
+)
 def update_project(
     project_path: Path,
     overwrite: bool,
@@ -202,6 +263,12 @@ def update_project(
     config_file: Path | None,
     input: bool,
     cleanup: bool,
+    diff_engine: str,
+    cache: bool,
+    incremental: bool,
+    merge: bool,
+    plan: bool,
+    plan_json: Path | None,
 ):
     """
     Update a existing project.
@@ -209,23 +276,224 @@ def update_project(
     e.g. update by overwrite (and merge changes manually via git):
 
     ./cli.py update-project ~/foo/bar/
+
+    e.g. show the update plan, without changing the project:
+
+    ./cli.py update-project --plan ~/foo/bar/
     """
     log_config()
-    print(f'Update project: "{project_path}"...')
-    update_managed_project(
+    update_kwargs: dict[str, Any] = dict(
         project_path=project_path,
         overwrite=overwrite,
         password=password,
         config_file=config_file,
         cleanup=cleanup,
         input=input,
+        diff_engine=diff_engine,
+        use_cache=cache,
+        incremental=incremental,
+        merge=merge,
     )
+    if plan or plan_json:
+        print(f'Plan update of project: "{project_path}"...')
+        update_plan = update_managed_project(**update_kwargs, plan=True)
+        if not update_plan:
+            print(f'Managed project "{project_path}" is up-to-date, ok.')
+            return
+        assert isinstance(update_plan, UpdatePlan), f'{update_plan=}'
+        update_plan.print_report()
+        if plan_json:
+            update_plan.write_json(plan_json)
+        return
+
+    print(f'Update project: "{project_path}"...')
+    update_managed_project(**update_kwargs)
     print(f'Managed project "{project_path}" updated, ok.')
 
 
 cli.add_command(update_project)
 
 
+@click.command()
+@click.argument('project_paths', nargs=-1, **ARGUMENT_EXISTING_DIR)
+@click.option(
+    '--root',
+    default=None,
+    type=click.Path(exists=True, file_okay=False, dir_okay=True, readable=True, path_type=Path),
+    help='Search for all managed projects below this directory and update them, too.',
+)
+@click.option(
+    '--jobs',
+    default=constants.FLEET_DEFAULT_JOBS,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help='Number of projects that will be updated at the same time.',
+)
+@click.option(
+    '--overwrite/--no-overwrite',
+    **OPTION_ARGS_DEFAULT_FALSE,
+    help='Overwrite all Cookiecutter template files instead of applying git patches.',
+)
+@click.option(
+    '--password',
+    default=None,
+    help='Cookiecutter Option: Password to use when extracting the repository',
+)
+@click.option(
+    '--config-file',
+    default=None,
+    type=click.Path(exists=True, file_okay=True, dir_okay=False, readable=True),
+    help='Cookiecutter Option: Optional path to "cookiecutter_config.yaml"',
+)
+@click.option(
+    '--cleanup/--no-cleanup',
+    **OPTION_ARGS_DEFAULT_TRUE,
+    help='Cleanup created temporary files',
+)
+@click.option(
+    '--diff-engine',
+    type=click.Choice(DIFF_ENGINES),
+    default=DEFAULT_DIFF_ENGINE,
+    show_default=True,
+    help='How to create the patch between the old and new template version.',
+)
+@click.option('--cache/--no-cache', **OPTION_CACHE)
+@click.option('--incremental/--no-incremental', **OPTION_INCREMENTAL)
+@click.option('--merge/--no-merge', **OPTION_MERGE)
+def update_fleet(
+    project_paths: tuple[Path, ...],
+    root: Path | None,
+    jobs: int,
+    overwrite: bool,
+    password: str | None,
+    config_file: Path | None,
+    cleanup: bool,
+    diff_engine: str,
+    cache: bool,
+    incremental: bool,
+    merge: bool,
+):
+    """
+    Update many managed projects in parallel.
+    The projects are grouped by template, template directory and last applied template revision.
+
+    e.g.:
+
+    ./cli.py update-fleet --root ~/projects/
+    """
+    log_config()
+    project_paths = list(project_paths)
+    if root:
+        project_paths += fleet.find_managed_projects(root)
+    project_paths = list(dict.fromkeys(path.resolve() for path in project_paths))  # Remove duplicates
+    if not project_paths:
+        print('No managed projects given or found, nothing to do.')
+        return
+
+    print(f'Update {len(project_paths)} managed projects with {jobs} jobs...')
+    results = fleet.update_fleet(
+        project_paths,
+        jobs=jobs,
+        overwrite=overwrite,
+        password=password,
+        config_file=config_file,
+        cleanup=cleanup,
+        diff_engine=diff_engine,
+        use_cache=cache,
+        incremental=incremental,
+        merge=merge,
+    )
+    fleet.print_fleet_summary(results)
+    if any(result.status == constants.FLEET_STATUS_FAILED for result in results):
+        sys.exit(1)
+
+
+cli.add_command(update_fleet)
+
+
+@click.command()
+@click.argument('root', **ARGUMENT_EXISTING_DIR)
+@click.option('--template', default=None, help='Only list projects created from this Cookiecutter template.')
+def list_projects(root: Path, template: str | None):
+    """
+    Scan for managed projects below ROOT, update the project index and list the projects.
+
+    e.g.:
+
+    ./cli.py list-projects ~/projects/
+    """
+    log_config()
+    with ProjectIndex() as project_index:
+        project_index.scan(root)
+        indexed_projects = project_index.get_projects(root_path=root, template=template)
+
+    table = Table(title=f'Managed projects in {root}')
+    table.add_column('Project')
+    table.add_column('Template')
+    table.add_column('Directory')
+    table.add_column('Last revision')
+    for indexed_project in indexed_projects:
+        table.add_row(
+            str(indexed_project.project_path),
+            indexed_project.cookiecutter_template,
+            indexed_project.cookiecutter_directory or '',
+            indexed_project.last_revision,
+        )
+    print(table)
+
+
+cli.add_command(list_projects)
+
+
+@click.command()
+@click.argument('project_paths', nargs=-1, **ARGUMENT_EXISTING_DIR)
+@click.option(
+    '--root',
+    default=None,
+    type=click.Path(exists=True, file_okay=False, dir_okay=True, readable=True, path_type=Path),
+    help='Check all managed projects below this directory (via the project index), too.',
+)
+@click.option(
+    '--password',
+    default=None,
+    help='Cookiecutter Option: Password to use when extracting the repository',
+)
+@click.option(
+    '--config-file',
+    default=None,
+    type=click.Path(exists=True, file_okay=True, dir_okay=False, readable=True),
+    help='Cookiecutter Option: Optional path to "cookiecutter_config.yaml"',
+)
+def outdated(project_paths: tuple[Path, ...], root: Path | None, password: str | None, config_file: Path | None):
+    """
+    List managed projects that are behind their Cookiecutter template,
+    with the number of changed template files. Nothing will be rendered.
+
+    e.g.:
+
+    ./cli.py outdated --root ~/projects/
+    """
+    log_config()
+    indexed_projects = []
+    for project_path in project_paths:
+        if indexed_project := IndexedProject.from_project_path(project_path.resolve()):
+            indexed_projects.append(indexed_project)
+        else:
+            print(f'[yellow]Skip {project_path}: Not a managed project')
+    if root:
+        with ProjectIndex() as project_index:
+            indexed_projects += project_index.scan(root)
+    if not indexed_projects:
+        print('No managed projects given or found, nothing to do.')
+        return
+
+    results = get_outdated(indexed_projects, password=password, config_file=config_file)
+    print_outdated_summary(results)
+
+
+cli.add_command(outdated)
+
+
 @click.command()
 @click.argument('project_path', **ARGUMENT_EXISTING_DIR)
 @click.argument('output_dir', **ARGUMENT_NOT_EXISTING_DIR)
@@ -245,10 +513,12 @@ cli.add_command(update_project)
     **OPTION_ARGS_DEFAULT_FALSE,
     help=('Cookiecutter Option: Do not prompt for parameters' ' and only use cookiecutter.json file content'),
 )
+@click.option('--cache/--no-cache', **OPTION_CACHE)
 def clone_project(
     project_path: Path,
     output_dir: Path,
     input: bool,
+    cache: bool = True,
     checkout: str | None = None,
     password: str | None = None,
     config_file: Path | None = None,
@@ -269,6 +539,7 @@ def clone_project(
         password=password,
         config_file=config_file,
         input=input,
+        use_cache=cache,
     )
 
 
@@ -283,11 +554,32 @@ cli.add_command(clone_project)
     **OPTION_ARGS_DEFAULT_FALSE,
     help='Overwrite existing files.',
 )
+@click.option(
+    '--jobs',
+    default=1,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help='Number of processes that convert the files.',
+)
+@click.option(
+    '--stats/--no-stats',
+    **OPTION_ARGS_DEFAULT_FALSE,
+    help='Print the top files by time, the top reverse keys by hits and the files without any match.',
+)
+@click.option(
+    '--stats-json',
+    default=None,
+    type=click.Path(dir_okay=False, writable=True, path_type=Path),
+    help='Write the statistics as JSON into this file.',
+)
 @click.option('-v', '--verbosity', **OPTION_KWARGS_VERBOSE)
 def reverse(
     project_path: Path,
     destination: Path,
     overwrite: bool,
+    jobs: int,
+    stats: bool,
+    stats_json: Path | None,
     verbosity: int,
 ):
     """
@@ -303,6 +595,9 @@ def reverse(
         destination=destination,
         overwrite=overwrite,
         verbosity=verbosity,
+        jobs=jobs,
+        print_stats=stats,
+        stats_json_path=stats_json,
     )
 
 
@@ -1,6 +1,9 @@
 """
     CLI for development
 """
+
+from __future__ import annotations
+
 import logging
 import sys
 from pathlib import Path
@@ -19,7 +22,8 @@ from rich_click import RichGroup
 
 import manageprojects
 from manageprojects import constants
-from manageprojects.constants import BASE_PATH
+from manageprojects.constants import BASE_PATH, FILE_LINKS_BENCHMARK_FILES, FILE_LINKS_BENCHMARK_SIZE
+from manageprojects.utilities import file_links_benchmark
 from manageprojects.utilities.publish import publish_package
 
 
@@ -263,6 +267,27 @@ def tox():
 cli.add_command(tox)
 
 
+@click.command()
+@click.option(
+    '--path',
+    default=None,
+    type=click.Path(exists=True, file_okay=False, dir_okay=True, writable=True, path_type=Path),
+    help='Directory on the file system to benchmark. (Default: The temp directory)',
+)
+@click.option('--files', default=FILE_LINKS_BENCHMARK_FILES, show_default=True, type=click.IntRange(min=1))
+@click.option('--size', default=FILE_LINKS_BENCHMARK_SIZE, show_default=True, type=click.IntRange(min=1))
+def benchmark_file_links(path: Path | None, files: int, size: int):
+    """
+    Compare the file copy primitives (read/write, sendfile, copy_file_range, reflink, hardlink)
+    on one file system, e.g.: ext4, btrfs or tmpfs.
+    """
+    results = file_links_benchmark.benchmark_file_links(path, file_count=files, file_size=size)
+    file_links_benchmark.print_benchmark_results(results, file_count=files, file_size=size)
+
+
+cli.add_command(benchmark_file_links)
+
+
 @click.command()
 def version():
     """Print version and exit"""
@@ -11,6 +11,81 @@ COOKIECUTTER_TEMPLATE = 'cookiecutter_template'
 COOKIECUTTER_DIRECTORY = 'cookiecutter_directory'
 COOKIECUTTER_CONTEXT = 'cookiecutter_context'
 
+# How to create the patch between two compiled cookiecutter templates:
+DIFF_ENGINE_GIT = 'git'  # Write both versions as tree objects into a temporary git repository and call "git diff"
+DIFF_ENGINE_IN_PROCESS = 'in-process'  # Compare both trees in Python, see: manageprojects.tree_diff
+DIFF_ENGINES = (DIFF_ENGINE_GIT, DIFF_ENGINE_IN_PROCESS)
+DEFAULT_DIFF_ENGINE = DIFF_ENGINE_GIT
+
+# Limits of the cache of rendered cookiecutter templates, see: manageprojects.render_cache
+RENDER_CACHE_MAX_BYTES = 500 * 1024 * 1024
+RENDER_CACHE_MAX_ENTRIES = 100
+
+# Max. number of compiled templates in the Jinja bytecode cache, see: manageprojects.bytecode_cache
+JINJA_BYTECODE_CACHE_MAX_ENTRIES = 10_000
+
+# Render the files of one template in a process pool, if there are at least this number of files,
+# see: manageprojects.parallel_generate
+GENERATE_PARALLEL_MIN_FILES = 100
+# Number of files that a worker process renders at once
+GENERATE_BATCH_SIZE = 50
+
+# How unrendered template files are created in a render, see: manageprojects.utilities.file_links
+LINK_MODE_COPY = 'copy'
+LINK_MODE_REFLINK = 'reflink'  # Copy-on-write clone, if supported by the file system
+LINK_MODE_HARDLINK = 'hardlink'  # Reflink or hardlink: Only for scratch trees that are not modified
+LINK_MODES = (LINK_MODE_COPY, LINK_MODE_REFLINK, LINK_MODE_HARDLINK)
+
+# Default file count and size of "./dev-cli.py benchmark-file-links",
+# see: manageprojects.utilities.file_links_benchmark
+FILE_LINKS_BENCHMARK_FILES = 200
+FILE_LINKS_BENCHMARK_SIZE = 1024 * 1024
+
+# Rendered file contents are held in memory up to this size, see: manageprojects.virtual_tree
+VIRTUAL_TREE_MAX_MEMORY = 64 * 1024 * 1024
+
+# Fetch the mirror of a remote template only, if the last fetch is older (in seconds),
+# see: manageprojects.template_mirror
+TEMPLATE_MIRROR_TTL = 60 * 60
+
+# Keep only the worktrees of the most recently used commits of a template mirror,
+# see: manageprojects.template_mirror
+TEMPLATE_MIRROR_MAX_WORKTREES = 10
+
+# Blob hashes of the last rendered template files, written by "overwrite", see: manageprojects.render_manifest
+RENDER_MANIFEST_PATH = '.manageprojects/render_manifest.json'
+
+# Staging area of the files written by "overwrite", see: manageprojects.utilities.file_transaction
+TRANSACTION_PATH = '.manageprojects/transaction'
+
+# Private git refs of the rendered templates in the project repository, see: manageprojects.rendered_refs
+RENDERED_REFS_PREFIX = 'refs/manageprojects/rendered'
+
+# Directories that are never searched for managed projects:
+SCAN_SKIP_DIR_NAMES = frozenset(
+    {'.git', '.hg', '.svn', '.tox', '.nox', '.venv', 'venv', '.venv-app', 'node_modules', '__pycache__'}
+)
+
+# Result status of a project updated by "update-fleet", see: manageprojects.fleet
+FLEET_STATUS_APPLIED = 'applied'
+FLEET_STATUS_REJECTS = 'rejects'
+FLEET_STATUS_UP_TO_DATE = 'up-to-date'
+FLEET_STATUS_FAILED = 'failed'
+FLEET_DEFAULT_JOBS = 4
+
+# Number of files that a worker process converts at once in "reverse --jobs"
+REVERSE_BATCH_SIZE = 100
+
+# Text files of this size are converted by "reverse" in chunks of characters:
+REVERSE_STREAM_MIN_SIZE = 16 * 1024 * 1024
+REVERSE_STREAM_CHUNK_SIZE = 1024 * 1024
+
+# Number of files and keys in the "reverse --stats" report, see: manageprojects.reverse_stats
+REVERSE_STATS_TOP = 10
+
+# Number of bytes to detect binary files, the same as git uses:
+BINARY_SNIFF_SIZE = 8000
+
 CLI_EPILOG = 'Project Homepage: https://github.com/jedie/manageprojects'
 
 # Draker has some troubles fixing new lines,
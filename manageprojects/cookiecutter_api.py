@@ -1,4 +1,7 @@
 import logging
+import os
+from concurrent.futures import as_completed
+from contextlib import ExitStack
 from pathlib import Path
 from typing import Optional
 from unittest.mock import patch
@@ -6,11 +9,20 @@ from unittest.mock import patch
 from bx_py_utils.path import assert_is_dir
 from cli_base.cli_tools.git import Git
 from cookiecutter.config import get_user_config
+from cookiecutter.exceptions import UnknownRepoType
 from cookiecutter.main import cookiecutter
-from cookiecutter.repository import determine_repo_dir
+from cookiecutter.repository import determine_repo_dir, expand_abbreviations, is_repo_url, is_zip_file
+from cookiecutter.vcs import identify_repo
 
+from manageprojects.bytecode_cache import BytecodeCacheEnvironmentFactory, get_bytecode_cache
+from manageprojects.constants import LINK_MODE_COPY, LINK_MODE_HARDLINK, LINK_MODE_REFLINK, TEMPLATE_MIRROR_TTL
+from manageprojects.parallel_generate import ParallelGenerateFiles
+from manageprojects.render_cache import RenderCache, get_cache_key, get_template_git_hash
+from manageprojects.template_mirror import TemplateMirror
+from manageprojects.template_worktree import TemplateWorktree
 from manageprojects.utilities.cookiecutter_utils import GenerateFilesWrapper
 from manageprojects.utilities.log_utils import log_func_call
+from manageprojects.utilities.process_pool import LoggingProcessPoolExecutor
 
 
 logger = logging.getLogger(__name__)
@@ -23,9 +35,11 @@ def get_repo_path(
     checkout: Optional[str] = None,  # The branch, tag or commit ID to checkout after clone
     password: Optional[str] = None,  # Optional password to use when extracting the repository
     config_file: Optional[Path] = None,  # Optional path to 'cookiecutter_config.yaml'
+    mirror_ttl: int = TEMPLATE_MIRROR_TTL,  # Max. age in seconds of a remote git template mirror
 ) -> Path:
     """
     Checkout the cookiecutter template and reset it to `checkout` if needed.
+    Remote git templates are checked out from a mirror, see: manageprojects.template_mirror
     """
     if directory:
         assert '://' not in directory
@@ -37,6 +51,16 @@ def get_repo_path(
         config_file=config_file,
         default_config=None,
     )
+
+    repo_url = get_git_repo_url(template=template, abbreviations=config_dict['abbreviations'])
+    if repo_url:
+        repo_path = TemplateMirror(repo_url).get_checkout(checkout=checkout, ttl=mirror_ttl)
+        if directory:
+            repo_path /= directory
+        logger.debug('repo_dir: %s', repo_path)
+        assert_is_dir(repo_path)
+        return repo_path
+
     repo_dir, cleanup = determine_repo_dir(
         template=template,
         directory=directory,
@@ -64,6 +88,61 @@ def get_repo_path(
     return repo_path
 
 
+def get_git_repo_url(*, template: str, abbreviations: dict) -> Optional[str]:
+    """
+    Returns the git URL, if `template` is a remote git repository (and not e.g. a zip file).
+    """
+    template = expand_abbreviations(template, abbreviations)
+    if not is_repo_url(template) or is_zip_file(template):
+        return None
+    try:
+        repo_type, repo_url = identify_repo(template)
+    except UnknownRepoType:
+        return None
+    if repo_type != 'git':
+        return None
+    return repo_url
+
+
+def get_render_cache(
+    *,
+    template: str,  # CookieCutter Template path or GitHub url
+    directory: Optional[str] = None,  # Directory name of the CookieCutter Template
+    no_input: bool = False,
+    extra_context: Optional[dict] = None,
+    replay: Optional[bool] = None,
+    checkout: Optional[str] = None,
+    password: Optional[str] = None,
+    config_file: Optional[Path] = None,
+    use_cache: bool = False,
+    repo_path: Optional[Path] = None,
+) -> tuple[Optional[RenderCache], Optional[str], Path]:
+    """
+    Resolve the template and returns the render cache and the cache key, if the render can be cached.
+    """
+    if not repo_path:
+        repo_path = get_repo_path(
+            template=template,
+            directory=directory,
+            checkout=checkout,
+            password=password,
+            config_file=config_file,
+        )
+
+    if use_cache and no_input and not replay:
+        # Only without user input the result depends only on template revision and context.
+        if git_hash := get_template_git_hash(repo_path):
+            config_dict = get_user_config(config_file=config_file, default_config=None)
+            cache_key = get_cache_key(
+                template=template,
+                git_hash=git_hash,
+                directory=directory,
+                context={'default_context': config_dict['default_context'], 'extra_context': extra_context},
+            )
+            return RenderCache(), cache_key, repo_path
+    return None, None, repo_path
+
+
 def execute_cookiecutter(
     *,
     template: str,  # CookieCutter Template path or GitHub url
@@ -75,19 +154,46 @@ def execute_cookiecutter(
     checkout: Optional[str] = None,  # Optional branch, tag or commit ID to checkout after clone
     password: Optional[str] = None,  # Optional password to use when extracting the repository
     config_file: Optional[Path] = None,  # Optional path to 'cookiecutter_config.yaml'
+    use_cache: bool = False,  # Reuse a cached render of the same template revision and context?
+    repo_path: Optional[Path] = None,  # Use this template checkout (e.g. a git worktree) instead of get_repo_path()
+    generate_jobs: Optional[int] = None,  # Number of processes to render the files, default: number of CPUs
+    link_mode: str = LINK_MODE_COPY,  # Link the unrendered files? see: manageprojects.utilities.file_links
 ) -> tuple[dict, Path, Path]:
     """
     "Just" run cookiecutter
     """
-    repo_path = get_repo_path(
+    render_cache, cache_key, repo_path = get_render_cache(
         template=template,
         directory=directory,
+        no_input=no_input,
+        extra_context=extra_context,
+        replay=replay,
         checkout=checkout,
         password=password,
         config_file=config_file,
+        use_cache=use_cache,
+        repo_path=repo_path,
     )
-    generate_files_wrapper = GenerateFilesWrapper()
-    with patch('cookiecutter.main.generate_files', generate_files_wrapper):
+    if render_cache and cache_key:
+        if cached_render := render_cache.get(key=cache_key, output_dir=output_dir, link_mode=link_mode):
+            logger.info('Use cached render: %r', cached_render.destination_path)
+            return cached_render.cookiecutter_context, cached_render.destination_path, repo_path
+
+    # The template is resolved only once: Cookiecutter should not clone/checkout the template again:
+    repo_dir_patch = patch('cookiecutter.main.determine_repo_dir', return_value=(str(repo_path), False))
+
+    # Compile every template file content only once:
+    bytecode_cache = get_bytecode_cache()
+    environment_patch = patch(
+        'cookiecutter.generate.StrictEnvironment', BytecodeCacheEnvironmentFactory(bytecode_cache)
+    )
+
+    if link_mode == LINK_MODE_HARDLINK and Path(repo_path, 'hooks').is_dir():
+        # A hook may modify the files in place and so the template, too:
+        logger.info('Template %s has hooks: Use only copy-on-write links', repo_path)
+        link_mode = LINK_MODE_REFLINK
+    generate_files_wrapper = GenerateFilesWrapper(ParallelGenerateFiles(jobs=generate_jobs, link_mode=link_mode))
+    with patch('cookiecutter.main.generate_files', generate_files_wrapper), repo_dir_patch, environment_patch:
         destination = log_func_call(
             logger=logger,
             func=cookiecutter,
@@ -101,9 +207,62 @@ def execute_cookiecutter(
             password=password,
             config_file=config_file,
         )
+    logger.info('Jinja bytecode cache: %i hits, %i misses', bytecode_cache.hits, bytecode_cache.misses)
+    if bytecode_cache.misses:
+        bytecode_cache.prune()
     cookiecutter_context = generate_files_wrapper.context
     logger.info('Cookiecutter context: %r', cookiecutter_context)
     destination_path = Path(destination)
     assert_is_dir(destination_path)
     logger.info('Cookiecutter generated here: %r', destination_path)
+
+    if render_cache and cache_key:
+        render_cache.store(key=cache_key, cookiecutter_context=cookiecutter_context, destination_path=destination_path)
+
     return cookiecutter_context, destination_path, repo_path
+
+
+def _execute_cookiecutter_job(kwargs: dict) -> tuple[dict, Path, Path]:
+    return execute_cookiecutter(**kwargs)
+
+
+def execute_cookiecutter_revisions(
+    *,
+    repo_path: Path,  # The template checkout, e.g. from get_repo_path()
+    revisions: dict[str, Path],  # Mapping of git revision -> cookiecutter output directory
+    temp_path: Path,  # Where the git worktrees will be created
+    parallel: bool = True,  # Render the revisions in a process pool?
+    **kwargs,  # Arguments for execute_cookiecutter()
+) -> dict[str, tuple[dict, Path, Path]]:
+    """
+    Render the template in different revisions. Every revision is rendered from a own git worktree,
+    so the template checkout in `repo_path` is not modified.
+    Returns a mapping of git revision -> execute_cookiecutter() result
+    """
+    with ExitStack() as stack:
+        jobs = {}
+        for rev, output_dir in revisions.items():
+            worktree = TemplateWorktree(repo_path=repo_path, rev=rev, temp_path=temp_path)
+            template_path = stack.enter_context(worktree)
+            jobs[rev] = dict(kwargs, output_dir=output_dir, checkout=rev, repo_path=template_path)
+
+        results = execute_cookiecutter_jobs(jobs, parallel=parallel)
+    return results
+
+
+def execute_cookiecutter_jobs(jobs: dict[str, dict], parallel: bool = True) -> dict[str, tuple[dict, Path, Path]]:
+    """
+    Call execute_cookiecutter() for every revision -> arguments mapping.
+    Returns a mapping of git revision -> execute_cookiecutter() result
+    """
+    if parallel and len(jobs) > 1 and all(job.get('no_input') for job in jobs.values()):
+        logger.info('Render %i revisions in parallel', len(jobs))
+        for job in jobs.values():
+            # Share the CPUs between the revisions:
+            job.setdefault('generate_jobs', max(1, (os.cpu_count() or 1) // len(jobs)))
+        with LoggingProcessPoolExecutor(max_workers=len(jobs)) as executor:
+            futures = {executor.submit(_execute_cookiecutter_job, job): rev for rev, job in jobs.items()}
+            return {futures[future]: future.result() for future in as_completed(futures)}
+
+    # User input is only possible in the main process
+    return {rev: execute_cookiecutter(**job) for rev, job in jobs.items()}
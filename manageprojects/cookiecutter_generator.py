@@ -1,11 +1,34 @@
+import collections
+import contextlib
+import functools
+import io
+import itertools
+import re
 import shutil
+import sys
+import time
 from pathlib import Path
+from typing import Optional
 
 from bx_py_utils.path import assert_is_dir
 from cli_base.cli_tools.git import Git
 from rich import print  # noqa
 from rich.pretty import pprint
 
+from manageprojects.constants import REVERSE_BATCH_SIZE, REVERSE_STREAM_CHUNK_SIZE, REVERSE_STREAM_MIN_SIZE
+from manageprojects.reverse_manifest import (
+    get_blob_hashes,
+    get_reverse_info_hash,
+    get_unchanged_candidates,
+    read_reverse_manifest,
+    remove_stale_outputs,
+    write_reverse_manifest,
+)
+from manageprojects.reverse_stats import ReverseFileStats, ReverseStats
+from manageprojects.utilities.binary_files import get_git_binary_paths, is_binary_file
+from manageprojects.utilities.file_links import copy_file
+from manageprojects.utilities.process_pool import LoggingProcessPoolExecutor
+
 
 def iter_context(*, context: dict, prefix='') -> tuple:
     for key, value in context.items():
@@ -18,29 +41,180 @@ def iter_context(*, context: dict, prefix='') -> tuple:
             yield (f'{prefix}{key}', value)
 
 
-def generate_reverse_info(*, cookiecutter_context: dict) -> tuple:
+def has_overlap(first: str, second: str) -> bool:
+    """
+    Can `second` start inside of `first` and overlap it?
+
+    >>> has_overlap('ab', 'bcd'), has_overlap('bcd', 'ab'), has_overlap('abc', 'b')
+    (True, False, True)
+    """
+    for start in range(1, len(first)):
+        tail = first[start:]
+        if tail.startswith(second) or second.startswith(tail):
+            return True
+    return False
+
+
+class ReverseReplacer:
+    """
+    The compiled replacements of a reverse info: (value, '{{ key }}') pairs, the first pair has priority.
+    Like str.replace() for every pair in this order, but a inserted '{{ key }}' is never replaced again.
+
+    All values are compiled into one regex, so a content is scanned only once. The regex finds
+    the leftmost value, but a value with a higher priority may start later and overlap it:
+    Only in this case every value is replaced in a own pass.
+    """
+
+    def __init__(self, reverse_info: tuple):
+        self.replacements: dict[str, str] = {}
+        for src_str, dst_str in reverse_info:
+            if src_str and isinstance(src_str, str) and isinstance(dst_str, str):
+                self.replacements.setdefault(src_str, dst_str)  # The first key wins, like str.replace() before
+
+        self.regex: Optional[re.Pattern] = None
+        self.max_length = 0
+        self.overlapping = False
+        if self.replacements:
+            self.regex = re.compile('|'.join(re.escape(src_str) for src_str in self.replacements))
+            self.max_length = max(len(src_str) for src_str in self.replacements)
+            values = list(self.replacements)
+            self.overlapping = any(
+                has_overlap(values[low], values[high]) for low in range(len(values)) for high in range(low)
+            )
+
+        # Matches that start more than `lookahead` characters before the end of a text can't
+        # be changed by appended text. Every pass may be blocked by a overlapping higher priority value:
+        if self.overlapping:
+            self.lookahead = len(self.replacements) * self.max_length
+        else:
+            self.lookahead = max(self.max_length - 1, 0)
+
+    def find_matches(self, content: str) -> list[tuple[int, int, str]]:
+        """
+        Returns the (start, end, '{{ key }}') of all replacements, sorted by the start.
+        """
+        if self.regex is None:
+            return []
+        if not self.overlapping:
+            regex_matches = self.regex.finditer(content)
+            return [(match.start(), match.end(), self.replacements[match.group()]) for match in regex_matches]
+
+        matches = []
+        unreplaced = [(0, len(content))]
+        for src_str, dst_str in self.replacements.items():
+            next_unreplaced = []
+            for start, end in unreplaced:
+                pos = start
+                while (match_start := content.find(src_str, pos, end)) != -1:
+                    matches.append((match_start, match_start + len(src_str), dst_str))
+                    next_unreplaced.append((pos, match_start))
+                    pos = match_start + len(src_str)
+                next_unreplaced.append((pos, end))
+            unreplaced = next_unreplaced
+        matches.sort()
+        return matches
+
+
+class ReverseInfo(tuple):
+    """
+    The (value, '{{ key }}') pairs, the longest value first.
+    """
+
+    @functools.cached_property
+    def replacer(self) -> ReverseReplacer:
+        return ReverseReplacer(self)
+
+
+def get_replacer(reverse_info: tuple) -> ReverseReplacer:
+    if not isinstance(reverse_info, ReverseInfo):
+        reverse_info = ReverseInfo(reverse_info)
+    return reverse_info.replacer
+
+
+def generate_reverse_info(*, cookiecutter_context: dict) -> ReverseInfo:
     reverse_info = [
         (value, '{{ %s }}' % key) for key, value in iter_context(context=cookiecutter_context)
     ]
     reverse_info.sort(key=lambda x: len(x[0]), reverse=True)
-    return tuple(reverse_info)
+    return ReverseInfo(reverse_info)
 
 
-def replace_str(content: str, reverse_info: tuple, verbosity: int = 0) -> str:
-    origin_content = content
-    for src_str, dst_str in reverse_info:
-        if isinstance(src_str, str) and isinstance(dst_str, str):
-            content = content.replace(src_str, dst_str)
-        elif verbosity > 2:
+def replace_matches(
+    content: str, matches: list[tuple[int, int, str]], hits: Optional[collections.Counter] = None
+) -> str:
+    parts = []
+    pos = 0
+    for start, end, dst_str in matches:
+        parts.append(content[pos:start])
+        parts.append(dst_str)
+        pos = end
+        if hits is not None:
+            hits[dst_str] += 1
+    parts.append(content[pos:])
+    return ''.join(parts)
+
+
+def replace_str(
+    content: str,
+    reverse_info: tuple,
+    verbosity: int = 0,
+    hits: Optional[collections.Counter] = None,  # Count the replacements per reverse key
+) -> str:
+    if verbosity > 2:
+        for src_str, dst_str in reverse_info:
             if not isinstance(src_str, str):
                 print(f'Ignore {src_str=} for {content=}')
             if not isinstance(dst_str, str):
                 print(f'Ignore {dst_str=} for {content=}')
 
-    if verbosity > 2 and content != origin_content:
-        print(f'Convert: {origin_content} -> {content}')
+    replacer = get_replacer(reverse_info)
+    if not replacer.regex:
+        return content
+
+    new_content = replace_matches(content, replacer.find_matches(content), hits)
+
+    if verbosity > 2 and new_content != content:
+        print(f'Convert: {content} -> {new_content}')
 
-    return content
+    return new_content
+
+
+def replace_stream(
+    src_file,
+    dst_file,
+    reverse_info: tuple,
+    chunk_size: int = REVERSE_STREAM_CHUNK_SIZE,
+    hits: Optional[collections.Counter] = None,  # Count the replacements per reverse key
+) -> None:
+    """
+    Like replace_str(), but read and write the text file objects in chunks, so the memory usage
+    doesn't depend on the file size. A match can only be decided, if all values that may overlap it
+    are completely in the buffer: The rest of a chunk that is shorter than the lookahead
+    is kept and processed with the next chunk.
+    """
+    replacer = get_replacer(reverse_info)
+    if not replacer.regex:
+        shutil.copyfileobj(src_file, dst_file, chunk_size)
+        return
+
+    buffer = ''
+    while chunk := src_file.read(chunk_size):
+        buffer += chunk
+        decided = len(buffer) - replacer.lookahead  # All matches starting before this position are final
+        pos = 0
+        for start, end, dst_str in replacer.find_matches(buffer):
+            if start >= decided:
+                break
+            dst_file.write(buffer[pos:start])
+            dst_file.write(dst_str)
+            pos = end
+            if hits is not None:
+                hits[dst_str] += 1
+        if pos < decided:
+            dst_file.write(buffer[pos:decided])
+            pos = decided
+        buffer = buffer[pos:]
+    dst_file.write(replace_matches(buffer, replacer.find_matches(buffer), hits))
 
 
 def replace_path(*, path: Path, reverse_info: tuple, verbosity: int = 0) -> Path:
@@ -66,20 +240,114 @@ def build_dst_path(
     return dst_path
 
 
-def copy_replaced(src_path, dst_path, reverse_info: tuple, verbosity: int = 0):
+def copy_replaced(
+    src_path,
+    dst_path,
+    reverse_info: tuple,
+    verbosity: int = 0,
+    binary: bool = False,
+    hits: Optional[collections.Counter] = None,  # Count the replacements per reverse key
+) -> bool:
+    """
+    Copy the file with all reverse replacements. Binary files are copied unchanged.
+    Returns True if the file was copied as binary file.
+    """
     dst_parent = dst_path.parent
     dst_parent.mkdir(parents=True, exist_ok=True)
 
+    if binary or is_binary_file(src_path):
+        if verbosity > 1:
+            print(f'Copy binary file: {src_path}')
+        copy_file(src_path, dst_path)
+        return True
+
     try:
-        content = src_path.read_text(encoding='UTF-8')
+        if src_path.stat().st_size >= REVERSE_STREAM_MIN_SIZE:
+            if verbosity > 1:
+                print(f'Convert large file in chunks: {src_path}')
+            with src_path.open(encoding='UTF-8') as src_file, dst_path.open('w', encoding='UTF-8') as dst_file:
+                replace_stream(src_file, dst_file, reverse_info=reverse_info, hits=hits)
+        else:
+            content = src_path.read_text(encoding='UTF-8')
+            content = replace_str(content, reverse_info=reverse_info, verbosity=verbosity, hits=hits)
+            dst_path.write_text(content, encoding='UTF-8')
     except UnicodeDecodeError as err:
-        # XXX: Detect binary files in a other way
-        print(f'[yellow]Warning: {err} for file {src_path}')
-        print('copy as binary file')
-        shutil.copy2(src_path, dst_path)
-    else:
-        content = replace_str(content, reverse_info=reverse_info, verbosity=verbosity)
-        dst_path.write_text(content, encoding='UTF-8')
+        # A non UTF-8 text file or a binary file without a known signature
+        if hits:
+            hits.clear()  # The file is copied unchanged
+        if verbosity > 1:
+            print(f'[yellow]{err} for file {src_path}: copy as binary file')
+        copy_file(src_path, dst_path)
+        return True
+    return False
+
+
+def convert_file(
+    *, source_path: Path, src_path: Path, dst_path: Path, reverse_info: tuple, verbosity: int = 0, binary: bool = False
+) -> ReverseFileStats:
+    """
+    Call copy_replaced() and returns the statistics of the file.
+    """
+    hits: collections.Counter[str] = collections.Counter()
+    start_time = time.monotonic()
+    binary = copy_replaced(
+        src_path=src_path, dst_path=dst_path, reverse_info=reverse_info, verbosity=verbosity, binary=binary, hits=hits
+    )
+    return ReverseFileStats(
+        source=src_path.relative_to(source_path).as_posix(),
+        binary=binary,
+        duration=time.monotonic() - start_time,
+        hits=dict(hits),
+    )
+
+
+def _convert_batch(
+    batch: list[tuple[Path, Path, bool]], source_path: Path, reverse_info: tuple, verbosity: int
+) -> list[tuple[str, ReverseFileStats]]:
+    """
+    Convert a batch of files in a worker process.
+    Returns the captured output and the statistics of every file.
+    """
+    results = []
+    for src_path, dst_path, binary in batch:
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            file_stats = convert_file(
+                source_path=source_path,
+                src_path=src_path,
+                dst_path=dst_path,
+                reverse_info=reverse_info,
+                verbosity=verbosity,
+                binary=binary,
+            )
+        results.append((output.getvalue(), file_stats))
+    return results
+
+
+def convert_files_parallel(
+    files: list[tuple[Path, Path, bool]], *, source_path: Path, reverse_info: tuple, jobs: int, verbosity: int = 0
+) -> list[ReverseFileStats]:
+    """
+    Call convert_file() for all (source, destination, binary) files in batches in a process pool.
+    The destination directories must exist. The output is printed in the order of `files`.
+    """
+    files_iter = iter(files)
+    batches = list(iter(lambda: list(itertools.islice(files_iter, REVERSE_BATCH_SIZE)), []))
+    all_stats = []
+    with LoggingProcessPoolExecutor(max_workers=jobs) as executor:
+        results = executor.map(
+            _convert_batch,
+            batches,
+            itertools.repeat(source_path),
+            itertools.repeat(reverse_info),
+            itertools.repeat(verbosity),
+        )
+        for batch, batch_results in zip(batches, results):
+            for (src_path, dst_path, _), (output, file_stats) in zip(batch, batch_results):
+                print(src_path.relative_to(source_path), '->', dst_path)
+                sys.stdout.write(output)
+                all_stats.append(file_stats)
+    return all_stats
 
 
 def create_cookiecutter_template(
@@ -89,7 +357,9 @@ def create_cookiecutter_template(
     cookiecutter_context: dict,
     overwrite: bool = False,
     verbosity: int = 0,
-):
+    jobs: int = 1,  # Convert the files in a process pool, if > 1
+) -> ReverseStats:
+    start_time = time.monotonic()
     source_path = source_path.resolve()
     assert_is_dir(source_path)
     if not overwrite:
@@ -102,7 +372,17 @@ def create_cookiecutter_template(
 
     git = Git(cwd=source_path, detect_root=True)
     file_paths = git.ls_files(verbose=True)
+    binary_paths = get_git_binary_paths(git=git, file_paths=file_paths)
 
+    # Skip unchanged files of the last run, see: manageprojects.reverse_manifest
+    blob_hashes = get_blob_hashes(git)
+    reverse_info_hash = get_reverse_info_hash(reverse_info)
+    manifest = read_reverse_manifest(destination)
+    unchanged_candidates = get_unchanged_candidates(manifest=manifest, reverse_info_hash=reverse_info_hash)
+    new_files = {}
+
+    stats = ReverseStats()
+    parallel_files = []
     for item in file_paths:
         if verbosity > 1:
             print(f'Convert: {item}')
@@ -116,7 +396,45 @@ def create_cookiecutter_template(
         if item.is_dir():
             dst_path.mkdir(parents=True, exist_ok=True)
         elif item.is_file():
+            source_name = item.relative_to(source_path).as_posix()
+            entry = dict(blob=blob_hashes.get(item), output=dst_path.relative_to(destination).as_posix())
+            new_files[source_name] = entry
+            if entry['blob'] and unchanged_candidates.get(source_name) == entry and dst_path.is_file():
+                if verbosity > 1:
+                    print(f'Unchanged: {item}')
+                stats.skipped += 1
+                continue
+            if jobs > 1:
+                # Create all directories here, so the worker processes never race:
+                dst_path.parent.mkdir(parents=True, exist_ok=True)
+                parallel_files.append((item, dst_path, item in binary_paths))
+                continue
             print(item.relative_to(source_path), '->', dst_path)
-            copy_replaced(src_path=item, dst_path=dst_path, reverse_info=reverse_info, verbosity=verbosity)
+            file_stats = convert_file(
+                source_path=source_path,
+                src_path=item,
+                dst_path=dst_path,
+                reverse_info=reverse_info,
+                verbosity=verbosity,
+                binary=item in binary_paths,
+            )
+            stats.files.append(file_stats)
         else:
             print(f'Ignore: {item}')
+
+    if parallel_files:
+        print(f'Convert {len(parallel_files)} files with {jobs} jobs...')
+        stats.files += convert_files_parallel(
+            parallel_files, source_path=source_path, reverse_info=reverse_info, jobs=jobs, verbosity=verbosity
+        )
+
+    if binary_count := sum(file_stats.binary for file_stats in stats.files):
+        print(f'{binary_count} binary files copied without replacements.')
+    if stats.skipped:
+        print(f'{stats.skipped} unchanged files skipped.')
+
+    remove_stale_outputs(destination=destination, old_files=manifest.get('files', {}), new_files=new_files)
+    write_reverse_manifest(destination=destination, reverse_info_hash=reverse_info_hash, files=new_files)
+
+    stats.duration = time.monotonic() - start_time
+    return stats
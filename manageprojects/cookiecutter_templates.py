@@ -8,6 +8,7 @@ from pathlib import Path
 from cli_base.cli_tools.git import Git
 from rich import print as rprint
 
+from manageprojects.constants import DEFAULT_DIFF_ENGINE
 from manageprojects.cookiecutter_api import execute_cookiecutter
 from manageprojects.cookiecutter_generator import create_cookiecutter_template
 from manageprojects.data_classes import (
@@ -18,6 +19,9 @@ from manageprojects.data_classes import (
 )
 from manageprojects.overwrite import overwrite_project
 from manageprojects.patching import generate_template_patch
+from manageprojects.rendered_refs import get_project_git, store_rendered_tree, write_rendered_tree
+from manageprojects.reverse_stats import ReverseStats
+from manageprojects.update_plan import UpdatePlan, plan_update
 from manageprojects.utilities.pyproject_toml import PyProjectToml
 
 
@@ -61,6 +65,11 @@ def start_managed_project(
     commit_date = git.get_commit_date()
     logger.info('Cookiecutter git repro: %s hash: %r %s', git.cwd, current_hash, commit_date)
 
+    if project_git := get_project_git(destination_path):
+        # e.g.: A template hook created the git repository: Store the render for the first update
+        tree_hash = write_rendered_tree(git=project_git, rendered_path=destination_path)
+        store_rendered_tree(git=project_git, rev=current_hash, tree_hash=tree_hash)
+
     #############################################################################
     # Create or update "pyproject.toml" with manageprojects information:
 
@@ -91,7 +100,13 @@ def update_managed_project(
     config_file: Path | None = None,  # CookieCutter config file
     cleanup: bool = True,  # Remove temp files if not exceptions happens
     input: bool = False,  # Prompt the user at command line for manual configuration?
-) -> GenerateTemplatePatchResult | None:
+    diff_engine: str = DEFAULT_DIFF_ENGINE,  # How to create the patch, see: constants.DIFF_ENGINES
+    use_cache: bool = True,  # Reuse cached renders, see: manageprojects.render_cache
+    repo_path: Path | None = None,  # Use this template checkout instead of checkout the template again
+    incremental: bool = False,  # Render only the changed template files, see: manageprojects.incremental_render
+    merge: bool = False,  # Overwrite: Three-way merge locally modified files, see: manageprojects.merge3
+    plan: bool = False,  # Don't change the project, just return the plan, see: manageprojects.update_plan
+) -> GenerateTemplatePatchResult | OverwriteResult | UpdatePlan | None:
     """
     Update a existing project by apply git patch from cookiecutter template changes.
     """
@@ -112,6 +127,25 @@ def update_managed_project(
     cookiecutter_template = meta.cookiecutter_template
     assert cookiecutter_template, f'Missing template in {toml.path}'
 
+    if plan:
+        # Predict the update via the git patch, also for "overwrite":
+        return plan_update(
+            git=git,
+            project_path=project_path,
+            template=cookiecutter_template,
+            directory=meta.cookiecutter_directory,
+            from_rev=from_rev,
+            replay_context=cookiecutter_context,
+            password=password,
+            config_file=config_file,
+            cleanup=cleanup,
+            no_input=not input,
+            diff_engine=diff_engine,
+            use_cache=use_cache,
+            repo_path=repo_path,
+            incremental=incremental,
+        )
+
     if overwrite:
         # Don't apply git patches -> Just overwrite all template files:
         result = overwrite_project(
@@ -125,6 +159,9 @@ def update_managed_project(
             config_file=config_file,
             cleanup=cleanup,
             no_input=not input,
+            use_cache=use_cache,
+            repo_path=repo_path,
+            merge=merge,
         )
         if not result:
             logger.info('Project is up-to-date, no changed to applied.')
@@ -143,6 +180,10 @@ def update_managed_project(
             config_file=config_file,
             cleanup=cleanup,
             no_input=not input,
+            diff_engine=diff_engine,
+            use_cache=use_cache,
+            repo_path=repo_path,
+            incremental=incremental,
         )
         if not result:
             logger.info('No git patch was created, nothing to apply.')
@@ -174,6 +215,10 @@ def update_managed_project(
     toml.add_applied_migrations(git_hash=result.to_rev, dt=result.to_commit_date)
     toml.save()
 
+    if result.to_tree:
+        # The next update can use this render, instead of render the template again:
+        store_rendered_tree(git=git, rev=result.to_rev, tree_hash=result.to_tree)
+
     return result
 
 
@@ -184,6 +229,7 @@ def clone_managed_project(
     password: str | None = None,
     config_file: Path | None = None,  # CookieCutter config file
     input: bool = False,  # Prompt the user at command line for manual configuration?
+    use_cache: bool = True,  # Reuse cached renders, see: manageprojects.render_cache
 ) -> CookiecutterResult:
     """
     Clone a existing project by replay the cookiecutter template in a new directory.
@@ -219,6 +265,7 @@ def clone_managed_project(
         checkout=checkout,
         password=password,
         config_file=config_file,
+        use_cache=use_cache,
     )
 
     git = Git(cwd=repo_path)
@@ -257,7 +304,10 @@ def reverse_managed_project(
     destination: Path,
     overwrite: bool = False,
     verbosity: int = 0,
-):
+    jobs: int = 1,  # Number of worker processes to convert the files
+    print_stats: bool = False,  # Print the statistics report, see: manageprojects.reverse_stats
+    stats_json_path: Path | None = None,  # Write the statistics report as JSON into this file
+) -> ReverseStats:
     """
     Create a cookiecutter template from a managed project.
     """
@@ -272,10 +322,16 @@ def reverse_managed_project(
     cookiecutter_context = meta.cookiecutter_context
     assert cookiecutter_context, f'Missing cookiecutter context in {toml.path}'
 
-    create_cookiecutter_template(
+    stats = create_cookiecutter_template(
         source_path=project_path,
         destination=destination,
         cookiecutter_context=cookiecutter_context,
         overwrite=overwrite,
         verbosity=verbosity,
+        jobs=jobs,
     )
+    if print_stats:
+        stats.print_report()
+    if stats_json_path:
+        stats.write_json(stats_json_path)
+    return stats
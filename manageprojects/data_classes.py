@@ -56,11 +56,14 @@ class GenerateTemplatePatchResult(ResultBase):
     patch_file_path: Path
 
     from_rev: str
-    compiled_from_path: Path
+    compiled_from_path: Optional[Path]  # None, if the stored render of `from_rev` was used
 
     compiled_to_path: Path
 
+    to_tree: Optional[str] = None  # Hash of the rendered `to_rev` tree in the project repository
+
 
 @dataclasses.dataclass
 class OverwriteResult(ResultBase):
-    pass
+    to_tree: Optional[str] = None  # Hash of the rendered `to_rev` tree in the project repository
+    conflicts: list[Path] = dataclasses.field(default_factory=list)  # Modified since the last render: merge manually
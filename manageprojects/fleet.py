@@ -0,0 +1,258 @@
+"""
+    Update many managed projects at once.
+
+    The projects are grouped by Cookiecutter template, template directory and the last applied
+    template revision. Every template is checked out only once and the checkout is shared by all
+    projects, so the renders can be reused via the render cache, too.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import dataclasses
+import io
+import logging
+import time
+from collections.abc import Iterable
+from concurrent.futures import as_completed
+from pathlib import Path
+
+from rich import print  # noqa
+from rich.table import Table
+
+from manageprojects.constants import (
+    DEFAULT_DIFF_ENGINE,
+    FLEET_DEFAULT_JOBS,
+    FLEET_STATUS_APPLIED,
+    FLEET_STATUS_FAILED,
+    FLEET_STATUS_REJECTS,
+    FLEET_STATUS_UP_TO_DATE,
+)
+from manageprojects.cookiecutter_api import get_repo_path
+from manageprojects.cookiecutter_templates import update_managed_project
+from manageprojects.data_classes import OverwriteResult
+from manageprojects.project_index import ProjectIndex, iter_scan_dirs
+from manageprojects.utilities.process_pool import LoggingProcessPoolExecutor
+from manageprojects.utilities.pyproject_toml import PyProjectToml
+
+
+logger = logging.getLogger(__name__)
+
+
+def find_managed_projects(root_path: Path) -> list[Path]:
+    """
+    Search for all managed projects below `root_path`, via the project index.
+    """
+    with ProjectIndex() as project_index:
+        indexed_projects = project_index.scan(root_path)
+    logger.info('%i managed projects found in %s', len(indexed_projects), root_path)
+    return [indexed_project.project_path for indexed_project in indexed_projects]
+
+
+def find_reject_files(project_path: Path) -> set[Path]:
+    """
+    Returns all "*.rej" files created by "git apply --reject"
+    """
+    return {
+        dir_path / file_name
+        for dir_path, file_names in iter_scan_dirs(project_path)
+        for file_name in file_names
+        if file_name.endswith('.rej')
+    }
+
+
+@dataclasses.dataclass(frozen=True)
+class FleetGroupKey:
+    cookiecutter_template: str  # CookieCutter Template path or GitHub url
+    cookiecutter_directory: str | None  # Directory name of the CookieCutter Template
+    from_rev: str  # The last applied template revision
+
+
+@dataclasses.dataclass
+class FleetResult:
+    """
+    Result of one updated project
+    """
+
+    project_path: Path
+    status: str  # One of constants.FLEET_STATUS_*
+    to_rev: str | None = None
+    reject_files: list[Path] = dataclasses.field(default_factory=list)  # *.rej files and overwrite conflicts
+    error: str | None = None
+    output: str = ''  # Captured stdout of the update
+    duration: float = 0.0
+
+
+def get_error_message(err: BaseException) -> str:
+    return f'{err.__class__.__name__}: {err}'
+
+
+def group_projects(project_paths: Iterable[Path]) -> tuple[dict[FleetGroupKey, list[Path]], dict[Path, str]]:
+    """
+    Returns the projects grouped by template and the error messages of projects that can't be grouped,
+    e.g.: A project without [manageprojects] metadata.
+    """
+    groups: dict[FleetGroupKey, list[Path]] = {}
+    errors: dict[Path, str] = {}
+    for project_path in project_paths:
+        try:
+            meta = PyProjectToml(project_path=project_path).get_mp_meta()
+        except Exception as err:
+            logger.exception('Read metadata of %s failed', project_path)
+            errors[project_path] = get_error_message(err)
+            continue
+        from_rev = meta.get_last_git_hash()
+        if not meta.cookiecutter_template or not from_rev:
+            logger.error('Missing template or last applied revision in %s', project_path)
+            errors[project_path] = 'Missing template or last applied revision'
+            continue
+        key = FleetGroupKey(
+            cookiecutter_template=meta.cookiecutter_template,
+            cookiecutter_directory=meta.cookiecutter_directory,
+            from_rev=from_rev,
+        )
+        groups.setdefault(key, []).append(project_path)
+    return groups, errors
+
+
+def update_fleet_project(project_path: Path, **kwargs) -> FleetResult:
+    """
+    Update one project (called in a worker process) and never raise an error,
+    because one broken project should not stop the update of the other projects.
+    """
+    start_time = time.monotonic()
+    rejects_before = find_reject_files(project_path)
+    output = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+            result = update_managed_project(project_path=project_path, **kwargs)
+    except (Exception, SystemExit) as err:
+        logger.exception('Update %s failed', project_path)
+        return FleetResult(
+            project_path=project_path,
+            status=FLEET_STATUS_FAILED,
+            error=get_error_message(err),
+            output=output.getvalue(),
+            duration=time.monotonic() - start_time,
+        )
+
+    if not result:
+        status = FLEET_STATUS_UP_TO_DATE
+        to_rev = None
+        reject_files = []
+    else:
+        to_rev = result.to_rev
+        reject_files = sorted(find_reject_files(project_path) - rejects_before)
+        if isinstance(result, OverwriteResult):
+            reject_files += result.conflicts  # Modified files that are not (cleanly) overwritten
+        status = FLEET_STATUS_REJECTS if reject_files else FLEET_STATUS_APPLIED
+
+    return FleetResult(
+        project_path=project_path,
+        status=status,
+        to_rev=to_rev,
+        reject_files=reject_files,
+        output=output.getvalue(),
+        duration=time.monotonic() - start_time,
+    )
+
+
+def update_fleet(
+    project_paths: Iterable[Path],
+    *,
+    jobs: int = FLEET_DEFAULT_JOBS,  # Number of projects updated at the same time
+    overwrite: bool = False,  # Don't apply git patches -> Just overwrite all template files!
+    password: str | None = None,
+    config_file: Path | None = None,  # CookieCutter config file
+    cleanup: bool = True,  # Remove temp files if not exceptions happens
+    diff_engine: str = DEFAULT_DIFF_ENGINE,  # How to create the patch, see: constants.DIFF_ENGINES
+    use_cache: bool = True,  # Reuse cached renders, see: manageprojects.render_cache
+    incremental: bool = False,  # Render only the changed template files, see: manageprojects.incremental_render
+    merge: bool = False,  # Overwrite: Three-way merge locally modified files, see: manageprojects.merge3
+) -> list[FleetResult]:
+    """
+    Update all given managed projects with a bounded pool of worker processes.
+    Returns the results in the same order as `project_paths`.
+    """
+    project_paths = list(project_paths)
+    groups, errors = group_projects(project_paths)
+
+    # Checkout every template only once. Cookiecutter would clone it again for every project:
+    repo_paths = {}
+    template_errors = {}
+    for key in groups:
+        template_key = (key.cookiecutter_template, key.cookiecutter_directory)
+        if template_key not in repo_paths and template_key not in template_errors:
+            try:
+                repo_paths[template_key] = get_repo_path(
+                    template=key.cookiecutter_template,
+                    directory=key.cookiecutter_directory,
+                    checkout=None,  # Checkout HEAD/main revision
+                    password=password,
+                    config_file=config_file,
+                )
+            except (Exception, SystemExit) as err:
+                # e.g.: Template not reachable -> Only the projects of this template failed
+                logger.exception('Checkout template %s failed', key.cookiecutter_template)
+                template_errors[template_key] = get_error_message(err)
+
+    results = {
+        project_path: FleetResult(project_path=project_path, status=FLEET_STATUS_FAILED, error=error)
+        for project_path, error in errors.items()
+    }
+    with LoggingProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = {}
+        for key, group_project_paths in groups.items():
+            template_key = (key.cookiecutter_template, key.cookiecutter_directory)
+            if template_key in template_errors:
+                for project_path in group_project_paths:
+                    results[project_path] = FleetResult(
+                        project_path=project_path, status=FLEET_STATUS_FAILED, error=template_errors[template_key]
+                    )
+                continue
+            logger.info('Update %i projects from rev. %s of %s', len(group_project_paths), key.from_rev, key)
+            repo_path = repo_paths[template_key]
+            for project_path in group_project_paths:
+                future = executor.submit(
+                    update_fleet_project,
+                    project_path,
+                    overwrite=overwrite,
+                    password=password,
+                    config_file=config_file,
+                    cleanup=cleanup,
+                    input=False,  # User input is not possible in worker processes
+                    diff_engine=diff_engine,
+                    use_cache=use_cache,
+                    repo_path=repo_path,
+                    incremental=incremental,
+                    merge=merge,
+                )
+                futures[future] = project_path
+
+        for future in as_completed(futures):
+            result: FleetResult = future.result()
+            logger.info('%s: %s (%.1f sec.)', result.project_path, result.status, result.duration)
+            results[futures[future]] = result
+
+    return [results[project_path] for project_path in project_paths]
+
+
+def print_fleet_summary(results: list[FleetResult]) -> None:
+    table = Table(title='Fleet update summary')
+    table.add_column('Project')
+    table.add_column('Status')
+    table.add_column('Info')
+    for result in results:
+        if result.status == FLEET_STATUS_FAILED:
+            info = result.error
+        elif result.status == FLEET_STATUS_REJECTS:
+            info = f'{len(result.reject_files)} files to merge manually'
+        else:
+            info = result.to_rev or ''
+        table.add_row(str(result.project_path), result.status, info)
+    print(table)
+
+    counts: dict[str, int] = {}
+    for result in results:
+        counts[result.status] = counts.get(result.status, 0) + 1
+    print(', '.join(f'{count} {status}' for status, count in sorted(counts.items())))
@@ -0,0 +1,170 @@
+"""
+    Render only the template files that changed between two template revisions.
+
+    For both revisions a partial template is extracted via "git archive": Everything outside the
+    project directory (e.g.: "cookiecutter.json", local Jinja extensions), but only the changed
+    files inside the project directory. The diff between the two partial renders is the same
+    as the diff between two complete renders.
+
+    A complete render is needed, if the template has hooks: They may create, change or remove
+    any file of the project, so only a complete render can be compared.
+    Also if "cookiecutter.json" or Python files (e.g.: local Jinja extensions) are changed.
+    Note: Changes of files that are only used via Jinja "include" or "extends" from unchanged
+    files are not detected!
+"""
+
+from __future__ import annotations
+
+import io
+import logging
+import shutil
+import subprocess
+import tarfile
+from pathlib import Path, PurePosixPath
+
+from cli_base.cli_tools.git import Git
+
+from manageprojects.cookiecutter_api import execute_cookiecutter_jobs
+from manageprojects.template_worktree import get_changed_template_files, get_git
+
+
+logger = logging.getLogger(__name__)
+
+
+def get_template_dir_names(*, git: Git, rev: str, template_dir: PurePosixPath) -> list[str]:
+    """
+    Returns the names of all files and directories in the template directory of `rev`
+    """
+    output = git.git_verbose_check_output('ls-tree', '--name-only', '-z', f'{rev}:./{template_dir}', verbose=False)
+    return list(filter(None, output.split('\0')))
+
+
+def get_project_dir_name(names: list[str]) -> str | None:
+    """
+    Returns the name of the project directory, the same way as cookiecutter.find.find_template()
+
+    >>> get_project_dir_name(['cookiecutter.json', 'hooks', '{{cookiecutter.dir_name}}'])
+    '{{cookiecutter.dir_name}}'
+    """
+    for name in names:
+        if 'cookiecutter' in name and '{{' in name and '}}' in name:
+            return name
+    return None
+
+
+def get_complete_render_reason(
+    *, changed_files: list[str], template_dir: PurePosixPath, project_dir: PurePosixPath
+) -> str | None:
+    """
+    Returns why the changed files can't be rendered alone, or None if they can.
+    """
+    for file_name in changed_files:
+        path = PurePosixPath(file_name)
+        if path.is_relative_to(project_dir):
+            continue
+        relative_path = path.relative_to(template_dir)
+        if relative_path == PurePosixPath('cookiecutter.json'):
+            return 'cookiecutter.json changed'
+        if relative_path.suffix == '.py':
+            return f'Python file {relative_path} changed'
+    return None
+
+
+def extract_partial_template(
+    *,
+    git: Git,
+    rev: str,
+    template_dir: PurePosixPath,
+    project_dir: PurePosixPath,
+    changed_files: set[str],
+    destination: Path,
+) -> Path:
+    """
+    Extract the partial template of `rev` into `destination` and returns the template path in it.
+    """
+    output: str = git.git_verbose_check_output(
+        'ls-tree', '-r', '--name-only', '-z', rev, '--', template_dir, verbose=False
+    )
+    file_names = []
+    for file_name in filter(None, output.split('\0')):
+        if not PurePosixPath(file_name).is_relative_to(project_dir) or file_name in changed_files:
+            file_names.append(file_name)
+
+    logger.info('Extract %i files of rev. %s into %s', len(file_names), rev, destination)
+    # Not via git.git_verbose_check_output(), because stderr is merged into the tar stream there.
+    # The file names are no glob patterns, e.g.: "foo[1].txt"
+    archive = subprocess.check_output(
+        [git.git_bin, '--literal-pathspecs', 'archive', '--format=tar', rev, '--', *file_names],
+        cwd=git.cwd,
+        env=git.env,
+    )
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        if hasattr(tarfile, 'data_filter'):
+            tar.extractall(destination, filter='data')
+        else:
+            tar.extractall(destination)
+
+    # The project directory must exist, even if no file in it was changed:
+    Path(destination, project_dir).mkdir(parents=True, exist_ok=True)
+    return destination / template_dir
+
+
+def execute_cookiecutter_incremental(
+    *,
+    repo_path: Path,  # The template checkout, e.g. from get_repo_path()
+    revisions: dict[str, Path],  # Mapping of the two git revisions -> cookiecutter output directory
+    temp_path: Path,  # Where the partial templates will be extracted
+    parallel: bool = True,  # Render the revisions in a process pool?
+    **kwargs,  # Arguments for execute_cookiecutter()
+) -> dict[str, tuple[dict, Path, Path]] | None:
+    """
+    Render only the changed files of both revisions, see module docstring.
+    Returns a mapping of git revision -> execute_cookiecutter() result
+    or None, if a complete render is needed.
+    """
+    from_rev, to_rev = revisions
+    git = get_git(repo_path)
+    template_dir = PurePosixPath(repo_path.resolve().relative_to(git.cwd.resolve()).as_posix())
+
+    from_names = get_template_dir_names(git=git, rev=from_rev, template_dir=template_dir)
+    to_names = get_template_dir_names(git=git, rev=to_rev, template_dir=template_dir)
+    if 'hooks' in from_names or 'hooks' in to_names:
+        # The hooks see only the partial render and may change files outside of it:
+        logger.info('Template %s has hooks: Render complete template', repo_path)
+        return None
+
+    project_dir_name = get_project_dir_name(from_names)
+    if not project_dir_name or project_dir_name != get_project_dir_name(to_names):
+        logger.info('Project directory changed between %s and %s: Render complete template', from_rev, to_rev)
+        return None
+    project_dir = template_dir / project_dir_name
+
+    changed_files = get_changed_template_files(git=git, repo_path=repo_path, from_rev=from_rev, to_rev=to_rev)
+    if reason := get_complete_render_reason(
+        changed_files=changed_files, template_dir=template_dir, project_dir=project_dir
+    ):
+        logger.info('%s between %s and %s: Render complete template', reason, from_rev, to_rev)
+        return None
+
+    logger.info('Render only %i changed files of %s and %s', len(changed_files), from_rev, to_rev)
+    jobs = {}
+    for rev, output_dir in revisions.items():
+        template_path = extract_partial_template(
+            git=git,
+            rev=rev,
+            template_dir=template_dir,
+            project_dir=project_dir,
+            changed_files=set(changed_files),
+            destination=temp_path / f'{rev}_partial' / git.cwd.name,
+        )
+        # The partial render must never be stored as a complete render in the render cache:
+        jobs[rev] = dict(kwargs, output_dir=output_dir, checkout=rev, repo_path=template_path, use_cache=False)
+
+    try:
+        return execute_cookiecutter_jobs(jobs, parallel=parallel)
+    except Exception as err:
+        # e.g.: A Jinja "include" of a file that is not in the partial template
+        logger.warning('Render of the changed files failed: %s: Render complete template', err)
+        for output_dir in revisions.values():
+            shutil.rmtree(output_dir, ignore_errors=True)
+        return None
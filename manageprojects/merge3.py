@@ -0,0 +1,139 @@
+"""
+    In-process three-way merge of text files, used by "update-project --overwrite --merge".
+
+    base: The render of the last applied template revision
+    ours: The current project file
+    theirs: The render of the new template revision
+
+    Changes of only one side are taken over. Conflict markers are only inserted,
+    if both sides changed the same lines in a different way.
+    The algorithm is the same as in the "merge3" module of Bazaar.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import difflib
+
+
+CONFLICT_START = '<<<<<<< ours'
+CONFLICT_BASE = '||||||| base'
+CONFLICT_SEPARATOR = '======='
+CONFLICT_END = '>>>>>>> theirs'
+
+
+@dataclasses.dataclass
+class MergeResult:
+    lines: list[str]
+    conflicts: int  # Number of conflict regions
+
+    @property
+    def text(self) -> str:
+        return ''.join(self.lines)
+
+
+def intersect(ra: tuple[int, int], rb: tuple[int, int]) -> tuple[int, int] | None:
+    """
+    Returns the intersection of two ranges or None.
+
+    >>> intersect((0, 10), (5, 20))
+    (5, 10)
+    >>> intersect((0, 10), (10, 20)) is None
+    True
+    """
+    start = max(ra[0], rb[0])
+    end = min(ra[1], rb[1])
+    if start < end:
+        return start, end
+    return None
+
+
+def find_sync_regions(base: list[str], ours: list[str], theirs: list[str]) -> list[tuple[int, ...]]:
+    """
+    Returns the regions that are unchanged in both sides:
+    (base start, base end, ours start, ours end, theirs start, theirs end)
+    The last region is always a empty region at the end of all three sequences.
+    """
+    ours_matches = difflib.SequenceMatcher(None, base, ours, autojunk=False).get_matching_blocks()
+    theirs_matches = difflib.SequenceMatcher(None, base, theirs, autojunk=False).get_matching_blocks()
+
+    regions: list[tuple[int, ...]] = []
+    ours_index = theirs_index = 0
+    while ours_index < len(ours_matches) and theirs_index < len(theirs_matches):
+        ours_base, ours_match, ours_length = ours_matches[ours_index]
+        theirs_base, theirs_match, theirs_length = theirs_matches[theirs_index]
+        if intersection := intersect(
+            (ours_base, ours_base + ours_length), (theirs_base, theirs_base + theirs_length)
+        ):
+            base_start, base_end = intersection
+            length = base_end - base_start
+            ours_start = ours_match + (base_start - ours_base)
+            theirs_start = theirs_match + (base_start - theirs_base)
+            regions.append(
+                (base_start, base_end, ours_start, ours_start + length, theirs_start, theirs_start + length)
+            )
+
+        if ours_base + ours_length < theirs_base + theirs_length:
+            ours_index += 1
+        else:
+            theirs_index += 1
+
+    regions.append((len(base), len(base), len(ours), len(ours), len(theirs), len(theirs)))
+    return regions
+
+
+def ensure_newline(lines: list[str]) -> list[str]:
+    """
+    A conflict marker must start in a new line.
+    """
+    if lines and not lines[-1].endswith(('\n', '\r')):
+        return [*lines[:-1], f'{lines[-1]}\n']
+    return lines
+
+
+def merge_lines(base: list[str], ours: list[str], theirs: list[str]) -> MergeResult:
+    lines = []
+    conflicts = 0
+    base_pos = ours_pos = theirs_pos = 0
+    for base_start, base_end, ours_start, ours_end, theirs_start, theirs_end in find_sync_regions(
+        base, ours, theirs
+    ):
+        base_chunk = base[base_pos:base_start]
+        ours_chunk = ours[ours_pos:ours_start]
+        theirs_chunk = theirs[theirs_pos:theirs_start]
+        if ours_chunk == theirs_chunk:
+            lines += ours_chunk  # Unchanged or the same change on both sides
+        elif ours_chunk == base_chunk:
+            lines += theirs_chunk  # Only the template changed
+        elif theirs_chunk == base_chunk:
+            lines += ours_chunk  # Only the project changed
+        else:
+            conflicts += 1
+            lines.append(f'{CONFLICT_START}\n')
+            lines += ensure_newline(ours_chunk)
+            lines.append(f'{CONFLICT_BASE}\n')
+            lines += ensure_newline(base_chunk)
+            lines.append(f'{CONFLICT_SEPARATOR}\n')
+            lines += ensure_newline(theirs_chunk)
+            lines.append(f'{CONFLICT_END}\n')
+
+        # The region that is unchanged in all three:
+        lines += base[base_start:base_end]
+        base_pos, ours_pos, theirs_pos = base_end, ours_end, theirs_end
+
+    return MergeResult(lines=lines, conflicts=conflicts)
+
+
+def merge_text(base: str, ours: str, theirs: str) -> MergeResult:
+    """
+    >>> result = merge_text('a\\nb\\nc\\n', 'A\\nb\\nc\\n', 'a\\nb\\nC\\n')
+    >>> result.text, result.conflicts
+    ('A\\nb\\nC\\n', 0)
+    >>> merge_text('a\\nb\\n', 'a\\nX\\n', 'a\\nY\\n').conflicts
+    1
+    """
+    return merge_lines(
+        base.splitlines(keepends=True),
+        ours.splitlines(keepends=True),
+        theirs.splitlines(keepends=True),
+    )
@@ -0,0 +1,112 @@
+"""
+    Check which managed projects are behind their Cookiecutter template.
+
+    Nothing is rendered: The last applied revision of every project is compared with the
+    template HEAD and the changed template files are counted via "git diff --name-only".
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import datetime
+import logging
+import subprocess
+from collections.abc import Iterable
+from pathlib import Path
+
+from rich import print  # noqa
+from rich.table import Table
+
+from manageprojects.cookiecutter_api import get_repo_path
+from manageprojects.project_index import IndexedProject
+from manageprojects.template_worktree import get_changed_template_files, get_git
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass
+class OutdatedResult:
+    project_path: Path
+    cookiecutter_template: str | None
+    from_rev: str | None  # The last applied template revision
+    to_rev: str | None = None  # The current template HEAD revision
+    to_commit_date: datetime.datetime | None = None
+    changed_files: list[str] = dataclasses.field(default_factory=list)  # Changed files in the template directory
+    error: str | None = None
+
+    @property
+    def outdated(self) -> bool:
+        return not self.error and self.from_rev != self.to_rev
+
+
+def get_outdated(
+    indexed_projects: Iterable[IndexedProject],
+    *,
+    password: str | None = None,
+    config_file: Path | None = None,  # CookieCutter config file
+) -> list[OutdatedResult]:
+    """
+    Compare the last applied revision of the projects with the template HEAD.
+    Every template is fetched once per call, independent of TEMPLATE_MIRROR_TTL.
+    """
+    repo_paths = {}
+    results = []
+    for indexed_project in indexed_projects:
+        template_key = (indexed_project.cookiecutter_template, indexed_project.cookiecutter_directory)
+        result = OutdatedResult(
+            project_path=indexed_project.project_path,
+            cookiecutter_template=indexed_project.cookiecutter_template,
+            from_rev=indexed_project.last_revision,
+        )
+        if not indexed_project.cookiecutter_template or not indexed_project.last_revision:
+            result.error = 'Missing template or last applied revision'
+            results.append(result)
+            continue
+        try:
+            if template_key not in repo_paths:
+                repo_paths[template_key] = get_repo_path(
+                    template=indexed_project.cookiecutter_template,
+                    directory=indexed_project.cookiecutter_directory,
+                    checkout=None,  # Checkout HEAD/main revision
+                    password=password,
+                    config_file=config_file,
+                    mirror_ttl=0,  # Compare with the real template HEAD, not with a cached one
+                )
+            repo_path = repo_paths[template_key]
+            git = get_git(repo_path)
+            result.to_rev = to_rev = git.get_current_hash(verbose=False)
+            result.to_commit_date = git.get_commit_date(verbose=False)
+            if indexed_project.last_revision != to_rev:
+                result.changed_files = get_changed_template_files(
+                    git=git, repo_path=repo_path, from_rev=indexed_project.last_revision, to_rev=to_rev
+                )
+        except Exception as err:
+            # e.g.: Template not reachable or the revision doesn't exist anymore
+            logger.exception('Check %s failed', indexed_project.project_path)
+            if isinstance(err, subprocess.CalledProcessError) and err.output:
+                err = err.output
+            result.error = str(err).strip()
+
+        results.append(result)
+    return results
+
+
+def print_outdated_summary(results: list[OutdatedResult]) -> None:
+    table = Table(title='Outdated projects')
+    table.add_column('Project')
+    table.add_column('Last revision')
+    table.add_column('Template revision')
+    table.add_column('Changed template files')
+    for result in results:
+        if result.error:
+            info = f'[red]{result.error}'
+        elif result.outdated:
+            info = str(len(result.changed_files))
+        else:
+            info = 'up-to-date'
+        table.add_row(str(result.project_path), result.from_rev, result.to_rev or '', info)
+    print(table)
+
+    outdated_count = sum(result.outdated for result in results)
+    print(f'{outdated_count} of {len(results)} projects are outdated.')
@@ -1,6 +1,7 @@
-import filecmp
+from __future__ import annotations
+
 import logging
-import shutil
+import os
 import sys
 from pathlib import Path
 from typing import Optional
@@ -9,14 +10,64 @@ from bx_py_utils.path import assert_is_dir
 from cli_base.cli_tools.git import Git
 from rich import print
 
-from manageprojects.cookiecutter_api import execute_cookiecutter
+from manageprojects.constants import RENDER_MANIFEST_PATH, TRANSACTION_PATH
 from manageprojects.data_classes import OverwriteResult
+from manageprojects.merge3 import MergeResult, merge_text
+from manageprojects.render_manifest import dump_render_manifest, get_file_blob_hash, get_last_render_hashes
+from manageprojects.rendered_refs import get_project_git, read_blob, write_virtual_tree
+from manageprojects.template_worktree import get_git
+from manageprojects.tree_diff import MODE_SYMLINK, TreeFile
+from manageprojects.utilities.file_transaction import FileTransaction, recover_transaction
 from manageprojects.utilities.temp_path import TemporaryDirectory
+from manageprojects.virtual_tree import render_virtual_tree
 
 
 logger = logging.getLogger(__name__)
 
 
+def stage_tree_file(transaction: FileTransaction, rel_path: str, tree_file: TreeFile) -> None:
+    """
+    Stage the content of the rendered file. Like shutil.copyfile() the file mode is not changed.
+    """
+    if tree_file.mode == MODE_SYMLINK:
+        transaction.symlink(rel_path, os.fsdecode(tree_file.content))
+    else:
+        transaction.write_bytes(rel_path, tree_file.content)
+
+
+def decode_text(content: bytes) -> str | None:
+    """
+    Returns the text of a UTF-8 encoded text file or None for binary files.
+    """
+    if b'\0' in content:
+        return None
+    try:
+        return content.decode('UTF-8')
+    except UnicodeDecodeError:
+        return None
+
+
+def merge_tree_file(
+    *, project_git: Git | None, last_hash: str, file_path: Path, tree_file: TreeFile
+) -> MergeResult | None:
+    """
+    Three-way merge of the project file with the new rendered file, the last render is the base.
+    Returns None if a merge is not possible, e.g.: binary files or the last render is unknown.
+    """
+    if not project_git or tree_file.mode == MODE_SYMLINK or file_path.is_symlink():
+        return None
+    base_content = read_blob(git=project_git, blob_hash=last_hash)
+    if base_content is None:
+        return None
+    base = decode_text(base_content)
+    ours = decode_text(file_path.read_bytes())
+    theirs = decode_text(tree_file.content)
+    if base is None or ours is None or theirs is None:
+        logger.info('Skip merge of binary file %s', file_path)
+        return None
+    return merge_text(base=base, ours=ours, theirs=theirs)
+
+
 def overwrite_project(
     *,
     git: Git,
@@ -29,9 +80,16 @@ def overwrite_project(
     config_file: Optional[Path] = None,  # Optional path to 'cookiecutter_config.yaml'
     cleanup: bool = True,  # Remove temp files if not exceptions happens
     no_input: bool = False,  # Prompt the user at command line for manual configuration?
-) -> OverwriteResult:
+    use_cache: bool = True,  # Reuse cached renders, see: manageprojects.render_cache
+    repo_path: Optional[Path] = None,  # Use this template checkout instead of checkout the template again
+    merge: bool = False,  # Three-way merge locally modified files instead of skipping them
+) -> OverwriteResult | None:
     print(f'Update by overwrite project: {project_path} from {template}')
 
+    transaction_path = project_path / TRANSACTION_PATH
+    if recover_transaction(root_path=project_path, transaction_path=transaction_path):
+        print(f'The interrupted last update of {project_path} is completed, please check and commit it.')
+
     status = git.status()
     if status:
         print(f'Abort: project {project_path} is not clean:', file=sys.stderr)
@@ -48,44 +106,92 @@ def overwrite_project(
         print(f'Compile cookiecutter template in the current version here: {temp_path}')
         print('Use extra context:')
         print(extra_context)
-        to_rev_context, to_rev_dst_path, to_rev_repo_path = execute_cookiecutter(
+        to_rev_context, to_rev_tree, to_rev_repo_path = render_virtual_tree(
+            temp_path=temp_path,
             template=template,
             directory=directory,
-            output_dir=temp_path,
             no_input=no_input,
             extra_context=extra_context,
             checkout=None,  # Checkout HEAD/main revision
             password=password,
             config_file=config_file,
+            use_cache=use_cache,
+            repo_path=repo_path,
         )
         assert_is_dir(to_rev_repo_path)
 
-        git = Git(cwd=to_rev_repo_path, detect_root=True)
+        to_tree = None
+        if project_git := get_project_git(project_path):
+            to_tree = write_virtual_tree(git=project_git, tree=to_rev_tree)
+
+        git = get_git(to_rev_repo_path)
         to_rev = git.get_current_hash(verbose=False)
         to_commit_date = git.get_commit_date(verbose=False)
         print(f'Update from rev. {from_rev} to rev. {to_rev} ({to_commit_date})')
 
+        last_hashes = get_last_render_hashes(project_path=project_path, project_git=project_git, from_rev=from_rev)
+        manifest_files = {}
+        conflicts = []
         updated_file_count = 0
-        for src_file_path in to_rev_dst_path.rglob('*'):
-            if not src_file_path.is_file():
-                continue
-
-            dst_file_path = project_path / src_file_path.relative_to(to_rev_dst_path)
-            if not dst_file_path.exists():
-                print(f'NEW file: {dst_file_path}')
-            elif filecmp.cmp(dst_file_path, src_file_path, shallow=False):
-                print(f'Skip unchanged file: {dst_file_path}, ok.')
-                continue
-            else:
-                print(f'UPDATE file: {dst_file_path}')
-
-            if not dst_file_path.parent.exists():
-                dst_file_path.parent.mkdir(parents=True)
-
-            shutil.copyfile(src_file_path, dst_file_path)
-            updated_file_count += 1
-
-    logger.info('%i files updated by overwriting', updated_file_count)
-
-    if updated_file_count > 0:
-        return OverwriteResult(to_rev=to_rev, to_commit_date=to_commit_date)
+        # The files are written in one pass after all files are checked:
+        transaction = FileTransaction(root_path=project_path, transaction_path=transaction_path)
+        try:
+            for rel_path, tree_file in sorted(to_rev_tree.items()):
+                dst_file_path = project_path / rel_path
+                last_hash = last_hashes.get(rel_path)
+                manifest_files[rel_path] = tree_file.blob_hash
+                if last_hash == tree_file.blob_hash:
+                    # The project file is not touched: The user may have changed it
+                    print(f'Skip unchanged template file: {dst_file_path}, ok.')
+                    continue
+
+                if not dst_file_path.exists() and not dst_file_path.is_symlink():
+                    print(f'NEW file: {dst_file_path}')
+                else:
+                    file_hash = get_file_blob_hash(dst_file_path)
+                    if file_hash == tree_file.blob_hash:
+                        print(f'Skip unchanged file: {dst_file_path}, ok.')
+                        continue
+                    if last_hash and file_hash != last_hash and merge:
+                        merge_result = merge_tree_file(
+                            project_git=project_git, last_hash=last_hash, file_path=dst_file_path, tree_file=tree_file
+                        )
+                        if merge_result:
+                            transaction.write_bytes(rel_path, merge_result.text.encode('UTF-8'))
+                            updated_file_count += 1
+                            if merge_result.conflicts:
+                                print(
+                                    f'CONFLICT: {dst_file_path} merged with {merge_result.conflicts} conflict markers!'
+                                )
+                                conflicts.append(dst_file_path)
+                            else:
+                                print(f'MERGED file: {dst_file_path}')
+                            continue
+                    if last_hash and file_hash != last_hash:
+                        print(f'CONFLICT: {dst_file_path} was modified since the last render, not overwritten!')
+                        conflicts.append(dst_file_path)
+                        manifest_files[rel_path] = last_hash  # Report it again on the next run
+                        continue
+                    print(f'UPDATE file: {dst_file_path}')
+
+                stage_tree_file(transaction, rel_path, tree_file)
+                updated_file_count += 1
+        except BaseException:
+            transaction.discard()
+            raise
+
+    logger.info('%i files updated by overwriting, %i conflicts', updated_file_count, len(conflicts))
+    if conflicts:
+        if merge:
+            print(f'{len(conflicts)} files with local changes have conflicts, please merge them manually:')
+        else:
+            print(f'{len(conflicts)} files with local changes are not overwritten, please merge them manually:')
+        for file_path in conflicts:
+            print(f' * {file_path}')
+
+    if updated_file_count > 0 or conflicts:
+        transaction.write_bytes(RENDER_MANIFEST_PATH, dump_render_manifest(rev=to_rev, files=manifest_files))
+        transaction.commit()
+        return OverwriteResult(to_rev=to_rev, to_commit_date=to_commit_date, to_tree=to_tree, conflicts=conflicts)
+
+    return None
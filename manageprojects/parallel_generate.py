@@ -0,0 +1,164 @@
+"""
+    Render the files of one cookiecutter template in a process pool.
+
+    cookiecutter's generate_files() still walks the template, creates the directories, copies
+    the "_copy_without_render" paths and runs the hooks. Only the generate_file() calls are
+    collected and executed in worker processes, before the "post_gen_project" hook runs.
+    Every worker calls cookiecutter's own generate_file(), so the output is the same as
+    in the sequential path.
+
+    Unrendered files are linked instead of copied, if a link mode is given,
+    see: manageprojects.utilities.file_links
+"""
+
+from __future__ import annotations
+
+import collections
+import itertools
+import logging
+import os
+from contextlib import nullcontext
+from unittest.mock import patch
+
+from cookiecutter.environment import StrictEnvironment
+from cookiecutter.exceptions import UndefinedVariableInTemplate
+from cookiecutter.generate import generate_file, generate_files, run_hook_from_repo_dir
+from cookiecutter.utils import rmtree, work_in
+from jinja2 import FileSystemLoader
+from jinja2.exceptions import UndefinedError
+
+from manageprojects.bytecode_cache import get_bytecode_cache
+from manageprojects.constants import GENERATE_BATCH_SIZE, GENERATE_PARALLEL_MIN_FILES, LINK_MODE_COPY
+from manageprojects.utilities.file_links import LinkingShutil
+from manageprojects.utilities.process_pool import LoggingProcessPoolExecutor
+
+
+logger = logging.getLogger(__name__)
+
+
+def patch_shutil(linking_shutil: LinkingShutil | None):
+    if linking_shutil is None:
+        return nullcontext()
+    return patch('cookiecutter.generate.shutil', linking_shutil)
+
+
+def _generate_batch(
+    *,
+    template_dir: str,
+    project_dir: str,
+    infiles: list[str],
+    context: dict,
+    skip_if_file_exists: bool,
+    link_mode: str,
+) -> tuple[tuple[str, UndefinedError] | None, dict]:
+    """
+    Render the files in a worker process, like cookiecutter.generate.generate_files() does.
+    Returns the file and the error of the first undefined template variable and the link counts.
+    """
+    envvars = context.get('cookiecutter', {}).get('_jinja2_env_vars', {})
+    env = StrictEnvironment(
+        context=context, keep_trailing_newline=True, bytecode_cache=get_bytecode_cache(), **envvars
+    )
+    linking_shutil = LinkingShutil(link_mode) if link_mode != LINK_MODE_COPY else None
+    with work_in(template_dir), patch_shutil(linking_shutil):
+        env.loader = FileSystemLoader(['.', '../templates'])
+        for infile in infiles:
+            try:
+                generate_file(project_dir, infile, context, env, skip_if_file_exists)
+            except UndefinedError as err:
+                return (infile, err), {}
+    return None, dict(linking_shutil.counts) if linking_shutil else {}
+
+
+class ParallelGenerateFiles:
+    """
+    Replacement of cookiecutter.generate.generate_files() that renders the files in a process pool.
+    """
+
+    def __init__(
+        self,
+        *,
+        jobs: int | None = None,
+        min_files: int = GENERATE_PARALLEL_MIN_FILES,
+        link_mode: str = LINK_MODE_COPY,
+    ):
+        self.jobs = jobs or os.cpu_count() or 1
+        self.min_files = min_files
+        self.link_mode = link_mode
+        self.link_counts: collections.Counter[str] = collections.Counter()  # Created unrendered files by method
+        self.pending: list[tuple] = []  # Collected generate_file() calls
+
+    def collect_file(self, project_dir, infile, context, env, skip_if_file_exists=False):
+        # generate_files() calls generate_file() inside the template directory:
+        self.pending.append((os.getcwd(), project_dir, infile, context, env, skip_if_file_exists))
+
+    def generate_pending(self, *, delete_project_on_failure: bool) -> None:
+        pending, self.pending = self.pending, []
+        if not pending:
+            return
+
+        if len(pending) < self.min_files or self.jobs < 2:
+            result = self.generate_sequential(pending)
+        else:
+            result = self.generate_parallel(pending)
+
+        if result:
+            infile, err = result
+            if delete_project_on_failure:
+                rmtree(pending[0][1])
+            context = pending[0][3]
+            raise UndefinedVariableInTemplate(f"Unable to create file '{infile}'", err, context) from err
+
+    def generate_sequential(self, pending: list) -> tuple[str, UndefinedError] | None:
+        for template_dir, project_dir, infile, context, env, skip_if_file_exists in pending:
+            with work_in(template_dir):
+                try:
+                    generate_file(project_dir, infile, context, env, skip_if_file_exists)
+                except UndefinedError as err:
+                    return infile, err
+        return None
+
+    def generate_parallel(self, pending: list) -> tuple[str, UndefinedError] | None:
+        template_dir, project_dir, _, context, _, skip_if_file_exists = pending[0]
+        infiles = iter(entry[2] for entry in pending)
+        batches = list(iter(lambda: list(itertools.islice(infiles, GENERATE_BATCH_SIZE)), []))
+        logger.info('Generate %i files in %i batches with %i jobs', len(pending), len(batches), self.jobs)
+        with LoggingProcessPoolExecutor(max_workers=min(self.jobs, len(batches))) as executor:
+            futures = [
+                executor.submit(
+                    _generate_batch,
+                    template_dir=template_dir,
+                    project_dir=project_dir,
+                    infiles=batch,
+                    context=context,
+                    skip_if_file_exists=skip_if_file_exists,
+                    link_mode=self.link_mode,
+                )
+                for batch in batches
+            ]
+            # The first error in walk order, like the sequential path:
+            for future in futures:
+                result, link_counts = future.result()
+                if result:
+                    return result
+                self.link_counts.update(link_counts)
+        return None
+
+    def run_hook(self, repo_dir, hook_name, project_dir, context, delete_project_on_failure):
+        if hook_name == 'post_gen_project':
+            # The hook expects all generated files:
+            self.generate_pending(delete_project_on_failure=delete_project_on_failure)
+        return run_hook_from_repo_dir(repo_dir, hook_name, project_dir, context, delete_project_on_failure)
+
+    def __call__(self, **kwargs) -> str:
+        linking_shutil = LinkingShutil(self.link_mode) if self.link_mode != LINK_MODE_COPY else None
+        with patch('cookiecutter.generate.generate_file', self.collect_file), patch(
+            'cookiecutter.generate.run_hook_from_repo_dir', self.run_hook
+        ), patch_shutil(linking_shutil):
+            project_dir = generate_files(**kwargs)
+            # Without hooks:
+            self.generate_pending(delete_project_on_failure=False)
+        if linking_shutil:
+            self.link_counts.update(linking_shutil.counts)
+            logger.info('Unrendered files created via %s: %r', self.link_mode, dict(self.link_counts))
+        return project_dir
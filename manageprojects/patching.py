@@ -1,73 +1,53 @@
 import logging
-import shutil
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
 
 from bx_py_utils.path import assert_is_dir
 from cli_base.cli_tools.git import Git
 from rich import print
 
-from manageprojects.cookiecutter_api import execute_cookiecutter
+from manageprojects.constants import DEFAULT_DIFF_ENGINE, DIFF_ENGINE_GIT, DIFF_ENGINE_IN_PROCESS, LINK_MODE_HARDLINK
+from manageprojects.cookiecutter_api import execute_cookiecutter_revisions, get_repo_path
 from manageprojects.data_classes import GenerateTemplatePatchResult
+from manageprojects.incremental_render import execute_cookiecutter_incremental
+from manageprojects.rendered_refs import (
+    get_project_git,
+    get_rendered_tree,
+    make_rendered_tree_diff,
+    store_rendered_tree,
+    write_rendered_tree,
+)
+from manageprojects.template_worktree import get_git
+from manageprojects.tree_diff import make_tree_diff
 from manageprojects.utilities.temp_path import TemporaryDirectory
 
 
 logger = logging.getLogger(__name__)
 
 
-def verbose_copy(src, dst):
-    logger.info(f'copy: "{src}" to "{dst}"')
-    shutil.copy2(src, dst)
-
-
 def make_git_diff(temp_path: Path, from_path: Path, to_path: Path, verbose=True) -> Optional[str]:
     """
-    Create git diff between from_path and to_path
+    Create git diff between from_path and to_path.
+    Both directories are written as tree objects into a temporary bare git repository
+    and the two trees are compared. No files are copied and no index must be refreshed.
     """
     print(f'Make git diff between {from_path} and {to_path} (temp: {temp_path})')
     assert_is_dir(from_path)
     assert_is_dir(to_path)
 
-    temp_repo_path = temp_path / 'git-repo'
-
-    # Create git repo with "from" content:
-    shutil.copytree(
-        src=from_path,
-        dst=temp_repo_path,
-        ignore=shutil.ignore_patterns('.git'),
-        copy_function=verbose_copy,
-        dirs_exist_ok=False,
-    )
-    assert not Path(temp_repo_path, '.git').exists()
+    temp_repo_path = temp_path / 'git-repo.git'
+    temp_repo_path.mkdir()
     git = Git(cwd=temp_repo_path, detect_root=False)
-    git.init(verbose=verbose)
-    git.add('.', verbose=False)
-    git.commit('init with "from" revision', verbose=False)
-    git.print_file_list(out_func=logger.info)
-
-    # Remove all files, except .git:
-    for item in temp_repo_path.iterdir():
-        if item.is_dir():
-            if item.name == '.git':
-                continue
-            shutil.rmtree(item)
-        else:
-            item.unlink()
-
-    # Commit "to" version:
-    shutil.copytree(
-        src=to_path,
-        dst=temp_repo_path,
-        ignore=shutil.ignore_patterns('.git'),
-        copy_function=verbose_copy,
-        dirs_exist_ok=True,
-    )
-    git.add('.', verbose=verbose)
-    git.commit('Commit "to" revision', verbose=verbose)
-    git.print_file_list(out_func=logger.info)
-
-    # Diff between previous commit (from) and current commit (to):
-    patch = git.diff('HEAD^', 'HEAD')
+    git.git_verbose_check_output('init', '--bare', '--quiet', verbose=verbose)
+
+    from_tree = write_rendered_tree(git=git, rendered_path=from_path)
+    to_tree = write_rendered_tree(git=git, rendered_path=to_path)
+    for name, tree in (('from', from_tree), ('to', to_tree)):
+        file_list = git.git_verbose_check_output('ls-tree', '-r', '--name-only', tree, verbose=False)
+        logger.info('Files of "%s" tree %s:\n%s', name, tree, file_list)
+
+    # Diff between the "from" and the "to" tree object:
+    patch = git.diff(from_tree, to_tree, verbose=verbose)
     if not patch:
         logger.warning(f'No gif diff between {from_path} and {to_path} !')
         return None
@@ -75,6 +55,21 @@ def make_git_diff(temp_path: Path, from_path: Path, to_path: Path, verbose=True)
     return patch
 
 
+def make_diff(
+    *, temp_path: Path, from_path: Path, to_path: Path, diff_engine: str = DEFAULT_DIFF_ENGINE, verbose=True
+) -> Optional[str]:
+    """
+    Create git diff between from_path and to_path with the given diff engine.
+    """
+    if diff_engine == DIFF_ENGINE_GIT:
+        return make_git_diff(temp_path=temp_path, from_path=from_path, to_path=to_path, verbose=verbose)
+    elif diff_engine == DIFF_ENGINE_IN_PROCESS:
+        print(f'Make in-process diff between {from_path} and {to_path}')
+        return make_tree_diff(from_path=from_path, to_path=to_path)
+    else:
+        raise ValueError(f'Unknown diff engine: {diff_engine!r}')
+
+
 def generate_template_patch(
     *,
     project_path: Path,
@@ -86,9 +81,16 @@ def generate_template_patch(
     config_file: Optional[Path] = None,  # Optional path to 'cookiecutter_config.yaml'
     cleanup: bool = True,  # Remove temp files if not exceptions happens
     no_input: bool = False,  # Prompt the user at command line for manual configuration?
+    diff_engine: str = DEFAULT_DIFF_ENGINE,  # How to create the patch, see: constants.DIFF_ENGINES
+    use_cache: bool = True,  # Reuse cached renders, see: manageprojects.render_cache
+    repo_path: Optional[Path] = None,  # Use this template checkout instead of checkout the template again
+    incremental: bool = False,  # Render only the changed template files, see: manageprojects.incremental_render
+    patch_file_path: Optional[Path] = None,  # Default: Write the patch into ".manageprojects/patches/" of the project
+    store: bool = True,  # Use and store the rendered trees in the project git, see: manageprojects.rendered_refs
 ) -> Optional[GenerateTemplatePatchResult]:
     """
     Create git diff/patch from cookiecutter template changes.
+    With `store=False` nothing is written into the project git repository: No objects and no refs.
     """
     print(f'Generate update patch for project: {project_path} from {template}')
     project_name = project_path.name
@@ -97,88 +99,117 @@ def generate_template_patch(
     if not extra_context:
         print('WARNING: No "cookiecutter" in replay context!')
 
-    with TemporaryDirectory(prefix=f'manageprojects_{project_name}_', cleanup=cleanup) as temp_path:
-
-        #############################################################################
-        # Generate the cookiecutter template in the current/HEAD version:
-
-        compiled_to_path = temp_path / 'to_rev_compiled'
-        print(f'Compile cookiecutter template in the current version here: {compiled_to_path}')
-        print('Use extra context:')
-        print(extra_context)
-        to_rev_context, to_rev_dst_path, to_rev_repo_path = execute_cookiecutter(
+    if not repo_path:
+        repo_path = get_repo_path(
             template=template,
             directory=directory,
-            output_dir=compiled_to_path,
-            no_input=no_input,
-            extra_context=extra_context,
             checkout=None,  # Checkout HEAD/main revision
             password=password,
             config_file=config_file,
         )
+    assert_is_dir(repo_path)
 
-        assert_is_dir(to_rev_repo_path)
-        assert to_rev_dst_path.parent == compiled_to_path
+    #############################################################################
+    # Get the current git commit hash and date:
 
-        #############################################################################
-        # Get the current git commit hash and date:
-
-        git = Git(cwd=to_rev_repo_path, detect_root=True)
-        to_rev = git.get_current_hash(verbose=False)
-        to_commit_date = git.get_commit_date(verbose=False)
-        print(f'Update from rev. {from_rev} to rev. {to_rev} ({to_commit_date})')
-
-        if from_rev == to_rev:
-            print(
-                f'Latest version {from_rev!r}'
-                f' from {to_commit_date} is already applied.'
-                ' Nothing to update, ok.'
-            )
-            return None
+    git = get_git(repo_path)
+    to_rev = git.get_current_hash(verbose=False)
+    to_commit_date = git.get_commit_date(verbose=False)
+    print(f'Update from rev. {from_rev} to rev. {to_rev} ({to_commit_date})')
+
+    if from_rev == to_rev:
+        print(
+            f'Latest version {from_rev!r}'
+            f' from {to_commit_date} is already applied.'
+            ' Nothing to update, ok.'
+        )
+        return None
 
-        if 'github.com' in template:
-            print(f'Github compare: {template}/compare/{from_rev}...{to_rev}')
+    if 'github.com' in template:
+        print(f'Github compare: {template}/compare/{from_rev}...{to_rev}')
 
+    if not patch_file_path:
         patch_file_path = Path(
             project_path, '.manageprojects', 'patches', f'{from_rev}_{to_rev}.patch'
         )
-        print(f'Generate patch file: {patch_file_path}')
+    print(f'Generate patch file: {patch_file_path}')
+
+    project_git = get_project_git(project_path) if store else None
+    from_tree = None
+    if project_git:
+        if diff_engine == DIFF_ENGINE_GIT:
+            from_tree = get_rendered_tree(git=project_git, rev=from_rev)
+        else:
+            # The stored renders can only be compared via git: Render the old revision, too.
+            logger.info('Diff engine %r: Ignore the stored render of %s', diff_engine, from_rev)
+
+    with TemporaryDirectory(prefix=f'manageprojects_{project_name}_', cleanup=cleanup) as temp_path:
 
         #############################################################################
-        # Generate the cookiecutter template in the old version:
+        # Generate the cookiecutter template in the current and, if needed, in the old version:
 
-        compiled_from_path = temp_path / f'{from_rev}_compiled'
-        print(
-            'Compile cookiecutter template in the'
-            f' old {from_rev} version here: {compiled_from_path}'
-        )
+        compiled_to_path = temp_path / 'to_rev_compiled'
+        print(f'Compile cookiecutter template in the current version here: {compiled_to_path}')
+        revisions = {to_rev: compiled_to_path}
+        compiled_from_path: Optional[Path] = None
+        if from_tree:
+            print(f'Use the stored render of the old {from_rev} version: {from_tree}')
+        else:
+            compiled_from_path = temp_path / f'{from_rev}_compiled'
+            print(f'Compile cookiecutter template in the old {from_rev} version here: {compiled_from_path}')
+            revisions[from_rev] = compiled_from_path
         print('Use extra context:')
         print(extra_context)
-        from_rev_context, from_rev_dst_path, from_repo_path = execute_cookiecutter(
+        render_kwargs: dict[str, Any] = dict(
             template=template,
             directory=directory,
-            output_dir=compiled_from_path,
             no_input=no_input,
             extra_context=extra_context,
-            checkout=from_rev,  # Checkout the old revision
             password=password,
             config_file=config_file,
+            use_cache=use_cache,
+            link_mode=LINK_MODE_HARDLINK,  # The renders are only read
         )
-        assert_is_dir(from_repo_path)
-        assert from_repo_path == to_rev_repo_path
-        assert from_rev_dst_path.parent == compiled_from_path
+        results = None
+        if incremental and not from_tree:
+            results = execute_cookiecutter_incremental(
+                repo_path=repo_path, revisions=revisions, temp_path=temp_path, **render_kwargs
+            )
+        partial = results is not None
+        if results is None:
+            results = execute_cookiecutter_revisions(
+                repo_path=repo_path, revisions=revisions, temp_path=temp_path, **render_kwargs
+            )
+        to_rev_context, to_rev_dst_path, to_rev_repo_path = results[to_rev]
+        assert to_rev_dst_path.parent == compiled_to_path
+
+        to_tree = None
+        if project_git and not partial:
+            # Partial renders are not stored: They are no complete base for the next update
+            to_tree = write_rendered_tree(git=project_git, rendered_path=to_rev_dst_path)
 
         #############################################################################
         # Generate git patch between old and current version:
 
-        patch = make_git_diff(
-            temp_path=temp_path,
-            from_path=from_rev_dst_path,
-            to_path=to_rev_dst_path,
-            verbose=False,
-        )
+        if project_git and from_tree and to_tree:
+            patch = make_rendered_tree_diff(git=project_git, from_tree=from_tree, to_tree=to_tree)
+        else:
+            from_rev_context, from_rev_dst_path, from_repo_path = results[from_rev]
+            assert from_rev_dst_path.parent == compiled_from_path
+            if project_git and not partial:
+                # The old version is already applied: Store it for the next update
+                from_tree = write_rendered_tree(git=project_git, rendered_path=from_rev_dst_path)
+                store_rendered_tree(git=project_git, rev=from_rev, tree_hash=from_tree)
+
+            patch = make_diff(
+                temp_path=temp_path,
+                from_path=from_rev_dst_path,
+                to_path=to_rev_dst_path,
+                diff_engine=diff_engine,
+                verbose=False,
+            )
         if not patch:
-            print(f'No gif diff between {compiled_from_path} and {compiled_to_path} !')
+            print(f'No gif diff between {from_rev} and {to_rev} !')
             return None
 
         logger.info('Write patch file: %s', patch_file_path)
@@ -186,11 +217,12 @@ def generate_template_patch(
         patch_file_path.write_text(patch)
 
         return GenerateTemplatePatchResult(
-            repo_path=to_rev_repo_path,  # == from_repo_path
+            repo_path=repo_path,  # The template checkout itself is not changed
             patch_file_path=patch_file_path,
             from_rev=from_rev,
             compiled_from_path=compiled_from_path,
             to_rev=to_rev,
             to_commit_date=to_commit_date,
             compiled_to_path=compiled_to_path,
+            to_tree=to_tree,
         )
@@ -0,0 +1,197 @@
+"""
+    Persistent index of managed projects.
+
+    Directory trees are scanned for "pyproject.toml" files with a [manageprojects] table.
+    The meta information is stored in a local SQLite database, so other commands can
+    query it without parsing all TOML files again. A "pyproject.toml" is only parsed again,
+    if its modification time has changed.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import logging
+import os
+import sqlite3
+from collections.abc import Iterator
+from pathlib import Path
+
+from tomlkit.exceptions import ParseError
+
+from manageprojects.constants import SCAN_SKIP_DIR_NAMES
+from manageprojects.render_cache import canonical_hash
+from manageprojects.utilities.pyproject_toml import PyProjectToml
+from manageprojects.utilities.user_config import get_mp_cache_path
+
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS projects (
+    project_path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    managed INTEGER NOT NULL,
+    cookiecutter_template TEXT,
+    cookiecutter_directory TEXT,
+    initial_revision TEXT,
+    last_revision TEXT,
+    context_hash TEXT
+)
+'''
+COLUMNS = (
+    'project_path',
+    'cookiecutter_template',
+    'cookiecutter_directory',
+    'initial_revision',
+    'last_revision',
+    'context_hash',
+)
+
+
+def below_root_sql(root_path: Path) -> tuple[str, list]:
+    """
+    SQL condition to filter project paths below `root_path` (without LIKE wildcard problems)
+
+    >>> below_root_sql(Path('/foo'))[1]
+    ['/foo', 5, '/foo/']
+    >>> below_root_sql(Path('/'))[1]
+    ['/', 1, '/']
+    """
+    prefix = str(root_path).rstrip(os.sep) + os.sep
+    return '(project_path = ? OR substr(project_path, 1, ?) = ?)', [str(root_path), len(prefix), prefix]
+
+
+def iter_scan_dirs(root_path: Path) -> Iterator[tuple[Path, list[str]]]:
+    """
+    Yields (directory path, file names) below `root_path`, without VCS, virtualenv etc. directories.
+    """
+    for dir_path, dir_names, file_names in os.walk(root_path):
+        dir_names[:] = sorted(name for name in dir_names if name not in SCAN_SKIP_DIR_NAMES)
+        yield Path(dir_path), file_names
+
+
+def read_project(project_path: Path, mtime_ns: int = 0) -> tuple:
+    """
+    Parse the "pyproject.toml" and returns the database row of the project.
+    """
+    try:
+        meta = PyProjectToml(project_path=project_path).get_mp_meta()
+    except (OSError, ParseError) as err:
+        logger.warning('Skip %s: %s', project_path, err)
+        return (str(project_path), mtime_ns, False, None, None, None, None, None)
+
+    managed = bool(meta.cookiecutter_template)
+    context_hash = canonical_hash(meta.cookiecutter_context) if meta.cookiecutter_context else None
+    return (
+        str(project_path),
+        mtime_ns,
+        managed,
+        meta.cookiecutter_template,
+        meta.cookiecutter_directory,
+        meta.initial_revision,
+        meta.get_last_git_hash() if managed else None,
+        context_hash,
+    )
+
+
+@dataclasses.dataclass
+class IndexedProject:
+    project_path: Path
+    cookiecutter_template: str | None  # CookieCutter Template path or GitHub url
+    cookiecutter_directory: str | None  # Directory name of the CookieCutter Template
+    initial_revision: str | None
+    last_revision: str | None  # The last applied template revision
+    context_hash: str | None  # Hash of the stored cookiecutter context
+
+    @classmethod
+    def from_project_path(cls, project_path: Path) -> IndexedProject | None:
+        """
+        Read the information directly from the "pyproject.toml" (without the index)
+        """
+        project_path, mtime_ns, managed, *values = read_project(project_path)
+        if managed:
+            return cls(Path(project_path), *values)
+        return None
+
+
+class ProjectIndex:
+    """
+    SQLite index of managed projects, stored in the manageprojects user cache directory.
+    """
+
+    def __init__(self, db_path: Path | None = None):
+        if db_path is None:
+            db_path = get_mp_cache_path() / 'projects.sqlite3'
+        self.db_path = db_path
+        self.connection = sqlite3.connect(db_path)
+        self.connection.execute(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def scan(self, root_path: Path) -> list[IndexedProject]:
+        """
+        Add/update/remove all projects below `root_path` and return the managed ones.
+        """
+        root_path = root_path.resolve()
+        condition, args = below_root_sql(root_path)
+        known = dict(self.connection.execute(f'SELECT project_path, mtime_ns FROM projects WHERE {condition}', args))
+
+        seen = set()
+        updated_rows = []
+        for dir_path, file_names in iter_scan_dirs(root_path):
+            if 'pyproject.toml' not in file_names:
+                continue
+            project_path = str(dir_path)
+            seen.add(project_path)
+            try:
+                mtime_ns = Path(dir_path, 'pyproject.toml').stat().st_mtime_ns
+            except OSError:
+                continue
+            if known.get(project_path) != mtime_ns:
+                updated_rows.append(read_project(dir_path, mtime_ns))
+
+        removed = [(project_path,) for project_path in known.keys() - seen]
+        with self.connection:
+            self.connection.executemany('INSERT OR REPLACE INTO projects VALUES (?,?,?,?,?,?,?,?)', updated_rows)
+            self.connection.executemany('DELETE FROM projects WHERE project_path = ?', removed)
+        logger.info(
+            'Scan %s: %i pyproject.toml found, %i (re-)indexed, %i removed',
+            root_path,
+            len(seen),
+            len(updated_rows),
+            len(removed),
+        )
+        return self.get_projects(root_path=root_path)
+
+    def get_projects(
+        self,
+        *,
+        root_path: Path | None = None,  # Only projects below this directory
+        template: str | None = None,  # Only projects of this Cookiecutter template
+    ) -> list[IndexedProject]:
+        """
+        Query the managed projects from the index, without reading any "pyproject.toml"
+        """
+        query = f'SELECT {", ".join(COLUMNS)} FROM projects WHERE managed'
+        args = []
+        if root_path:
+            condition, condition_args = below_root_sql(root_path.resolve())
+            query += f' AND {condition}'
+            args += condition_args
+        if template:
+            query += ' AND cookiecutter_template = ?'
+            args.append(template)
+        query += ' ORDER BY project_path'
+
+        return [
+            IndexedProject(Path(project_path), *values)
+            for project_path, *values in self.connection.execute(query, args)
+        ]
@@ -0,0 +1,209 @@
+"""
+    Persistent cache of rendered cookiecutter templates.
+
+    A render is identified by the template, the resolved git commit hash, the template directory
+    and the cookiecutter context. The same (template, revision, context) will always produce the
+    same files, so there is no need to run cookiecutter again.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+from cli_base.cli_tools.git import NoGitRepoError
+
+from manageprojects.constants import (
+    LINK_MODE_COPY,
+    LINK_MODE_REFLINK,
+    RENDER_CACHE_MAX_BYTES,
+    RENDER_CACHE_MAX_ENTRIES,
+)
+from manageprojects.template_worktree import get_git
+from manageprojects.utilities.file_links import LinkingShutil
+from manageprojects.utilities.user_config import get_mp_cache_path
+
+
+logger = logging.getLogger(__name__)
+
+META_FILE_NAME = 'meta.json'
+TREE_DIR_NAME = 'tree'
+
+
+def canonical_hash(data) -> str:
+    """
+    Hash of JSON serializable data, independent of the dict order.
+    """
+    raw = json.dumps(data, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(raw.encode('UTF-8')).hexdigest()
+
+
+def get_template_git_hash(repo_path: Path) -> str | None:
+    """
+    Returns the full commit hash of the template checkout.
+    None, if it's not a git repository or if it contains uncommitted changes,
+    because then the hash doesn't describe the template content.
+    """
+    try:
+        git = get_git(repo_path)
+    except NoGitRepoError:
+        logger.info('Template %s is not a git repository: Skip render cache.', repo_path)
+        return None
+
+    if git.status(verbose=False):
+        logger.info('Template %s contains uncommitted changes: Skip render cache.', git.cwd)
+        return None
+
+    output = git.git_verbose_check_output('rev-parse', 'HEAD', verbose=False)
+    return output.strip()
+
+
+def get_cache_key(*, template: str, git_hash: str, directory: str | None, context: dict) -> str:
+    return canonical_hash(
+        {
+            'template': template,
+            'git_hash': git_hash,
+            'directory': directory,
+            'context': context,
+        }
+    )
+
+
+@dataclasses.dataclass
+class CachedRender:
+    cookiecutter_context: dict
+    destination_path: Path
+
+
+class RenderCache:
+    """
+    Store rendered template trees under the manageprojects user cache directory.
+    The least recently used entries will be removed, if the size limits are exceeded.
+    """
+
+    def __init__(
+        self,
+        cache_path: Path | None = None,
+        max_bytes: int = RENDER_CACHE_MAX_BYTES,
+        max_entries: int = RENDER_CACHE_MAX_ENTRIES,
+    ):
+        if cache_path is None:
+            cache_path = get_mp_cache_path() / 'renders'
+        self.cache_path = cache_path
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+
+    def get_tree(self, *, key: str) -> CachedRender | None:
+        """
+        Returns the cached render in the cache itself, without a copy, or None on cache miss.
+        The files must not be modified!
+        """
+        entry_path = self.cache_path / key
+        meta_path = entry_path / META_FILE_NAME
+        try:
+            meta = json.loads(meta_path.read_text(encoding='UTF-8'))
+            tree_path = entry_path / TREE_DIR_NAME / meta['destination_name']
+            os.utime(meta_path)  # Mark as recently used
+        except (OSError, ValueError, KeyError) as err:
+            # e.g.: Not cached or removed by a other process in the meantime
+            logger.debug('Render cache miss for %s: %s', key, err)
+            return None
+
+        logger.info('Render cache hit for %s: %s', key, tree_path)
+        return CachedRender(cookiecutter_context=meta['cookiecutter_context'], destination_path=tree_path)
+
+    def get(self, *, key: str, output_dir: Path, link_mode: str = LINK_MODE_COPY) -> CachedRender | None:
+        """
+        Copy the cached render into `output_dir` (like cookiecutter would do) or return None on cache miss.
+        Hardlinked files (see: manageprojects.utilities.file_links) must not be modified!
+        """
+        if not (cached_render := self.get_tree(key=key)):
+            return None
+
+        destination_path = output_dir / cached_render.destination_path.name
+        try:
+            shutil.copytree(
+                src=cached_render.destination_path,
+                dst=destination_path,
+                symlinks=True,
+                dirs_exist_ok=True,
+                copy_function=LinkingShutil(link_mode).copy2,
+            )
+        except OSError as err:
+            # e.g.: Removed by a other process in the meantime
+            logger.debug('Render cache miss for %s: %s', key, err)
+            # Don't leave a incomplete copy, cookiecutter will not overwrite it
+            shutil.rmtree(destination_path, ignore_errors=True)
+            return None
+
+        cookiecutter_context = cached_render.cookiecutter_context
+        if 'cookiecutter' in cookiecutter_context:
+            cookiecutter_context['cookiecutter']['_output_dir'] = str(output_dir.resolve())
+
+        return CachedRender(cookiecutter_context=cookiecutter_context, destination_path=destination_path)
+
+    def store(self, *, key: str, cookiecutter_context: dict, destination_path: Path) -> None:
+        self.cache_path.mkdir(parents=True, exist_ok=True)
+        entry_path = self.cache_path / key
+        if entry_path.exists():
+            return
+
+        # Build the entry in a temp directory and rename it, so concurrent processes never see a half-written entry:
+        temp_path = Path(tempfile.mkdtemp(prefix=f'.{key}_', dir=self.cache_path))
+        shutil.copytree(
+            src=destination_path,
+            dst=temp_path / TREE_DIR_NAME / destination_path.name,
+            symlinks=True,
+            # The render may contain hardlinks to the template: The cache needs own files
+            copy_function=LinkingShutil(LINK_MODE_REFLINK).copy2,
+        )
+        size = sum(path.lstat().st_size for path in temp_path.rglob('*') if not path.is_dir())
+        meta = {
+            'destination_name': destination_path.name,
+            'cookiecutter_context': cookiecutter_context,
+            'size': size,
+        }
+        Path(temp_path, META_FILE_NAME).write_text(json.dumps(meta, default=str), encoding='UTF-8')
+        try:
+            os.rename(temp_path, entry_path)
+        except OSError:
+            # Stored by a other process in the meantime
+            shutil.rmtree(temp_path, ignore_errors=True)
+        else:
+            logger.info('Store %s (%i Bytes) in render cache: %s', destination_path, size, entry_path)
+
+        self.evict()
+
+    def iter_entries(self):
+        """
+        Yields (last used timestamp, size, path) of all cache entries.
+        """
+        for entry_path in self.cache_path.iterdir():
+            meta_path = entry_path / META_FILE_NAME
+            try:
+                last_used = meta_path.stat().st_mtime
+                size = json.loads(meta_path.read_text(encoding='UTF-8'))['size']
+            except (OSError, ValueError, KeyError):
+                continue
+            yield last_used, size, entry_path
+
+    def evict(self) -> None:
+        """
+        Remove the least recently used entries, until the cache fits into the size limits.
+        """
+        entries = sorted(self.iter_entries(), reverse=True)  # Most recently used first
+        total_size = 0
+        exceeded = False
+        for count, (_, size, entry_path) in enumerate(entries, start=1):
+            total_size += size
+            if count > self.max_entries or total_size > self.max_bytes:
+                exceeded = True
+            if exceeded:
+                logger.info('Remove %s from render cache', entry_path)
+                shutil.rmtree(entry_path, ignore_errors=True)
@@ -0,0 +1,81 @@
+"""
+    Manifest of the last rendered template output, that was written into the project by "overwrite".
+
+    The manifest is stored in the project and records the git blob hash of every rendered file.
+    The next "overwrite" skips all files with the same hash in the new render, without reading
+    the project files. Project files that differ from the last render were modified by the user:
+    They are reported and not overwritten.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from pathlib import Path
+
+from cli_base.cli_tools.git import Git
+
+from manageprojects.constants import RENDER_MANIFEST_PATH
+from manageprojects.rendered_refs import get_rendered_tree
+from manageprojects.tree_diff import get_blob_hash
+
+
+logger = logging.getLogger(__name__)
+
+
+def read_render_manifest(project_path: Path) -> dict:
+    manifest_path = project_path / RENDER_MANIFEST_PATH
+    try:
+        return json.loads(manifest_path.read_text(encoding='UTF-8'))
+    except FileNotFoundError:
+        logger.info('No render manifest %s', manifest_path)
+    except (OSError, ValueError) as err:
+        logger.warning('Ignore broken render manifest %s: %s', manifest_path, err)
+    return {}
+
+
+def dump_render_manifest(*, rev: str, files: dict[str, str]) -> bytes:
+    """
+    Returns the manifest content, that will be written to RENDER_MANIFEST_PATH in the project.
+    """
+    logger.info('Render manifest of rev. %s with %i files', rev, len(files))
+    manifest = dict(rev=rev, files=files)
+    return json.dumps(manifest, indent=1, sort_keys=True).encode('UTF-8')
+
+
+def get_tree_blob_hashes(*, git: Git, tree_hash: str) -> dict[str, str]:
+    """
+    Returns the relative path -> git blob hash of all files of a tree object.
+    """
+    output: str = git.git_verbose_check_output('ls-tree', '-r', '-z', tree_hash, verbose=False)
+    blob_hashes = {}
+    for line in filter(None, output.split('\0')):
+        info, file_name = line.split('\t', 1)
+        mode, object_type, blob_hash = info.split(' ')
+        blob_hashes[file_name] = blob_hash
+    return blob_hashes
+
+
+def get_last_render_hashes(*, project_path: Path, project_git: Git | None, from_rev: str) -> dict[str, str]:
+    """
+    Returns the blob hashes of the render of `from_rev`, that is applied to the project.
+    Use the manifest or the stored render of this revision (see: manageprojects.rendered_refs).
+    Returns a empty dict, if it's unknown.
+    """
+    manifest = read_render_manifest(project_path)
+    if manifest.get('rev') == from_rev:
+        return manifest.get('files', {})
+    if manifest:
+        logger.info('Render manifest is from rev. %s and not from %s', manifest.get('rev'), from_rev)
+
+    if project_git and (tree_hash := get_rendered_tree(git=project_git, rev=from_rev)):
+        logger.info('Use the stored render %s of rev. %s', tree_hash, from_rev)
+        return get_tree_blob_hashes(git=project_git, tree_hash=tree_hash)
+    return {}
+
+
+def get_file_blob_hash(file_path: Path) -> str:
+    if file_path.is_symlink():
+        return get_blob_hash(os.fsencode(os.readlink(file_path)))
+    return get_blob_hash(file_path.read_bytes())
@@ -0,0 +1,172 @@
+"""
+    Store the rendered template of every applied revision in the project's own git repository.
+
+    The rendered files are written as a git tree object and referenced by a private ref,
+    e.g.: "refs/manageprojects/rendered/<rev>". The next update only needs to render the new
+    revision and can diff both trees with git plumbing.
+    Only the ref of the last applied revision is kept. The blobs of the old render are in the
+    project repository, so "git apply --3way" finds the base files, too.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import subprocess
+import tempfile
+import zlib
+from collections.abc import Mapping
+from pathlib import Path
+
+from cli_base.cli_tools.git import Git
+
+from manageprojects.constants import RENDERED_REFS_PREFIX
+from manageprojects.template_worktree import find_git_root
+from manageprojects.tree_diff import TreeFile
+
+
+logger = logging.getLogger(__name__)
+
+
+def get_project_git(project_path: Path) -> Git | None:
+    """
+    Returns the Git instance, if `project_path` is the root of a git repository.
+    """
+    if find_git_root(project_path) != project_path.resolve():
+        logger.info('%s is not the root of a git repository: Skip rendered refs.', project_path)
+        return None
+    return Git(cwd=project_path, detect_root=False)
+
+
+def get_rendered_ref(rev: str) -> str:
+    return f'{RENDERED_REFS_PREFIX}/{rev}'
+
+
+def write_rendered_tree(*, git: Git, rendered_path: Path) -> str:
+    """
+    Write all files from `rendered_path` as tree object into the repository of `git`
+    and returns the tree hash. The index and the work tree of the project are not touched.
+    """
+    git_dir = git.git_verbose_check_output('rev-parse', '--absolute-git-dir', verbose=False).strip()
+    render_git = Git(cwd=rendered_path, detect_root=False)
+    with tempfile.TemporaryDirectory(prefix='manageprojects_index_') as temp_dir:
+        extra_env = {'GIT_INDEX_FILE': str(Path(temp_dir, 'index'))}
+        git_args = ('--git-dir', git_dir, '--work-tree', rendered_path)
+        render_git.git_verbose_check_output(*git_args, 'add', '--all', '.', verbose=False, extra_env=extra_env)
+        output = render_git.git_verbose_check_output(*git_args, 'write-tree', verbose=False, extra_env=extra_env)
+    tree_hash = output.strip()
+    logger.info('Rendered files from %s written as tree %s', rendered_path, tree_hash)
+    return tree_hash
+
+
+def write_loose_object(objects_path: Path, tree_file: TreeFile) -> None:
+    """
+    Write the file content as zlib compressed loose git object, like "git hash-object -w" would do.
+    """
+    blob_hash = tree_file.blob_hash
+    object_path = objects_path / blob_hash[:2] / blob_hash[2:]
+    if object_path.exists():
+        return
+    object_path.parent.mkdir(exist_ok=True)
+    content = tree_file.content
+    data = zlib.compress(f'blob {len(content)}\0'.encode('ASCII') + content)
+    # Never leave a incomplete object, e.g. if a other process writes the same object:
+    fd, temp_name = tempfile.mkstemp(prefix='tmp_obj_', dir=object_path.parent)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    os.chmod(temp_name, 0o444)
+    os.replace(temp_name, object_path)
+
+
+def write_virtual_tree(*, git: Git, tree: Mapping[str, TreeFile]) -> str:
+    """
+    Write all files of a virtual tree as tree object into the repository of `git` and returns the tree hash.
+    The blobs are written directly, so the files are never written into a work tree.
+    """
+    object_format = git.git_verbose_check_output('rev-parse', '--show-object-format', verbose=False).strip()
+    objects_path = Path(git.git_verbose_check_output('rev-parse', '--git-path', 'objects', verbose=False).strip())
+    objects_path = git.cwd / objects_path  # The path may be relative to the work tree
+    index_info = []
+    for rel_path, tree_file in sorted(tree.items()):
+        if object_format == 'sha1':
+            write_loose_object(objects_path, tree_file)
+            blob_hash = tree_file.blob_hash
+        else:
+            # TreeFile.blob_hash is a SHA-1 hash: Let git hash and store the content
+            blob_hash = subprocess.check_output(
+                [git.git_bin, 'hash-object', '-w', '--stdin'], input=tree_file.content, cwd=git.cwd, env=git.env
+            ).decode('ASCII')
+            blob_hash = blob_hash.strip()
+        index_info.append(f'{tree_file.mode} {blob_hash}\t{rel_path}\0')
+
+    with tempfile.TemporaryDirectory(prefix='manageprojects_index_') as temp_dir:
+        env = dict(git.env, GIT_INDEX_FILE=str(Path(temp_dir, 'index')))
+        subprocess.run(
+            [git.git_bin, 'update-index', '-z', '--index-info'],
+            input=''.join(index_info).encode('UTF-8', 'surrogateescape'),
+            cwd=git.cwd,
+            env=env,
+            check=True,
+        )
+        output = subprocess.check_output([git.git_bin, 'write-tree'], cwd=git.cwd, env=env, text=True)
+    tree_hash = output.strip()
+    logger.info('Virtual tree with %i files written as tree %s', len(tree), tree_hash)
+    return tree_hash
+
+
+def read_blob(*, git: Git, blob_hash: str) -> bytes | None:
+    """
+    Returns the content of a blob object or None if it's not in the repository.
+    """
+    process = subprocess.run(
+        [git.git_bin, 'cat-file', 'blob', blob_hash], cwd=git.cwd, env=git.env, capture_output=True
+    )
+    if process.returncode != 0:
+        logger.info('Blob %s not found in %s', blob_hash, git.cwd)
+        return None
+    return process.stdout
+
+
+def store_rendered_tree(*, git: Git, rev: str, tree_hash: str) -> None:
+    """
+    Store the render of the last applied revision `rev`. The renders of all other revisions
+    are not needed anymore: Their refs are removed, so "git gc" can remove the objects.
+    """
+    ref = get_rendered_ref(rev)
+    logger.info('Store rendered tree %s as %s in %s', tree_hash, ref, git.cwd)
+    git.git_verbose_check_output('update-ref', ref, tree_hash, verbose=False)
+    prune_rendered_refs(git=git, keep_ref=ref)
+
+
+def prune_rendered_refs(*, git: Git, keep_ref: str) -> None:
+    output = git.git_verbose_check_output('for-each-ref', '--format=%(refname)', RENDERED_REFS_PREFIX, verbose=False)
+    for ref in output.splitlines():
+        if ref != keep_ref:
+            logger.info('Remove old rendered tree ref %s', ref)
+            git.git_verbose_check_output('update-ref', '-d', ref, verbose=False)
+
+
+def get_rendered_tree(*, git: Git, rev: str) -> str | None:
+    """
+    Returns the tree hash of the stored render of `rev` or None if it's not stored.
+    """
+    ref = get_rendered_ref(rev)
+    try:
+        output = git.git_verbose_check_output(
+            'rev-parse', '--verify', '--quiet', f'{ref}^{{tree}}', verbose=False, print_output_on_error=False
+        )
+    except subprocess.CalledProcessError:
+        logger.info('No rendered tree %s in %s', ref, git.cwd)
+        return None
+    return output.strip()
+
+
+def make_rendered_tree_diff(*, git: Git, from_tree: str, to_tree: str) -> str | None:
+    """
+    Create the git diff between two stored tree objects, without any checkout.
+    """
+    patch = git.diff(from_tree, to_tree, verbose=False)
+    if not patch:
+        logger.warning('No git diff between tree %s and %s !', from_tree, to_tree)
+        return None
+    return patch
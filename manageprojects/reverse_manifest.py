@@ -0,0 +1,113 @@
+"""
+    Manifest of a "reverse" run, to convert only the changed files in the next run.
+
+    The manifest is stored in the user cache directory, per destination path, and records for
+    every converted source file the git blob hash and the output path. Not in the destination:
+    It would be a part of the generated template and of every project created from it.
+    The next "reverse --overwrite" run skips all files with an unchanged blob hash,
+    if the reverse replacements are unchanged, too.
+    Outputs of removed source files are deleted.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from pathlib import Path
+
+from cli_base.cli_tools.git import Git
+
+import manageprojects
+from manageprojects.render_cache import canonical_hash
+from manageprojects.utilities.user_config import get_mp_cache_path
+
+
+logger = logging.getLogger(__name__)
+
+
+def get_reverse_info_hash(reverse_info: tuple) -> str:
+    """
+    Hash of the reverse replacements. The version is included, because the conversion may change.
+    """
+    return canonical_hash([manageprojects.__version__, reverse_info])
+
+
+def get_blob_hashes(git: Git) -> dict[Path, str]:
+    """
+    Returns the git blob hash of all tracked files via "git ls-files -s".
+    Files with changes in the work tree are hashed via "git hash-object".
+    """
+    output: str = git.git_verbose_check_output('ls-files', '-s', '-z', verbose=False)
+    blob_hashes = {}
+    for line in filter(None, output.split('\0')):
+        info, file_name = line.split('\t', 1)
+        mode, blob_hash, stage = info.split(' ')
+        blob_hashes[git.cwd / file_name] = blob_hash
+
+    output = git.git_verbose_check_output('ls-files', '-m', '-z', verbose=False)
+    modified_names: list[str] = sorted(set(filter(None, output.split('\0'))))
+    if modified_names:
+        modified_paths = [git.cwd / file_name for file_name in modified_names if Path(git.cwd, file_name).is_file()]
+        output = git.git_verbose_check_output('hash-object', '--', *modified_paths, verbose=False)
+        for file_path, blob_hash in zip(modified_paths, output.split()):
+            blob_hashes[file_path] = blob_hash
+    return blob_hashes
+
+
+def get_reverse_manifest_path(destination: Path) -> Path:
+    destination_hash = hashlib.sha256(str(destination.resolve()).encode('UTF-8')).hexdigest()[:16]
+    return get_mp_cache_path() / 'reverse_manifests' / f'{destination.name}_{destination_hash}.json'
+
+
+def read_reverse_manifest(destination: Path) -> dict:
+    manifest_path = get_reverse_manifest_path(destination)
+    try:
+        return json.loads(manifest_path.read_text(encoding='UTF-8'))
+    except FileNotFoundError:
+        logger.info('No reverse manifest %s: Convert all files', manifest_path)
+    except (OSError, ValueError) as err:
+        logger.warning('Ignore broken reverse manifest %s: %s', manifest_path, err)
+    return {}
+
+
+def get_unchanged_candidates(*, manifest: dict, reverse_info_hash: str) -> dict[str, dict]:
+    """
+    Returns the file entries of the last run, if the reverse replacements are unchanged.
+    """
+    if manifest and manifest.get('reverse_info_hash') != reverse_info_hash:
+        logger.info('Reverse replacements changed since the last run: Convert all files')
+        return {}
+    return manifest.get('files', {})
+
+
+def write_reverse_manifest(*, destination: Path, reverse_info_hash: str, files: dict[str, dict]) -> None:
+    manifest_path = get_reverse_manifest_path(destination)
+    logger.info('Write reverse manifest with %i files to %s', len(files), manifest_path)
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    manifest = dict(destination=str(destination), reverse_info_hash=reverse_info_hash, files=files)
+    manifest_path.write_text(json.dumps(manifest, indent=1, sort_keys=True), encoding='UTF-8')
+
+
+def remove_stale_outputs(*, destination: Path, old_files: dict[str, dict], new_files: dict[str, dict]) -> list[Path]:
+    """
+    Delete the outputs of the last run, that are not created anymore, e.g.: the source file was removed.
+    Empty directories are removed, too. Returns the deleted files.
+    """
+    new_outputs = {entry['output'] for entry in new_files.values()}
+    removed = []
+    for entry in old_files.values():
+        if entry['output'] in new_outputs:
+            continue
+        output_path = destination / entry['output']
+        if not output_path.is_file():
+            continue
+        print(f'Remove: {output_path}')
+        output_path.unlink()
+        removed.append(output_path)
+
+        parent = output_path.parent
+        while parent != destination and not any(parent.iterdir()):
+            parent.rmdir()
+            parent = parent.parent
+    return removed
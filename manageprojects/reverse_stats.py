@@ -0,0 +1,102 @@
+"""
+    Statistics of a "reverse" run: Which reverse key matched how often in which file
+    and how long the conversion of every file took.
+"""
+
+from __future__ import annotations
+
+import collections
+import dataclasses
+import json
+import logging
+from pathlib import Path
+
+from rich import print  # noqa
+from rich.table import Table
+
+from manageprojects.constants import REVERSE_STATS_TOP
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass
+class ReverseFileStats:
+    source: str  # Path relative to the source project
+    binary: bool  # Copied without replacements?
+    duration: float  # Conversion time in seconds
+    hits: dict[str, int]  # Reverse key, e.g.: '{{ cookiecutter.package_name }}' -> number of replacements
+
+
+@dataclasses.dataclass
+class ReverseStats:
+    files: list[ReverseFileStats] = dataclasses.field(default_factory=list)
+    skipped: int = 0  # Unchanged files, see: manageprojects.reverse_manifest
+    duration: float = 0  # Complete conversion time in seconds
+
+    def get_report(self, top: int = REVERSE_STATS_TOP) -> dict:
+        key_hits: collections.Counter[str] = collections.Counter()
+        key_files: collections.Counter[str] = collections.Counter()
+        for file_stats in self.files:
+            key_hits.update(file_stats.hits)
+            key_files.update(file_stats.hits.keys())
+
+        files_by_time = sorted(self.files, key=lambda file_stats: file_stats.duration, reverse=True)
+        return dict(
+            files=len(self.files),
+            binary_files=sum(file_stats.binary for file_stats in self.files),
+            skipped_files=self.skipped,
+            duration=round(self.duration, 4),
+            hits=sum(key_hits.values()),
+            top_files_by_time=[
+                dict(
+                    source=file_stats.source,
+                    duration=round(file_stats.duration, 4),
+                    hits=sum(file_stats.hits.values()),
+                )
+                for file_stats in files_by_time[:top]
+            ],
+            top_keys_by_hits=[
+                dict(key=key, hits=hits, files=key_files[key]) for key, hits in key_hits.most_common(top)
+            ],
+            # Text files that could be copied verbatim:
+            zero_match_files=sorted(
+                file_stats.source for file_stats in self.files if not file_stats.binary and not file_stats.hits
+            ),
+        )
+
+    def write_json(self, file_path: Path, top: int = REVERSE_STATS_TOP) -> None:
+        logger.info('Write reverse statistics to %s', file_path)
+        file_path.write_text(json.dumps(self.get_report(top=top), indent=2), encoding='UTF-8')
+
+    def print_report(self, top: int = REVERSE_STATS_TOP) -> None:
+        report = self.get_report(top=top)
+
+        table = Table(title=f'Top {top} files by time')
+        table.add_column('File')
+        table.add_column('Seconds', justify='right')
+        table.add_column('Hits', justify='right')
+        for info in report['top_files_by_time']:
+            table.add_row(info['source'], f'{info["duration"]:.4f}', str(info['hits']))
+        print(table)
+
+        table = Table(title=f'Top {top} reverse keys by hits')
+        table.add_column('Key')
+        table.add_column('Hits', justify='right')
+        table.add_column('Files', justify='right')
+        for info in report['top_keys_by_hits']:
+            table.add_row(info['key'], str(info['hits']), str(info['files']))
+        print(table)
+
+        zero_match_files = report['zero_match_files']
+        print(f'{len(zero_match_files)} text files without any match:')
+        for source in zero_match_files[:top]:
+            print(f' * {source}')
+        if len(zero_match_files) > top:
+            print(f' ... and {len(zero_match_files) - top} more')
+
+        print(
+            f'{report["files"]} files converted in {report["duration"]:.2f}s'
+            f' ({report["binary_files"]} binary, {report["skipped_files"]} unchanged skipped),'
+            f' {report["hits"]} replacements'
+        )
@@ -0,0 +1,146 @@
+"""
+    Cache of remote git templates: One bare mirror per template URL in the manageprojects cache.
+
+    The mirror is only fetched, if the last fetch is older than the TTL or if the requested revision
+    is missing. Every commit is checked out into a own "git worktree" of the mirror, next to it.
+    A worktree is never changed after it's created, so parallel renders can read it without a lock.
+    Only the worktrees of the last used commits are kept, see: TEMPLATE_MIRROR_MAX_WORKTREES
+    In contrast to cookiecutter's "cookiecutters_dir", the template is never cloned again.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import re
+import shutil
+import subprocess
+import time
+from pathlib import Path
+
+from cli_base.cli_tools.git import Git
+
+from manageprojects.constants import TEMPLATE_MIRROR_MAX_WORKTREES, TEMPLATE_MIRROR_TTL
+from manageprojects.template_worktree import file_lock, worktree_lock
+from manageprojects.utilities.user_config import get_mp_cache_path
+
+
+logger = logging.getLogger(__name__)
+
+FETCH_STAMP_FILE_NAME = 'manageprojects_fetched'
+
+
+def get_repo_name(repo_url: str) -> str:
+    """
+    >>> get_repo_name('https://github.com/jedie/cookiecutter_templates/')
+    'cookiecutter_templates'
+    >>> get_repo_name('git@github.com:jedie/mp_test_template1.git')
+    'mp_test_template1'
+    """
+    name = re.split('[/:]', repo_url.rstrip('/'))[-1]
+    return name.removesuffix('.git')
+
+
+class TemplateMirror:
+    """
+    The bare mirror of `repo_url` and the checkouts of it.
+    The checkout directories have the same name as the repository, like a cookiecutter clone.
+    """
+
+    def __init__(
+        self,
+        repo_url: str,
+        cache_path: Path | None = None,
+        max_worktrees: int = TEMPLATE_MIRROR_MAX_WORKTREES,
+    ):
+        self.repo_url = repo_url
+        self.max_worktrees = max_worktrees
+        repo_name = get_repo_name(repo_url)
+        url_hash = hashlib.sha256(repo_url.encode('UTF-8')).hexdigest()[:12]
+        base_path = (cache_path or get_mp_cache_path() / 'template_mirrors') / f'{repo_name}_{url_hash}'
+        self.mirror_path = base_path / 'mirror.git'
+        self.worktrees_path = base_path / 'worktrees'
+        self.repo_name = repo_name
+        self.lock_path = base_path / 'manageprojects_mirror.lock'
+        self.git = Git(cwd=self.mirror_path, detect_root=False)
+
+    def get_fetch_age(self) -> float | None:
+        """
+        Seconds since the last clone/fetch or None if the mirror doesn't exist.
+        """
+        try:
+            return time.time() - Path(self.mirror_path, FETCH_STAMP_FILE_NAME).stat().st_mtime
+        except FileNotFoundError:
+            return None
+
+    def has_revision(self, rev: str) -> bool:
+        try:
+            self.git.git_verbose_check_output(
+                'rev-parse', '--verify', '--quiet', f'{rev}^{{commit}}', verbose=False, print_output_on_error=False
+            )
+        except subprocess.CalledProcessError:
+            return False
+        return True
+
+    def update(self, *, checkout: str | None, ttl: int) -> None:
+        """
+        Clone the mirror, if not exists. Fetch it, if it's too old or `checkout` is missing.
+        Raise CalledProcessError on git errors, e.g.: the repository is not reachable.
+        """
+        fetch_age = self.get_fetch_age()
+        if fetch_age is None:
+            logger.info('Create template mirror of %s in %s', self.repo_url, self.mirror_path)
+            self.mirror_path.parent.mkdir(parents=True, exist_ok=True)
+            Git(cwd=self.mirror_path.parent, detect_root=False).git_verbose_check_output(
+                'clone', '--mirror', '--quiet', self.repo_url, self.mirror_path, verbose=False
+            )
+        elif fetch_age > ttl or (checkout and not self.has_revision(checkout)):
+            logger.info('Fetch template mirror %s (last fetch %i sec. ago)', self.mirror_path, fetch_age)
+            self.git.git_verbose_check_output('fetch', '--prune', '--quiet', verbose=False)
+        else:
+            logger.info('Use template mirror %s (last fetch %i sec. ago)', self.mirror_path, fetch_age)
+            return
+        Path(self.mirror_path, FETCH_STAMP_FILE_NAME).touch()
+
+    def checkout_rev(self, rev: str) -> Path:
+        """
+        Returns the worktree of `rev`. It's created, if not exists.
+        The modification time of the commit directory is the last usage, see: evict_worktrees()
+        """
+        # Resolve the revision in the mirror: "HEAD" in the worktree is not the default branch
+        commit = self.git.git_verbose_check_output('rev-parse', '--verify', f'{rev}^{{commit}}', verbose=False).strip()
+        checkout_path = self.worktrees_path / commit / self.repo_name
+        if Path(checkout_path, '.git').exists():
+            logger.info('Use worktree of rev. %s (%s): %s', rev, commit, checkout_path)
+            os.utime(checkout_path.parent)
+        else:
+            logger.info('Add worktree of rev. %s (%s) of the template mirror here: %s', rev, commit, checkout_path)
+            with worktree_lock(self.git):
+                self.git.git_verbose_check_output('worktree', 'prune', verbose=False)
+                self.git.git_verbose_check_output('worktree', 'add', '--detach', checkout_path, commit, verbose=False)
+                self.evict_worktrees()
+        return checkout_path
+
+    def evict_worktrees(self) -> None:
+        """
+        Remove the least recently used worktrees, if there are more than `max_worktrees`.
+        """
+        commit_paths = sorted(self.worktrees_path.iterdir(), key=lambda path: path.stat().st_mtime, reverse=True)
+        for commit_path in commit_paths[self.max_worktrees:]:
+            logger.info('Remove least recently used worktree %s', commit_path)
+            checkout_path = commit_path / self.repo_name
+            if checkout_path.exists():
+                self.git.git_verbose_check_output('worktree', 'remove', '--force', checkout_path, verbose=False)
+            shutil.rmtree(commit_path, ignore_errors=True)
+        if len(commit_paths) > self.max_worktrees:
+            self.git.git_verbose_check_output('worktree', 'prune', verbose=False)
+
+    def get_checkout(self, *, checkout: str | None = None, ttl: int = TEMPLATE_MIRROR_TTL) -> Path:
+        """
+        Returns the checkout of `checkout` or of the default branch, if None.
+        """
+        self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+        with file_lock(self.lock_path):
+            self.update(checkout=checkout, ttl=ttl)
+            return self.checkout_rev(checkout or 'HEAD')
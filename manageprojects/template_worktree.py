@@ -0,0 +1,117 @@
+"""
+    Check out template revisions into temporary "git worktree" directories.
+
+    The checkout of the template repository (e.g.: the clone in "cookiecutters_dir") is never changed,
+    so different revisions can be rendered at the same time.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import logging
+import subprocess
+from pathlib import Path
+
+from cli_base.cli_tools.git import Git, NoGitRepoError
+
+
+logger = logging.getLogger(__name__)
+
+
+def find_git_root(path: Path) -> Path | None:
+    """
+    Returns the root of the git checkout that contains `path`.
+    In contrast to cli_base.cli_tools.git.get_git_root() this also detects "git worktree" checkouts,
+    because they contain a ".git" file instead of a directory.
+    """
+    path = path.resolve()
+    for candidate in (path, *path.parents):
+        if Path(candidate, '.git').exists():
+            return candidate
+    return None
+
+
+def get_git(path: Path) -> Git:
+    git_root = find_git_root(path)
+    if not git_root:
+        raise NoGitRepoError(path)
+    return Git(cwd=git_root, detect_root=False)
+
+
+def get_changed_template_files(*, git: Git, repo_path: Path, from_rev: str, to_rev: str) -> list[str]:
+    """
+    Returns the changed files between two template revisions, in the template directory only.
+    A renamed file is returned with the old and the new name.
+    """
+    template_dir = repo_path.resolve().relative_to(git.cwd.resolve())
+    output = git.git_verbose_check_output(
+        'diff', '--name-only', '--no-renames', from_rev, to_rev, '--', str(template_dir), verbose=False
+    )
+    return output.splitlines()
+
+
+@contextlib.contextmanager
+def file_lock(lock_path: Path):
+    """
+    Exclusive lock between processes via flock() on `lock_path`. No locking, if fcntl is not available.
+    """
+    try:
+        import fcntl
+    except ImportError:  # e.g.: Windows
+        yield
+        return
+
+    with lock_path.open('w') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+@contextlib.contextmanager
+def worktree_lock(git: Git):
+    """
+    Serialize "git worktree add/remove" of one repository between processes (e.g.: update-fleet workers).
+    Concurrent calls race on the ".git/worktrees/" administrative files.
+    """
+    git_common_dir = git.git_verbose_check_output('rev-parse', '--git-common-dir', verbose=False).strip()
+    with file_lock(Path(git.cwd, git_common_dir, 'manageprojects_worktree.lock')):
+        yield
+
+
+class TemplateWorktree:
+    """
+    Add a detached "git worktree" of `rev` into `temp_path` and remove it on exit.
+    The checkout directory has the same name as the repository, because cookiecutter
+    uses it e.g. for the replay file name.
+    """
+
+    def __init__(self, *, repo_path: Path, rev: str, temp_path: Path):
+        self.git = get_git(repo_path)
+        self.rev = rev
+        self.worktree_path = temp_path / f'{rev}_worktree' / self.git.cwd.name
+
+        # e.g.: The "directory" of a multi template repository:
+        self.template_path = self.worktree_path / repo_path.resolve().relative_to(self.git.cwd)
+
+    def __enter__(self) -> Path:
+        """
+        Returns the template path in the worktree (same relative path as `repo_path` in the main checkout)
+        """
+        logger.info('Add git worktree for rev. %s here: %s', self.rev, self.worktree_path)
+        self.worktree_path.parent.mkdir(parents=True, exist_ok=True)
+        with worktree_lock(self.git):
+            self.git.git_verbose_check_output(
+                'worktree', 'add', '--detach', self.worktree_path, self.rev, verbose=False, exit_on_error=True
+            )
+        return self.template_path
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        logger.info('Remove git worktree %s', self.worktree_path)
+        try:
+            with worktree_lock(self.git):
+                self.git.git_verbose_check_output('worktree', 'remove', '--force', self.worktree_path, verbose=False)
+        except subprocess.CalledProcessError as err:
+            logger.warning('Remove git worktree %s failed: %s', self.worktree_path, err)
+        return False
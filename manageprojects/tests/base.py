@@ -1,9 +1,11 @@
 import datetime
+import os
 import shutil
+import tempfile
 from collections.abc import Iterable
 from pathlib import Path
 from pprint import pprint
-from unittest import TestCase
+from unittest import TestCase, mock
 
 from bx_py_utils.path import assert_is_file
 
@@ -16,6 +18,15 @@ GIT_BIN_PARENT = Path(shutil.which('git')).parent
 class BaseTestCase(TestCase):
     maxDiff = None
 
+    def setUp(self):
+        super().setUp()
+        # Never fill the real user cache (renders, template mirrors, project index, Jinja bytecode):
+        cache_path = tempfile.mkdtemp(prefix='manageprojects_test_cache_')
+        self.addCleanup(shutil.rmtree, cache_path, ignore_errors=True)
+        env_patch = mock.patch.dict(os.environ, {'XDG_CACHE_HOME': cache_path})
+        env_patch.start()
+        self.addCleanup(env_patch.stop)
+
     def assert_toml(self, path: Path, expected: dict):
         toml_document: TomlDocument = get_toml_document(path)
         got = toml_document.doc.unwrap()  # TOMLDocument -> dict
@@ -0,0 +1,79 @@
+import json
+import os
+import shutil
+from pathlib import Path
+from unittest import mock
+
+from cli_base.cli_tools.test_utils.logs import AssertLogs
+from jinja2 import DictLoader, Environment
+
+from manageprojects.bytecode_cache import ContentBytecodeCache
+from manageprojects.cookiecutter_api import execute_cookiecutter
+from manageprojects.tests.base import BaseTestCase
+from manageprojects.utilities.temp_path import TemporaryDirectory
+
+
+class BytecodeCacheTestCase(BaseTestCase):
+    def test_content_bytecode_cache(self):
+        with TemporaryDirectory(prefix='test_content_bytecode_cache_') as main_temp_path:
+            bytecode_cache = ContentBytecodeCache(directory=main_temp_path / 'cache')
+
+            def render(templates: dict, **env_kwargs) -> str:
+                env = Environment(loader=DictLoader(templates), bytecode_cache=bytecode_cache, **env_kwargs)
+                return env.get_template('file.txt').render(value='Foo')
+
+            self.assertEqual(render({'file.txt': 'A: {{ value }}'}), 'A: Foo')
+            self.assertEqual((bytecode_cache.hits, bytecode_cache.misses), (0, 1))
+            self.assertEqual(render({'file.txt': 'A: {{ value }}'}), 'A: Foo')
+            self.assertEqual((bytecode_cache.hits, bytecode_cache.misses), (1, 1))
+
+            # Other content or other Jinja settings -> other compiled code:
+            self.assertEqual(render({'file.txt': 'B: {{ value }}'}), 'B: Foo')
+            self.assertEqual(
+                render({'file.txt': 'C: << value >>'}, variable_start_string='<<', variable_end_string='>>'),
+                'C: Foo',
+            )
+            self.assertEqual((bytecode_cache.hits, bytecode_cache.misses), (1, 3))
+            self.assertEqual(len(list(bytecode_cache_path_iter(main_temp_path / 'cache'))), 3)
+
+            # The least recently used entries are removed:
+            bytecode_cache.prune(max_entries=5)
+            self.assertEqual(len(list(bytecode_cache_path_iter(main_temp_path / 'cache'))), 3)
+            with AssertLogs(self, loggers=('manageprojects',)) as logs:
+                bytecode_cache.prune(max_entries=1)
+            logs.assert_in('Remove 2 old entries from Jinja bytecode cache')
+            self.assertEqual(len(list(bytecode_cache_path_iter(main_temp_path / 'cache'))), 1)
+
+    def test_execute_cookiecutter(self):
+        with TemporaryDirectory(prefix='test_execute_cookiecutter_bytecode_') as main_temp_path:
+            repo_path = main_temp_path / 'template1'
+            Path(repo_path, '{{cookiecutter.dir_name}}').mkdir(parents=True)
+            Path(repo_path, 'cookiecutter.json').write_text(json.dumps({'dir_name': 'a_dir', 'value': 'Foo'}))
+            Path(repo_path, '{{cookiecutter.dir_name}}', 'a_file.txt').write_text('Value: {{ cookiecutter.value }}')
+            Path(repo_path, '{{cookiecutter.dir_name}}', 'b_file.txt').write_text('{{ cookiecutter.dir_name }}')
+            # The same template in a other checkout:
+            shutil.copytree(repo_path, main_temp_path / 'template2')
+
+            Path(main_temp_path, 'cache').mkdir()
+            cache_env = {'XDG_CACHE_HOME': str(main_temp_path / 'cache')}
+            with mock.patch.dict(os.environ, cache_env):
+                with AssertLogs(self, loggers=('manageprojects',)) as logs:
+                    execute_cookiecutter(
+                        template=str(repo_path), output_dir=main_temp_path / 'output1', no_input=True
+                    )
+                logs.assert_in('Jinja bytecode cache: 0 hits, 2 misses')
+
+                with AssertLogs(self, loggers=('manageprojects',)) as logs:
+                    context, destination_path, _ = execute_cookiecutter(
+                        template=str(main_temp_path / 'template2'),
+                        output_dir=main_temp_path / 'output2',
+                        no_input=True,
+                        extra_context={'value': 'Bar'},
+                    )
+                logs.assert_in('Jinja bytecode cache: 2 hits, 0 misses')
+                self.assert_file_content(destination_path / 'a_file.txt', 'Value: Bar')
+                self.assert_file_content(destination_path / 'b_file.txt', 'a_dir')
+
+
+def bytecode_cache_path_iter(path: Path):
+    return path.glob('__jinja2_*.cache')
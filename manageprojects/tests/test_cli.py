@@ -12,6 +12,7 @@ from manageprojects.data_classes import CookiecutterResult
 from manageprojects.test_utils.click_cli_utils import invoke_click
 from manageprojects.test_utils.subprocess import SubprocessCallMock
 from manageprojects.tests.base import BaseTestCase
+from manageprojects.update_plan import UpdatePlan
 
 
 class CliTestCase(BaseTestCase):
@@ -64,6 +65,10 @@ class CliTestCase(BaseTestCase):
             config_file=None,
             cleanup=True,
             input=False,
+            diff_engine='git',
+            use_cache=True,
+            incremental=False,
+            merge=False,
         )
         self.assert_in_content(
             got=stdout,
@@ -73,6 +78,22 @@ class CliTestCase(BaseTestCase):
             ),
         )
 
+    def test_update_project_plan_cli(self):
+        tempdir = tempfile.gettempdir()
+        update_plan = UpdatePlan(project_path=Path(tempdir), from_rev='1234', to_rev='5678', render_duration=1.5)
+        with mock.patch.object(cli_app, 'update_managed_project', MagicMock(return_value=update_plan)) as m:
+            stdout = invoke_click(update_project, '--plan', tempdir)
+        self.assertEqual(m.call_args.kwargs['plan'], True)
+        self.assert_in_content(
+            got=stdout,
+            parts=(
+                f'Plan update of project: "{tempdir}"...',
+                'Update plan from rev. 1234',
+                '0 files: 0 added, 0 removed, 0 modified',
+            ),
+        )
+        self.assertNotIn('updated, ok.', stdout)
+
     def test_install(self):
         with SubprocessCallMock() as call_mock:
             invoke_click(dev_cli, 'install')
@@ -1,7 +1,6 @@
 import inspect
 from pathlib import Path
 
-from bx_py_utils.path import assert_is_dir
 from cli_base.cli_tools.test_utils.logs import AssertLogs
 
 from manageprojects.cookiecutter_api import get_repo_path
@@ -24,7 +23,7 @@ class CookiecutterApiTestCase(BaseTestCase):
 
         self.assertIsInstance(repo_path, Path)
         self.assertEqual(repo_path.name, directory)
-        assert_is_dir(repo_path.parent / '.git')
+        self.assertTrue(Path(repo_path.parent, '.git').exists())  # A worktree of the template mirror
 
         test_file_path = Path(
             repo_path, '{{cookiecutter.dir_name}}', '{{cookiecutter.file_name}}.py'
@@ -48,7 +47,7 @@ class CookiecutterApiTestCase(BaseTestCase):
 
         self.assertIsInstance(repo_path, Path)
         self.assertEqual(repo_path.name, directory)
-        assert_is_dir(repo_path.parent / '.git')
+        self.assertTrue(Path(repo_path.parent, '.git').exists())  # A worktree of the template mirror
 
         test_file_path = Path(
             repo_path, '{{cookiecutter.dir_name}}', '{{cookiecutter.file_name}}.py'
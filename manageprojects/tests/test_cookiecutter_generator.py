@@ -1,12 +1,23 @@
+import collections
+import io
+import json
 from pathlib import Path
 
+from bx_py_utils.test_utils.redirect import RedirectOut
+from cli_base.cli_tools.test_utils.git_utils import init_git
+
 from manageprojects.cookiecutter_generator import (
     build_dst_path,
+    create_cookiecutter_template,
     generate_reverse_info,
     iter_context,
     replace_path,
+    replace_str,
+    replace_stream,
 )
+from manageprojects.reverse_manifest import get_reverse_manifest_path
 from manageprojects.tests.base import BaseTestCase
+from manageprojects.utilities.temp_path import TemporaryDirectory
 
 
 class CookiecutterGeneratorTestCase(BaseTestCase):
@@ -52,6 +63,92 @@ class CookiecutterGeneratorTestCase(BaseTestCase):
             ),
         )
 
+    def test_replace_str(self):
+        reverse_info = generate_reverse_info(
+            cookiecutter_context={
+                'cookiecutter': {
+                    'package_name': 'PyInventory',
+                    'package_url': 'https://github.com/jedie/PyInventory',
+                    'user': 'jedie',
+                    'name': 'cookiecutter',  # Is part of the inserted placeholders
+                    'empty': '',
+                    'list': ['foo', 'bar'],
+                }
+            }
+        )
+        self.assertEqual(
+            replace_str('See https://github.com/jedie/PyInventory by jedie: PyInventory', reverse_info=reverse_info),
+            (
+                'See {{ cookiecutter.package_url }} by {{ cookiecutter.user }}:'
+                ' {{ cookiecutter.package_name }}'
+            ),
+        )
+        self.assertEqual(
+            replace_str('A cookiecutter for PyInventory', reverse_info=reverse_info),
+            'A {{ cookiecutter.name }} for {{ cookiecutter.package_name }}',
+        )
+        self.assertEqual(replace_str('Nothing to replace', reverse_info=reverse_info), 'Nothing to replace')
+
+        hits = collections.Counter()
+        replace_str('PyInventory by jedie: PyInventory', reverse_info=reverse_info, hits=hits)
+        self.assertEqual(hits, {'{{ cookiecutter.package_name }}': 2, '{{ cookiecutter.user }}': 1})
+
+    def test_replace_stream(self):
+        reverse_info = generate_reverse_info(
+            cookiecutter_context={
+                'cookiecutter': {'full_name': 'foo_bar_baz', 'package_name': 'foo_bar', 'short': 'foo'},
+            }
+        )
+        content = 'foo_bar_baz foo_bar foo foo_ba foo_bar_bar\nfoo_bar_baz' * 3
+        expected = replace_str(content, reverse_info=reverse_info)
+        self.assertIn('{{ cookiecutter.package_name }} {{ cookiecutter.short }} {{ cookiecutter.short }}_ba', expected)
+
+        expected_hits = collections.Counter()
+        replace_str(content, reverse_info=reverse_info, hits=expected_hits)
+
+        # The result is independent of the chunk boundaries:
+        for chunk_size in range(1, len(content) + 2):
+            dst_file = io.StringIO()
+            hits = collections.Counter()
+            replace_stream(
+                io.StringIO(content), dst_file, reverse_info=reverse_info, chunk_size=chunk_size, hits=hits
+            )
+            self.assertEqual(dst_file.getvalue(), expected, f'{chunk_size=}')
+            self.assertEqual(hits, expected_hits, f'{chunk_size=}')
+
+        dst_file = io.StringIO()
+        replace_stream(io.StringIO(content), dst_file, reverse_info=(), chunk_size=7)
+        self.assertEqual(dst_file.getvalue(), content)
+
+    def test_replace_overlapping_values(self):
+        reverse_info = generate_reverse_info(cookiecutter_context={'cookiecutter': {'a': 'bcd', 'b': 'ab'}})
+        # The longest value wins, even if a shorter value starts before it:
+        self.assertEqual(replace_str('abcd', reverse_info=reverse_info), 'a{{ cookiecutter.a }}')
+        self.assertEqual(
+            replace_str('ab abcd', reverse_info=reverse_info), '{{ cookiecutter.b }} a{{ cookiecutter.a }}'
+        )
+
+        # The same result as str.replace() of all values, the longest first:
+        reverse_info = generate_reverse_info(
+            cookiecutter_context={'cookiecutter': {'short': 'XY', 'middle': 'ZYX', 'long': 'XYZYX'}}
+        )
+        content = 'XYZYXYZYX XYZ ZYXY XXYZYXX XY' * 3
+        expected = content
+        for src_str, dst_str in reverse_info:
+            expected = expected.replace(src_str, dst_str)
+        self.assertEqual(replace_str(content, reverse_info=reverse_info), expected)
+
+        expected_hits = collections.Counter()
+        replace_str(content, reverse_info=reverse_info, hits=expected_hits)
+        for chunk_size in range(1, len(content) + 2):
+            dst_file = io.StringIO()
+            hits = collections.Counter()
+            replace_stream(
+                io.StringIO(content), dst_file, reverse_info=reverse_info, chunk_size=chunk_size, hits=hits
+            )
+            self.assertEqual(dst_file.getvalue(), expected, f'{chunk_size=}')
+            self.assertEqual(hits, expected_hits, f'{chunk_size=}')
+
     def test_replace_path(self):
         path = replace_path(
             path=Path('foo', 'bar', 'baz'),
@@ -77,3 +174,98 @@ class CookiecutterGeneratorTestCase(BaseTestCase):
             path,
             Path('/the/destination/{{ package_name }}/{{ dir_name }}/test.py'),
         )
+
+    def test_create_cookiecutter_template_parallel(self):
+        with TemporaryDirectory(prefix='test_create_cookiecutter_template_parallel_') as main_temp_path:
+            source_path = main_temp_path / 'source'
+            for number in range(5):
+                file_path = source_path / 'foo_bar' / f'sub_{number}' / f'foo_bar_{number}.py'
+                file_path.parent.mkdir(parents=True)
+                file_path.write_text(f'# foo_bar {number}')
+            Path(source_path, 'binary.bin').write_bytes(b'\xff\xfe foo_bar')
+            init_git(source_path)
+
+            outputs = {}
+            trees = {}
+            for jobs in (1, 3):
+                destination = main_temp_path / f'jobs_{jobs}'
+                with RedirectOut() as buffer:
+                    create_cookiecutter_template(
+                        source_path=source_path,
+                        destination=destination,
+                        cookiecutter_context={'cookiecutter': {'package_name': 'foo_bar'}},
+                        jobs=jobs,
+                    )
+                stdout = buffer.stdout.replace(destination.name, 'destination')
+                outputs[jobs] = [
+                    line for line in stdout.splitlines() if ' -> ' in line or 'binary files copied' in line
+                ]
+                trees[jobs] = {
+                    str(path.relative_to(destination)): path.read_bytes()
+                    for path in sorted(destination.rglob('*'))
+                    if path.is_file()
+                }
+
+            self.assertEqual(
+                trees[3]['{{ cookiecutter.package_name }}/sub_2/{{ cookiecutter.package_name }}_2.py'],
+                b'# {{ cookiecutter.package_name }} 2',
+            )
+            self.assertEqual(trees[3]['binary.bin'], b'\xff\xfe foo_bar')
+            self.assertEqual(trees[3], trees[1])
+            self.assertEqual(outputs[3], outputs[1])
+            self.assertIn('1 binary files copied without replacements.', outputs[1])
+
+    def test_create_cookiecutter_template_incremental(self):
+        with TemporaryDirectory(prefix='test_create_cookiecutter_template_incremental_') as main_temp_path:
+            source_path = main_temp_path / 'source'
+            Path(source_path, 'foo_bar').mkdir(parents=True)
+            Path(source_path, 'foo_bar', 'changed.py').write_text('# foo_bar rev 1')
+            Path(source_path, 'foo_bar', 'unchanged.py').write_text('# foo_bar')
+            Path(source_path, 'removed', 'sub').mkdir(parents=True)
+            Path(source_path, 'removed', 'sub', 'removed.txt').write_text('Removed in rev 2')
+            git, _ = init_git(source_path)
+
+            destination = main_temp_path / 'destination'
+            kwargs = dict(
+                source_path=source_path,
+                destination=destination,
+                cookiecutter_context={'cookiecutter': {'package_name': 'foo_bar'}},
+            )
+            with RedirectOut() as buffer:
+                create_cookiecutter_template(**kwargs)
+            self.assertNotIn('unchanged files skipped', buffer.stdout)
+            # The manifest is not a part of the generated template:
+            self.assertFalse(Path(destination, '.manageprojects').exists())
+            manifest = json.loads(get_reverse_manifest_path(destination).read_text())
+            self.assertEqual(
+                sorted(manifest['files']), ['foo_bar/changed.py', 'foo_bar/unchanged.py', 'removed/sub/removed.txt']
+            )
+            self.assertEqual(
+                manifest['files']['foo_bar/changed.py']['output'], '{{ cookiecutter.package_name }}/changed.py'
+            )
+
+            # Changed (not committed), unchanged and removed files:
+            Path(source_path, 'foo_bar', 'changed.py').write_text('# foo_bar rev 2')
+            git.git_verbose_check_output('rm', '--quiet', 'removed/sub/removed.txt', verbose=False)
+            with RedirectOut() as buffer:
+                stats = create_cookiecutter_template(overwrite=True, **kwargs)
+            self.assertIn('1 unchanged files skipped.', buffer.stdout)
+            self.assertEqual(stats.skipped, 1)
+            self.assertEqual([file_stats.source for file_stats in stats.files], ['foo_bar/changed.py'])
+            self.assertEqual(stats.files[0].hits, {'{{ cookiecutter.package_name }}': 1})
+            self.assertIn('foo_bar/changed.py -> ', buffer.stdout)
+            self.assertNotIn('foo_bar/unchanged.py -> ', buffer.stdout)
+
+            output_path = destination / '{{ cookiecutter.package_name }}'
+            self.assert_file_content(output_path / 'changed.py', '# {{ cookiecutter.package_name }} rev 2')
+            self.assert_file_content(output_path / 'unchanged.py', '# {{ cookiecutter.package_name }}')
+            self.assertFalse(Path(destination, 'removed').exists())
+
+            # Changed replacements -> all files are converted again:
+            kwargs['cookiecutter_context'] = {'cookiecutter': {'package_name': 'foo_bar', 'value': 'rev'}}
+            with RedirectOut() as buffer:
+                create_cookiecutter_template(overwrite=True, **kwargs)
+            self.assertNotIn('unchanged files skipped', buffer.stdout)
+            self.assert_file_content(
+                output_path / 'changed.py', '# {{ cookiecutter.package_name }} {{ cookiecutter.value }} 2'
+            )
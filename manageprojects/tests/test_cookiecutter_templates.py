@@ -11,6 +11,7 @@ from cli_base.cli_tools.test_utils.logs import AssertLogs
 from manageprojects.cli.cli_app import clone_project
 from manageprojects.cookiecutter_templates import start_managed_project, update_managed_project
 from manageprojects.data_classes import CookiecutterResult, GenerateTemplatePatchResult, ManageProjectsMeta
+from manageprojects.rendered_refs import get_rendered_tree
 from manageprojects.test_utils.click_cli_utils import invoke_click
 from manageprojects.tests.base import BaseTestCase
 from manageprojects.utilities.pyproject_toml import PyProjectToml
@@ -299,9 +300,14 @@ class CookiecutterTemplatesTestCase(BaseTestCase):
                     to_rev=to_rev,
                     to_commit_date=to_date,
                     compiled_to_path=patch_temp_path / 'to_rev_compiled',
+                    to_tree=result.to_tree,
                 ),
             )
 
+            # Only the render of the applied revision is kept in the project repository:
+            self.assertIsNone(get_rendered_tree(git=project_git, rev=from_rev))
+            self.assertEqual(get_rendered_tree(git=project_git, rev=to_rev), result.to_tree)
+
             # Check updated toml file:
             with AssertLogs(self, loggers=('manageprojects',)) as logs:
                 toml = PyProjectToml(project_path=project_path)
@@ -0,0 +1,159 @@
+import inspect
+import json
+from pathlib import Path
+
+from cli_base.cli_tools.test_utils.git_utils import init_git
+from cli_base.cli_tools.test_utils.logs import AssertLogs
+
+from manageprojects.constants import (
+    FLEET_STATUS_APPLIED,
+    FLEET_STATUS_FAILED,
+    FLEET_STATUS_REJECTS,
+    FLEET_STATUS_UP_TO_DATE,
+)
+from manageprojects.fleet import FleetGroupKey, find_managed_projects, group_projects, update_fleet
+from manageprojects.tests.base import BaseTestCase
+from manageprojects.utilities.pyproject_toml import PyProjectToml
+from manageprojects.utilities.temp_path import TemporaryDirectory
+
+
+TEMPLATE_CONTENT = inspect.cleandoc(
+    '''
+    # This is a test line, not changed
+    #
+    # Revision {rev}
+    #
+    print('Test: {{{{ cookiecutter.value }}}}')
+    '''
+)
+
+
+class FleetTestCase(BaseTestCase):
+    def create_project(self, *, project_path, template_path, revision, dt, content, context=True):
+        project_path.mkdir(parents=True)
+        Path(project_path, 'a_file.py').write_text(content)
+        toml = PyProjectToml(project_path=project_path)
+        toml.init(revision=revision, dt=dt, template=str(template_path), directory=None)
+        if context:
+            toml.create_or_update_cookiecutter_context(context={'cookiecutter': {'value': 'FooBar'}})
+        toml.save()
+        init_git(project_path, comment='Git init project.')
+
+    def test_update_fleet(self):
+        with TemporaryDirectory(prefix='test_update_fleet_') as main_temp_path:
+            template_path = main_temp_path / 'template'
+            test_file_path = template_path / '{{cookiecutter.dir_name}}' / 'a_file.py'
+            test_file_path.parent.mkdir(parents=True)
+            test_file_path.write_text(TEMPLATE_CONTENT.format(rev=1))
+            Path(template_path, 'cookiecutter.json').write_text(json.dumps({'dir_name': 'a_dir', 'value': 'Foo'}))
+            git, from_rev = init_git(template_path, comment='Git init template.')
+            from_date = git.get_commit_date(verbose=False)
+
+            test_file_path.write_text(TEMPLATE_CONTENT.format(rev=2))
+            git.add('.', verbose=False)
+            git.commit('Template rev 2', verbose=False)
+            to_rev = git.get_current_hash(verbose=False)
+
+            rendered_rev1 = TEMPLATE_CONTENT.format(rev=1).replace('{{ cookiecutter.value }}', 'FooBar')
+            projects_path = main_temp_path / 'projects'
+            self.create_project(
+                project_path=projects_path / 'applied',
+                template_path=template_path,
+                revision=from_rev,
+                dt=from_date,
+                content=rendered_rev1,
+            )
+            self.create_project(
+                project_path=projects_path / 'rejects',
+                template_path=template_path,
+                revision=from_rev,
+                dt=from_date,
+                content=rendered_rev1.replace('Revision 1', 'Changed in the project'),
+            )
+            self.create_project(
+                project_path=projects_path / 'up_to_date',
+                template_path=template_path,
+                revision=to_rev,
+                dt=from_date,
+                content='',
+            )
+            self.create_project(
+                project_path=projects_path / 'failed',
+                template_path=template_path,
+                revision=from_rev,
+                dt=from_date,
+                content='',
+                context=False,
+            )
+
+            # Not managed or in ignored directories:
+            Path(projects_path, 'not_managed').mkdir()
+            Path(projects_path, 'not_managed', 'pyproject.toml').write_text('[project]\nname = "foo"\n')
+            self.create_project(
+                project_path=projects_path / 'node_modules' / 'ignored',
+                template_path=template_path,
+                revision=from_rev,
+                dt=from_date,
+                content='',
+            )
+
+            project_paths = find_managed_projects(projects_path)
+            self.assertEqual(
+                [path.name for path in project_paths],
+                ['applied', 'failed', 'rejects', 'up_to_date'],
+            )
+
+            # One broken project or template should not stop the update of the other projects:
+            self.create_project(
+                project_path=projects_path / 'unreachable',
+                template_path=main_temp_path / 'does_not_exist',
+                revision=from_rev,
+                dt=from_date,
+                content='',
+            )
+            project_paths += [projects_path / 'not_managed', projects_path / 'unreachable']
+
+            groups, errors = group_projects(project_paths)
+            self.assertEqual(
+                {
+                    (Path(key.cookiecutter_template).name, key.from_rev): [path.name for path in paths]
+                    for key, paths in groups.items()
+                },
+                {
+                    ('template', from_rev): ['applied', 'failed', 'rejects'],
+                    ('template', to_rev): ['up_to_date'],
+                    ('does_not_exist', from_rev): ['unreachable'],
+                },
+            )
+            self.assertIsInstance(next(iter(groups)), FleetGroupKey)
+            self.assertEqual(errors, {projects_path / 'not_managed': 'Missing template or last applied revision'})
+
+            with AssertLogs(self, loggers=('manageprojects',)) as logs:
+                results = update_fleet(project_paths, jobs=2)
+            logs.assert_in('Update 3 projects from rev.', 'Update', 'failed', 'Checkout template')
+
+            self.assertEqual(
+                [(result.project_path.name, result.status) for result in results],
+                [
+                    ('applied', FLEET_STATUS_APPLIED),
+                    ('failed', FLEET_STATUS_FAILED),
+                    ('rejects', FLEET_STATUS_REJECTS),
+                    ('up_to_date', FLEET_STATUS_UP_TO_DATE),
+                    ('not_managed', FLEET_STATUS_FAILED),
+                    ('unreachable', FLEET_STATUS_FAILED),
+                ],
+            )
+            applied, failed, rejects, up_to_date, not_managed, unreachable = results
+
+            self.assertEqual(applied.to_rev, to_rev)
+            self.assert_file_content(
+                projects_path / 'applied' / 'a_file.py',
+                TEMPLATE_CONTENT.format(rev=2).replace('{{ cookiecutter.value }}', 'FooBar'),
+            )
+            self.assertIn(to_rev, Path(projects_path, 'applied', 'pyproject.toml').read_text())
+
+            self.assertIn('Missing cookiecutter context', failed.error)
+            self.assertEqual(not_managed.error, 'Missing template or last applied revision')
+            self.assertIn('does_not_exist', unreachable.error)
+
+            self.assertEqual(rejects.reject_files, [projects_path / 'rejects' / 'a_file.py.rej'])
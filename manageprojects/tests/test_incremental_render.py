@@ -0,0 +1,188 @@
+import json
+from pathlib import Path, PurePosixPath
+from unittest import mock
+
+from cli_base.cli_tools.test_utils.git_utils import init_git
+from cli_base.cli_tools.test_utils.logs import AssertLogs
+
+from manageprojects import incremental_render
+from manageprojects.incremental_render import execute_cookiecutter_incremental, extract_partial_template
+from manageprojects.patching import generate_template_patch, make_git_diff
+from manageprojects.tests.base import BaseTestCase
+from manageprojects.utilities.temp_path import TemporaryDirectory
+
+
+class IncrementalRenderTestCase(BaseTestCase):
+    def create_template(self, repo_path):
+        template_path = repo_path / 'template_dir'
+        project_template_path = template_path / '{{cookiecutter.dir_name}}'
+        Path(project_template_path, 'sub_dir').mkdir(parents=True)
+        Path(template_path, 'cookiecutter.json').write_text(json.dumps({'dir_name': 'a_dir', 'value': 'Foo'}))
+        Path(project_template_path, 'changed.txt').write_text('Rev 1: {{ cookiecutter.value }}')
+        Path(project_template_path, 'sub_dir', 'unchanged.txt').write_text('Not changed')
+        Path(project_template_path, 'removed.txt').write_text('Removed in rev 2')
+        git, rev1 = init_git(repo_path)
+
+        Path(project_template_path, 'changed.txt').write_text('Rev 2: {{ cookiecutter.value }}')
+        Path(project_template_path, 'removed.txt').unlink()
+        Path(project_template_path, 'sub_dir', 'added.txt').write_text('Added in rev 2')
+        Path(repo_path, 'README.md').write_text('Not in the template directory')
+        git.add('.', verbose=False)
+        git.commit('The second commit', verbose=False)
+        rev2 = git.get_current_hash(verbose=False)
+        return git, template_path, rev1, rev2
+
+    def test_execute_cookiecutter_incremental(self):
+        with TemporaryDirectory(prefix='test_execute_cookiecutter_incremental_') as main_temp_path:
+            repo_path = main_temp_path / 'templates'
+            git, template_path, rev1, rev2 = self.create_template(repo_path)
+
+            jobs_mock = mock.patch.object(
+                incremental_render, 'execute_cookiecutter_jobs', wraps=incremental_render.execute_cookiecutter_jobs
+            )
+            with AssertLogs(self, loggers=('manageprojects',)) as logs, jobs_mock as execute_jobs_mock:
+                results = execute_cookiecutter_incremental(
+                    repo_path=template_path,
+                    revisions={rev1: main_temp_path / 'rev1', rev2: main_temp_path / 'rev2'},
+                    temp_path=main_temp_path / 'temp',
+                    template=str(repo_path),
+                    directory='template_dir',
+                    no_input=True,
+                    extra_context={'value': 'Bar'},
+                    use_cache=True,
+                )
+            logs.assert_in('Render only 3 changed files', "Call 'cookiecutter'")
+            # The partial renders are never stored in the render cache:
+            jobs = execute_jobs_mock.call_args.args[0]
+            self.assertEqual([job['use_cache'] for job in jobs.values()], [False, False])
+
+            from_context, from_path, _ = results[rev1]
+            to_context, to_path, _ = results[rev2]
+            self.assertEqual(from_context['cookiecutter']['value'], 'Bar')
+            self.assertEqual(from_path, main_temp_path / 'rev1' / 'a_dir')
+            self.assertEqual(
+                sorted(str(path.relative_to(from_path)) for path in from_path.rglob('*')),
+                ['changed.txt', 'removed.txt'],
+            )
+            self.assertEqual(
+                sorted(str(path.relative_to(to_path)) for path in to_path.rglob('*')),
+                ['changed.txt', 'sub_dir', 'sub_dir/added.txt'],
+            )
+            self.assert_file_content(to_path / 'changed.txt', 'Rev 2: Bar')
+
+            patch = make_git_diff(temp_path=main_temp_path, from_path=from_path, to_path=to_path, verbose=False)
+            self.assertIn('-Rev 1: Bar', patch)
+            self.assertIn('+Rev 2: Bar', patch)
+            self.assertIn('deleted file mode 100644', patch)
+            self.assertIn('+Added in rev 2', patch)
+            self.assertNotIn('unchanged.txt', patch)
+
+            # Changed "cookiecutter.json" -> complete render needed:
+            Path(template_path, 'cookiecutter.json').write_text(json.dumps({'dir_name': 'a_dir', 'value': 'New'}))
+            git.add('.', verbose=False)
+            git.commit('Change cookiecutter.json', verbose=False)
+            rev3 = git.get_current_hash(verbose=False)
+            with AssertLogs(self, loggers=('manageprojects',)) as logs:
+                results = execute_cookiecutter_incremental(
+                    repo_path=template_path,
+                    revisions={rev2: main_temp_path / 'rev2b', rev3: main_temp_path / 'rev3'},
+                    temp_path=main_temp_path / 'temp',
+                    template=str(repo_path),
+                    directory='template_dir',
+                    no_input=True,
+                )
+            logs.assert_in('cookiecutter.json changed between')
+            self.assertIsNone(results)
+
+    def test_extract_literal_file_names(self):
+        with TemporaryDirectory(prefix='test_extract_literal_file_names_') as main_temp_path:
+            repo_path = main_temp_path / 'templates'
+            project_template_path = repo_path / '{{cookiecutter.dir_name}}'
+            project_template_path.mkdir(parents=True)
+            Path(repo_path, 'cookiecutter.json').write_text('{}')
+            for file_name in ('foo[1].txt', 'foo1.txt', 'bar*.txt', 'bar2.txt'):
+                Path(project_template_path, file_name).write_text(file_name)
+            git, rev = init_git(repo_path)
+
+            project_dir = PurePosixPath('{{cookiecutter.dir_name}}')
+            with AssertLogs(self, loggers=('manageprojects',)):
+                template_path = extract_partial_template(
+                    git=git,
+                    rev=rev,
+                    template_dir=PurePosixPath('.'),
+                    project_dir=project_dir,
+                    changed_files={f'{project_dir}/foo[1].txt', f'{project_dir}/bar*.txt'},
+                    destination=main_temp_path / 'partial',
+                )
+            self.assertEqual(
+                sorted(path.name for path in Path(template_path, project_dir).iterdir()),
+                ['bar*.txt', 'foo[1].txt'],
+            )
+
+    def test_generate_template_patch_incremental(self):
+        with TemporaryDirectory(prefix='test_generate_template_patch_incremental_') as main_temp_path:
+            repo_path = main_temp_path / 'templates'
+            git, template_path, rev1, rev2 = self.create_template(repo_path)
+
+            patches = {}
+            for incremental in (False, True):
+                project_path = main_temp_path / f'project_{incremental}'
+                with AssertLogs(self, loggers=('manageprojects',)) as logs:
+                    result = generate_template_patch(
+                        project_path=project_path,
+                        template=str(repo_path),
+                        directory='template_dir',
+                        from_rev=rev1,
+                        replay_context={'cookiecutter': {'value': 'Bar'}},
+                        no_input=True,
+                        use_cache=False,
+                        incremental=incremental,
+                        repo_path=template_path,
+                    )
+                if incremental:
+                    logs.assert_in('Render only 3 changed files')
+                patches[incremental] = result.patch_file_path.read_text()
+
+            self.assertEqual(patches[True], patches[False])
+
+    def test_hooks(self):
+        with TemporaryDirectory(prefix='test_incremental_render_hooks_') as main_temp_path:
+            repo_path = main_temp_path / 'templates'
+            template_path = repo_path / 'template_dir'
+            project_template_path = template_path / '{{cookiecutter.dir_name}}'
+            project_template_path.mkdir(parents=True)
+            Path(template_path, 'hooks').mkdir()
+            Path(template_path, 'hooks', 'post_gen_project.py').write_text('import os\nos.remove("optional.txt")\n')
+            Path(template_path, 'cookiecutter.json').write_text(json.dumps({'dir_name': 'a_dir'}))
+            Path(project_template_path, 'changed.txt').write_text('Rev 1')
+            Path(project_template_path, 'optional.txt').write_text('Rev 1')
+            git, rev1 = init_git(repo_path)
+
+            Path(project_template_path, 'changed.txt').write_text('Rev 2')
+            Path(project_template_path, 'optional.txt').write_text('Rev 2')
+            git.add('.', verbose=False)
+            git.commit('The second commit', verbose=False)
+
+            patches = {}
+            for incremental in (False, True):
+                project_path = main_temp_path / f'project_{incremental}'
+                with AssertLogs(self, loggers=('manageprojects',)) as logs:
+                    result = generate_template_patch(
+                        project_path=project_path,
+                        template=str(repo_path),
+                        directory='template_dir',
+                        from_rev=rev1,
+                        replay_context={'cookiecutter': {}},
+                        no_input=True,
+                        use_cache=False,
+                        incremental=incremental,
+                        repo_path=template_path,
+                    )
+                if incremental:
+                    logs.assert_in('has hooks: Render complete template')
+                patches[incremental] = result.patch_file_path.read_text()
+
+            # The file removed by the hook is not in the patch:
+            self.assertIn('+Rev 2', patches[False])
+            self.assertNotIn('optional.txt', patches[False])
+            self.assertEqual(patches[True], patches[False])
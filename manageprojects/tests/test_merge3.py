@@ -0,0 +1,54 @@
+from unittest import TestCase
+
+from manageprojects.merge3 import merge_text
+
+
+class Merge3TestCase(TestCase):
+    def test_clean_merge(self):
+        result = merge_text(
+            base='one\ntwo\nthree\nfour\n',
+            ours='one\nTWO\nthree\nfour\n',
+            theirs='one\ntwo\nthree\nfour\nfive\n',
+        )
+        self.assertEqual(result.conflicts, 0)
+        self.assertEqual(result.text, 'one\nTWO\nthree\nfour\nfive\n')
+
+        # The same change on both sides is not a conflict:
+        result = merge_text(base='a\nb\n', ours='a\nB\n', theirs='a\nB\n')
+        self.assertEqual(result.conflicts, 0)
+        self.assertEqual(result.text, 'a\nB\n')
+
+        # Unchanged on both sides:
+        result = merge_text(base='a\nb\n', ours='a\nb\n', theirs='a\nb\n')
+        self.assertEqual(result.text, 'a\nb\n')
+
+        # Line endings are kept:
+        result = merge_text(base='a\r\nb\r\n', ours='A\r\nb\r\n', theirs='a\r\nb\r\nc\r\n')
+        self.assertEqual(result.text, 'A\r\nb\r\nc\r\n')
+
+    def test_conflict(self):
+        result = merge_text(
+            base='one\ntwo\nthree\n',
+            ours='one\nours\nthree\n',
+            theirs='one\ntheirs\nthree\n',
+        )
+        self.assertEqual(result.conflicts, 1)
+        self.assertEqual(
+            result.text,
+            'one\n<<<<<<< ours\nours\n||||||| base\ntwo\n=======\ntheirs\n>>>>>>> theirs\nthree\n',
+        )
+
+        # Markers always start in a new line:
+        result = merge_text(base='a\nb', ours='a\nX', theirs='a\nY')
+        self.assertEqual(result.conflicts, 1)
+        self.assertEqual(result.lines[-1], '>>>>>>> theirs\n')
+        self.assertIn('X\n||||||| base\nb\n=======\nY\n', result.text)
+
+    def test_new_files(self):
+        # A empty base: Both sides added content
+        result = merge_text(base='', ours='a\n', theirs='a\n')
+        self.assertEqual(result.conflicts, 0)
+        self.assertEqual(result.text, 'a\n')
+
+        result = merge_text(base='', ours='a\n', theirs='b\n')
+        self.assertEqual(result.conflicts, 1)
@@ -0,0 +1,98 @@
+from pathlib import Path
+from unittest import mock
+
+from cli_base.cli_tools.test_utils.git_utils import init_git
+from cli_base.cli_tools.test_utils.logs import AssertLogs
+
+from manageprojects.cookiecutter_api import get_repo_path
+from manageprojects.outdated import get_outdated
+from manageprojects.project_index import IndexedProject
+from manageprojects.tests.base import BaseTestCase
+from manageprojects.utilities.temp_path import TemporaryDirectory
+
+
+class OutdatedTestCase(BaseTestCase):
+    def test_get_outdated(self):
+        with TemporaryDirectory(prefix='test_get_outdated_') as main_temp_path:
+            repo_path = main_temp_path / 'templates'
+            template_path = repo_path / 'template_dir'
+            template_path.mkdir(parents=True)
+            Path(template_path, 'cookiecutter.json').write_text('{}')
+            Path(template_path, 'file1.txt').write_text('Rev 1')
+            Path(repo_path, 'README.md').write_text('Rev 1')
+            git, rev1 = init_git(repo_path)
+
+            Path(template_path, 'file1.txt').write_text('Rev 2')
+            Path(template_path, 'file2.txt').write_text('Rev 2')
+            Path(repo_path, 'README.md').write_text('Rev 2')  # Not in the template directory
+            git.add('.', verbose=False)
+            git.commit('The second commit', verbose=False)
+            rev2 = git.get_current_hash(verbose=False)
+
+            def indexed_project(name, last_revision):
+                return IndexedProject(
+                    project_path=main_temp_path / name,
+                    cookiecutter_template=str(repo_path),
+                    cookiecutter_directory='template_dir',
+                    initial_revision=rev1,
+                    last_revision=last_revision,
+                    context_hash=None,
+                )
+
+            with mock.patch('manageprojects.cookiecutter_api.cookiecutter') as cookiecutter_mock:
+                results = get_outdated(
+                    [
+                        indexed_project('outdated', rev1),
+                        indexed_project('up_to_date', rev2),
+                        indexed_project('unknown', '1234567'),
+                    ]
+                )
+            cookiecutter_mock.assert_not_called()
+
+            outdated, up_to_date, unknown = results
+
+            self.assertTrue(outdated.outdated)
+            self.assertEqual((outdated.from_rev, outdated.to_rev), (rev1, rev2))
+            self.assertEqual(outdated.changed_files, ['template_dir/file1.txt', 'template_dir/file2.txt'])
+            self.assertEqual(outdated.to_commit_date, git.get_commit_date(verbose=False))
+
+            self.assertFalse(up_to_date.outdated)
+            self.assertEqual(up_to_date.changed_files, [])
+            self.assertIsNone(up_to_date.error)
+
+            self.assertFalse(unknown.outdated)
+            self.assertIn('1234567', unknown.error)
+
+    def test_fresh_template_mirror(self):
+        with TemporaryDirectory(prefix='test_get_outdated_mirror_') as main_temp_path:
+            repo_path = main_temp_path / 'template'
+            repo_path.mkdir()
+            Path(repo_path, 'cookiecutter.json').write_text('{}')
+            git, rev1 = init_git(repo_path)
+            template = f'git+file://{repo_path}'
+            with AssertLogs(self, loggers=('manageprojects',)):
+                get_repo_path(template=template)  # Create the mirror
+
+            Path(repo_path, 'file.txt').write_text('Rev 2')
+            git.add('.', verbose=False)
+            git.commit('The second commit', verbose=False)
+            rev2 = git.get_current_hash(verbose=False)
+
+            # The mirror is younger than TEMPLATE_MIRROR_TTL, but the new commit must be found:
+            with AssertLogs(self, loggers=('manageprojects',)) as logs:
+                (result,) = get_outdated(
+                    [
+                        IndexedProject(
+                            project_path=main_temp_path / 'project',
+                            cookiecutter_template=template,
+                            cookiecutter_directory=None,
+                            initial_revision=rev1,
+                            last_revision=rev1,
+                            context_hash=None,
+                        )
+                    ]
+                )
+            logs.assert_in('Fetch template mirror')
+            self.assertIsNone(result.error)
+            self.assertTrue(result.outdated)
+            self.assertEqual(result.to_rev, rev2)
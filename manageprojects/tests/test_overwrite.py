@@ -9,7 +9,11 @@ from cli_base.cli_tools.test_utils.logs import AssertLogs
 
 from manageprojects.cookiecutter_templates import update_managed_project
 from manageprojects.data_classes import ManageProjectsMeta, OverwriteResult
+from manageprojects.overwrite import overwrite_project
+from manageprojects.render_manifest import read_render_manifest
+from manageprojects.rendered_refs import get_rendered_tree
 from manageprojects.tests.base import BaseTestCase
+from manageprojects.tree_diff import get_blob_hash
 from manageprojects.utilities.pyproject_toml import PyProjectToml
 from manageprojects.utilities.temp_path import TemporaryDirectory
 
@@ -179,8 +183,10 @@ class UpdateByOverwriteTestCase(BaseTestCase):
                 OverwriteResult(
                     to_rev=to_rev,
                     to_commit_date=to_date,
+                    to_tree=result.to_tree,
                 ),
             )
+            self.assertEqual(get_rendered_tree(git=project_git, rev=to_rev), result.to_tree)
 
             # Check updated toml file:
             with AssertLogs(self, loggers=('manageprojects',)) as logs:
@@ -191,3 +197,149 @@ class UpdateByOverwriteTestCase(BaseTestCase):
             self.assertEqual(mp_meta.applied_migrations, [to_rev])
             content = toml.dumps()
             self.assertIn('[manageprojects] # https://github.com/jedie/manageprojects', content)
+
+    def test_render_manifest(self):
+        with TemporaryDirectory(prefix='test_render_manifest_') as main_temp_path:
+            template_path = main_temp_path / 'template'
+            template_dir_path = template_path / '{{cookiecutter.dir_name}}'
+            template_dir_path.mkdir(parents=True)
+            Path(template_path, 'cookiecutter.json').write_text(json.dumps({'dir_name': 'a_dir'}))
+            for name in ('a', 'b', 'c'):
+                Path(template_dir_path, f'{name}.txt').write_text(f'{name} rev 1')
+            template_git, rev1 = init_git(template_path)
+
+            project_path = main_temp_path / 'project'
+            project_path.mkdir()
+            Path(project_path, 'README.txt').write_text('The project')
+            project_git, _ = init_git(project_path)
+
+            overwrite_kwargs = dict(
+                git=project_git,
+                project_path=project_path,
+                template=str(template_path),
+                from_rev=rev1,
+                replay_context={'cookiecutter': {'dir_name': 'a_dir'}},
+                no_input=True,
+                use_cache=False,
+                repo_path=template_path,
+            )
+            with RedirectOut() as buffer, AssertLogs(self, loggers=('manageprojects',)):
+                result = overwrite_project(**overwrite_kwargs)
+            self.assertIn(f'NEW file: {project_path}/a.txt', buffer.stdout)
+            self.assertEqual(result.conflicts, [])
+            manifest = read_render_manifest(project_path)
+            self.assertEqual(manifest['rev'], rev1)
+            self.assertEqual(manifest['files']['b.txt'], get_blob_hash(b'b rev 1'))
+            project_git.add('.', verbose=False)
+            project_git.commit('Render rev 1', verbose=False)
+
+            # Change the template:
+            for name in ('a', 'b'):
+                Path(template_dir_path, f'{name}.txt').write_text(f'{name} rev 2')
+            template_git.add('.', verbose=False)
+            template_git.commit('Template rev 2', verbose=False)
+            rev2 = template_git.get_current_hash(verbose=False)
+
+            # Change the project:
+            for name in ('b', 'c'):
+                Path(project_path, f'{name}.txt').write_text(f'{name} modified')
+            project_git.add('.', verbose=False)
+            project_git.commit('Local changes', verbose=False)
+
+            with RedirectOut() as buffer, AssertLogs(self, loggers=('manageprojects',)) as logs:
+                result = overwrite_project(**overwrite_kwargs)
+            logs.assert_in('1 files updated by overwriting, 1 conflicts')
+            self.assertIn(f'UPDATE file: {project_path}/a.txt', buffer.stdout)
+            self.assertIn(f'CONFLICT: {project_path}/b.txt was modified', buffer.stdout)
+            self.assertIn(f'Skip unchanged template file: {project_path}/c.txt', buffer.stdout)
+            self.assertIn(f'not overwritten, please merge them manually:\n * {project_path}/b.txt', buffer.stdout)
+            self.assertEqual(result.to_rev, rev2)
+            self.assertEqual(result.conflicts, [project_path / 'b.txt'])
+
+            self.assert_file_content(project_path / 'a.txt', 'a rev 2')
+            self.assert_file_content(project_path / 'b.txt', 'b modified')
+            self.assert_file_content(project_path / 'c.txt', 'c modified')
+
+            # The conflict will be reported again:
+            manifest = read_render_manifest(project_path)
+            self.assertEqual(manifest['rev'], rev2)
+            self.assertEqual(manifest['files']['a.txt'], get_blob_hash(b'a rev 2'))
+            self.assertEqual(manifest['files']['b.txt'], get_blob_hash(b'b rev 1'))
+
+    def test_three_way_merge(self):
+        with TemporaryDirectory(prefix='test_three_way_merge_') as main_temp_path:
+            template_path = main_temp_path / 'template'
+            template_dir_path = template_path / '{{cookiecutter.dir_name}}'
+            template_dir_path.mkdir(parents=True)
+            Path(template_path, 'cookiecutter.json').write_text(json.dumps({'dir_name': 'a_dir'}))
+            Path(template_dir_path, 'merged.txt').write_text('one\ntwo\nthree\nfour\n')
+            Path(template_dir_path, 'conflict.txt').write_text('one\ntwo\n')
+            Path(template_dir_path, 'image.png').write_bytes(b'\x89PNG\r\n\x1a\n\0 rev 1')
+            template_git, rev1 = init_git(template_path)
+
+            project_path = main_temp_path / 'project'
+            project_path.mkdir()
+            Path(project_path, 'README.txt').write_text('The project')
+            project_git, _ = init_git(project_path)
+
+            overwrite_kwargs = dict(
+                git=project_git,
+                project_path=project_path,
+                template=str(template_path),
+                from_rev=rev1,
+                replay_context={'cookiecutter': {'dir_name': 'a_dir'}},
+                no_input=True,
+                use_cache=False,
+                repo_path=template_path,
+                merge=True,
+            )
+            with RedirectOut(), AssertLogs(self, loggers=('manageprojects',)):
+                overwrite_project(**overwrite_kwargs)
+            project_git.add('.', verbose=False)
+            project_git.commit('Render rev 1', verbose=False)
+
+            # Change the template:
+            Path(template_dir_path, 'merged.txt').write_text('one\ntwo\nthree\nfour\nfive\n')
+            Path(template_dir_path, 'conflict.txt').write_text('one\ntemplate\n')
+            Path(template_dir_path, 'image.png').write_bytes(b'\x89PNG\r\n\x1a\n\0 rev 2')
+            template_git.add('.', verbose=False)
+            template_git.commit('Template rev 2', verbose=False)
+
+            # Change the project:
+            Path(project_path, 'merged.txt').write_text('ONE\ntwo\nthree\nfour\n')
+            Path(project_path, 'conflict.txt').write_text('one\nproject\n')
+            Path(project_path, 'image.png').write_bytes(b'\x89PNG\r\n\x1a\n\0 modified')
+            project_git.add('.', verbose=False)
+            project_git.commit('Local changes', verbose=False)
+
+            with RedirectOut() as buffer, AssertLogs(self, loggers=('manageprojects',)) as logs:
+                result = overwrite_project(**overwrite_kwargs)
+            logs.assert_in('2 files updated by overwriting, 2 conflicts', 'Skip merge of binary file')
+            self.assertIn(f'MERGED file: {project_path}/merged.txt', buffer.stdout)
+            self.assertIn(f'CONFLICT: {project_path}/conflict.txt merged with 1', buffer.stdout)
+            self.assertIn(f'CONFLICT: {project_path}/image.png was modified', buffer.stdout)
+            self.assertIn('2 files with local changes have conflicts', buffer.stdout)
+            self.assertEqual(result.conflicts, [project_path / 'conflict.txt', project_path / 'image.png'])
+
+            self.assert_file_content(project_path / 'merged.txt', 'ONE\ntwo\nthree\nfour\nfive\n')
+            self.assert_file_content(
+                project_path / 'conflict.txt',
+                'one\n<<<<<<< ours\nproject\n||||||| base\ntwo\n=======\ntemplate\n>>>>>>> theirs\n',
+            )
+            self.assertEqual(Path(project_path, 'image.png').read_bytes(), b'\x89PNG\r\n\x1a\n\0 modified')
+
+            # Merged files are up-to-date with the new render:
+            manifest = read_render_manifest(project_path)
+            self.assertEqual(manifest['files']['merged.txt'], get_blob_hash(b'one\ntwo\nthree\nfour\nfive\n'))
+            self.assertEqual(manifest['files']['image.png'], get_blob_hash(b'\x89PNG\r\n\x1a\n\0 rev 1'))
+
+            # A interrupted update is cleaned up before the next update:
+            project_git.add('.', verbose=False)
+            project_git.commit('Merged rev 2', verbose=False)
+            staged_path = project_path / '.manageprojects' / 'transaction' / 'staged'
+            staged_path.mkdir(parents=True)
+            Path(staged_path, '0').write_text('Not applied')
+            with RedirectOut(), AssertLogs(self, loggers=('manageprojects',)) as logs:
+                overwrite_project(**overwrite_kwargs)
+            logs.assert_in('Remove unprepared transaction', 'Apply 4 files via')
+            self.assertFalse(staged_path.exists())
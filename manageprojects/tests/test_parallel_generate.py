@@ -0,0 +1,73 @@
+import json
+from pathlib import Path
+from unittest import mock
+
+from cli_base.cli_tools.test_utils.logs import AssertLogs
+from cookiecutter.exceptions import UndefinedVariableInTemplate
+from cookiecutter.main import cookiecutter
+
+from manageprojects.parallel_generate import ParallelGenerateFiles
+from manageprojects.tests.base import BaseTestCase
+from manageprojects.tree_diff import make_tree_diff
+from manageprojects.utilities.temp_path import TemporaryDirectory
+
+
+POST_GEN_HOOK = '''
+from pathlib import Path
+
+# All files must be generated before this hook runs:
+file_count = len([path for path in Path.cwd().rglob('*') if path.is_file()])
+Path('file_count.txt').write_text(str(file_count))
+'''
+
+
+class ParallelGenerateTestCase(BaseTestCase):
+    def test_same_output(self):
+        with TemporaryDirectory(prefix='test_parallel_generate_') as main_temp_path:
+            repo_path = main_temp_path / 'template'
+            dir_path = repo_path / '{{cookiecutter.dir_name}}'
+            Path(dir_path, 'sub_{{cookiecutter.value}}').mkdir(parents=True)
+            Path(dir_path, 'copy_only').mkdir()
+            Path(repo_path, 'hooks').mkdir()
+            Path(repo_path, 'hooks', 'post_gen_project.py').write_text(POST_GEN_HOOK)
+            Path(repo_path, 'cookiecutter.json').write_text(
+                json.dumps({'dir_name': 'a_dir', 'value': 'Foo', '_copy_without_render': ['copy_only/*']})
+            )
+            for number in range(20):
+                Path(dir_path, f'file{number}.txt').write_text(f'File {number}: {{{{ cookiecutter.value }}}}\n')
+                Path(dir_path, 'sub_{{cookiecutter.value}}', f'{number}.txt').write_text('{{ cookiecutter.dir_name }}')
+            Path(dir_path, 'windows.txt').write_bytes(b'{{ cookiecutter.value }}\r\nline 2\r\n')
+            Path(dir_path, 'image.png').write_bytes(b'\x89PNG\r\n\x1a\n\0\0\0')
+            Path(dir_path, 'copy_only', 'raw.txt').write_text('{{ cookiecutter.value }}')
+            script_path = Path(dir_path, 'script.sh')
+            script_path.write_text('#!/bin/sh\necho "{{ cookiecutter.value }}"')
+            script_path.chmod(0o755)
+
+            sequential_path = cookiecutter(
+                template=str(repo_path), output_dir=main_temp_path / 'sequential', no_input=True
+            )
+
+            parallel_generate_files = ParallelGenerateFiles(jobs=3, min_files=1)
+            with AssertLogs(self, loggers=('manageprojects',)) as logs, mock.patch(
+                'cookiecutter.main.generate_files', parallel_generate_files
+            ), mock.patch('manageprojects.parallel_generate.GENERATE_BATCH_SIZE', 10):
+                parallel_path = cookiecutter(
+                    template=str(repo_path), output_dir=main_temp_path / 'parallel', no_input=True
+                )
+            logs.assert_in('Generate 43 files in 5 batches with 3 jobs')
+
+            self.assertIsNone(make_tree_diff(from_path=Path(sequential_path), to_path=Path(parallel_path)))
+            self.assert_file_content(Path(parallel_path, 'file_count.txt'), '44')
+            self.assert_file_content(Path(parallel_path, 'file3.txt'), 'File 3: Foo\n')
+            self.assert_file_content(Path(parallel_path, 'copy_only', 'raw.txt'), '{{ cookiecutter.value }}')
+            self.assertEqual(Path(parallel_path, 'windows.txt').read_bytes(), b'Foo\r\nline 2\r\n')
+            self.assertEqual(Path(parallel_path, 'script.sh').stat().st_mode & 0o777, 0o755)
+
+            # Undefined variables are reported like in the sequential path:
+            Path(dir_path, 'file7.txt').write_text('{{ cookiecutter.unknown }}')
+            with self.assertRaises(UndefinedVariableInTemplate) as cm, mock.patch(
+                'cookiecutter.main.generate_files', ParallelGenerateFiles(jobs=3, min_files=1)
+            ):
+                cookiecutter(template=str(repo_path), output_dir=main_temp_path / 'error', no_input=True)
+            self.assertEqual(cm.exception.message, "Unable to create file 'file7.txt'")
+            self.assertFalse(Path(main_temp_path, 'error', 'a_dir').exists())
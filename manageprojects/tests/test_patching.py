@@ -1,12 +1,15 @@
 import inspect
 import json
+import os
 from pathlib import Path
+from unittest import mock
 
 from bx_py_utils.path import assert_is_dir
 from bx_py_utils.test_utils.snapshot import assert_text_snapshot
 from cli_base.cli_tools.test_utils.git_utils import init_git
 from cli_base.cli_tools.test_utils.logs import AssertLogs
 
+from manageprojects.constants import DIFF_ENGINES
 from manageprojects.data_classes import GenerateTemplatePatchResult
 from manageprojects.patching import generate_template_patch, make_git_diff
 from manageprojects.tests.base import BaseTestCase
@@ -107,46 +110,56 @@ class PatchingTestCase(BaseTestCase):
             )
             self.assertFalse(patch_file_path.exists())
 
-            with AssertLogs(self) as logs:
-                result = generate_template_patch(
-                    project_path=project_path,
-                    template=str(repo_path),
-                    directory=None,
-                    from_rev=from_rev,
-                    replay_context={},
-                    cleanup=False,  # Keep temp files if this test fails, for better debugging
-                    no_input=True,  # No user input in tests ;)
-                )
-            logs.assert_in("Call 'cookiecutter'", 'Write patch file')
-            self.assertIsInstance(result, GenerateTemplatePatchResult)
-
-            self.assertEqual(result.patch_file_path, patch_file_path)
-            self.assertEqual(result.from_rev, from_rev)
-            self.assertEqual(result.to_rev, to_rev)
-            self.assertEqual(result.to_commit_date, to_date)
-
-            self.assert_file_content(
-                patch_file_path,
-                inspect.cleandoc(
-                    r'''
-                    diff --git a/a_file_name.py b/a_file_name.py
-                    index 4d0e75c..c71c9fe 100644
-                    --- a/a_file_name.py
-                    +++ b/a_file_name.py
-                    @@ -1,6 +1,6 @@
-                     # This is a test line, not changed
-                     #
-                    -# Revision 1
-                    +# Revision 2
-                     #
-                     # The same cookiecutter value:
-                     print('Test: FooBar')
-                    \ No newline at end of file
-                    '''
-                ),
-            )
-
-            # The repro path contains the "from" revision:
+            cache_path = main_temp_path / 'cache'
+            cache_path.mkdir()
+            cache_env = {'XDG_CACHE_HOME': str(cache_path)}
+            for no, diff_engine in enumerate(DIFF_ENGINES):
+                with self.subTest(diff_engine=diff_engine):
+                    with AssertLogs(self, loggers=('manageprojects',)) as logs, mock.patch.dict(os.environ, cache_env):
+                        result = generate_template_patch(
+                            project_path=project_path,
+                            template=str(repo_path),
+                            directory=None,
+                            from_rev=from_rev,
+                            replay_context={},
+                            cleanup=False,  # Keep temp files if this test fails, for better debugging
+                            no_input=True,  # No user input in tests ;)
+                            diff_engine=diff_engine,
+                        )
+                    if no == 0:
+                        logs.assert_in("Call 'cookiecutter'", 'Store', 'in render cache', 'Write patch file')
+                    else:
+                        # Same revisions and context are rendered again -> the render cache is used:
+                        logs.assert_in('Use cached render', 'Write patch file')
+                    self.assertIsInstance(result, GenerateTemplatePatchResult)
+
+                    self.assertEqual(result.patch_file_path, patch_file_path)
+                    self.assertEqual(result.from_rev, from_rev)
+                    self.assertEqual(result.to_rev, to_rev)
+                    self.assertEqual(result.to_commit_date, to_date)
+
+                    self.assert_file_content(
+                        patch_file_path,
+                        inspect.cleandoc(
+                            r'''
+                            diff --git a/a_file_name.py b/a_file_name.py
+                            index 4d0e75c..c71c9fe 100644
+                            --- a/a_file_name.py
+                            +++ b/a_file_name.py
+                            @@ -1,6 +1,6 @@
+                             # This is a test line, not changed
+                             #
+                            -# Revision 1
+                            +# Revision 2
+                             #
+                             # The same cookiecutter value:
+                             print('Test: FooBar')
+                            \ No newline at end of file
+                            '''
+                        ),
+                    )
+
+            # The "from" revision was rendered from a git worktree, the repro path is not changed:
             assert_is_dir(result.repo_path)
             self.assert_file_content(
                 Path(
@@ -154,5 +167,7 @@ class PatchingTestCase(BaseTestCase):
                     '{{cookiecutter.dir_name}}',
                     '{{cookiecutter.file_name}}.py',
                 ),
-                rev1_content,
+                rev2_content,
             )
+            self.assertEqual(git.get_current_hash(verbose=False), to_rev)
+            self.assertNotIn('worktree', git.git_verbose_check_output('worktree', 'list', verbose=False))
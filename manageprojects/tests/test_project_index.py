@@ -0,0 +1,81 @@
+import datetime
+import os
+from pathlib import Path
+
+from cli_base.cli_tools.test_utils.logs import AssertLogs
+
+from manageprojects.project_index import IndexedProject, ProjectIndex
+from manageprojects.render_cache import canonical_hash
+from manageprojects.tests.base import BaseTestCase
+from manageprojects.utilities.pyproject_toml import PyProjectToml
+from manageprojects.utilities.temp_path import TemporaryDirectory
+
+
+class ProjectIndexTestCase(BaseTestCase):
+    def test_scan(self):
+        with TemporaryDirectory(prefix='test_project_index_') as main_temp_path:
+            root_path = main_temp_path / 'projects'
+
+            project_path = root_path / 'group' / 'project_1'
+            project_path.mkdir(parents=True)
+            toml = PyProjectToml(project_path=project_path)
+            dt = datetime.datetime(2023, 1, 1, tzinfo=datetime.timezone.utc)
+            toml.init(revision='abc0001', dt=dt, template='https://github.com/foo/bar/', directory='sub_dir')
+            toml.create_or_update_cookiecutter_context(context={'cookiecutter': {'value': 'FooBar'}})
+            toml.save()
+
+            Path(root_path, 'not_managed').mkdir()
+            Path(root_path, 'not_managed', 'pyproject.toml').write_text('[project]\nname = "foo"\n')
+
+            ignored_path = root_path / 'project_1' / '.venv' / 'lib' / 'pkg'
+            ignored_path.mkdir(parents=True)
+            Path(ignored_path, 'pyproject.toml').write_text('[manageprojects]\ncookiecutter_template = "foo"\n')
+
+            # A other root path with the same prefix:
+            Path(main_temp_path, 'projects_other').mkdir()
+            Path(main_temp_path, 'projects_other', 'pyproject.toml').write_text(
+                '[manageprojects]\ncookiecutter_template = "other"\n'
+            )
+
+            with ProjectIndex(db_path=main_temp_path / 'index.sqlite3') as project_index:
+                projects = project_index.scan(main_temp_path / 'projects_other')
+                self.assertEqual(projects[0].cookiecutter_template, 'other')
+
+                with AssertLogs(self, loggers=('manageprojects',)) as logs:
+                    projects = project_index.scan(root_path)
+                logs.assert_in('2 pyproject.toml found, 2 (re-)indexed, 0 removed')
+                self.assertEqual(
+                    projects,
+                    [
+                        IndexedProject(
+                            project_path=project_path,
+                            cookiecutter_template='https://github.com/foo/bar/',
+                            cookiecutter_directory='sub_dir',
+                            initial_revision='abc0001',
+                            last_revision='abc0001',
+                            context_hash=canonical_hash({'cookiecutter': {'value': 'FooBar'}}),
+                        )
+                    ],
+                )
+
+                # Nothing changed -> nothing parsed:
+                with AssertLogs(self, loggers=('manageprojects',)) as logs:
+                    project_index.scan(root_path)
+                logs.assert_in('2 pyproject.toml found, 0 (re-)indexed, 0 removed')
+
+                # Apply a migration:
+                toml = PyProjectToml(project_path=project_path)
+                toml.add_applied_migrations(git_hash='abc0002', dt=dt)
+                toml.save()
+                os.utime(toml.path, ns=(1, 1))
+                Path(root_path, 'not_managed', 'pyproject.toml').unlink()
+                with AssertLogs(self, loggers=('manageprojects',)) as logs:
+                    projects = project_index.scan(root_path)
+                logs.assert_in('1 pyproject.toml found, 1 (re-)indexed, 1 removed')
+                self.assertEqual(projects[0].last_revision, 'abc0002')
+
+                # Query without scanning:
+                self.assertEqual(len(project_index.get_projects()), 2)
+                self.assertEqual(len(project_index.get_projects(root_path=Path('/'))), 2)
+                self.assertEqual(project_index.get_projects(template='other')[0].project_path.name, 'projects_other')
+                self.assertEqual(project_index.get_projects(template='https://github.com/foo/bar/'), projects)
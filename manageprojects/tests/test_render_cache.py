@@ -0,0 +1,111 @@
+import json
+import os
+from pathlib import Path
+from unittest import mock
+
+from bx_py_utils.path import assert_is_file
+from cli_base.cli_tools.test_utils.git_utils import init_git
+from cli_base.cli_tools.test_utils.logs import AssertLogs
+
+from manageprojects.cookiecutter_api import execute_cookiecutter
+from manageprojects.render_cache import RenderCache, canonical_hash, get_cache_key, get_template_git_hash
+from manageprojects.tests.base import BaseTestCase
+from manageprojects.utilities.temp_path import TemporaryDirectory
+
+
+class RenderCacheTestCase(BaseTestCase):
+    def test_canonical_hash(self):
+        self.assertEqual(canonical_hash({'a': 1, 'b': [1, 2]}), canonical_hash({'b': [1, 2], 'a': 1}))
+        self.assertNotEqual(
+            get_cache_key(template='foo', git_hash='abc', directory=None, context={'a': 1}),
+            get_cache_key(template='foo', git_hash='abc', directory=None, context={'a': 2}),
+        )
+
+    def test_store_get_evict(self):
+        with TemporaryDirectory(prefix='test_render_cache_') as main_temp_path:
+            render_cache = RenderCache(cache_path=main_temp_path / 'cache', max_bytes=100, max_entries=2)
+
+            rendered_path = main_temp_path / 'rendered' / 'project_name'
+            rendered_path.mkdir(parents=True)
+            Path(rendered_path, 'file.txt').write_text('1234567890')
+
+            output_dir = main_temp_path / 'output'
+            self.assertIsNone(render_cache.get(key='key1', output_dir=output_dir))
+
+            context = {'cookiecutter': {'foo': 'bar', '_output_dir': '/old/path/'}}
+            for key in ('key1', 'key2', 'key3'):
+                render_cache.store(key=key, cookiecutter_context=context, destination_path=rendered_path)
+
+            # Only two entries allowed -> the least recently used one was removed:
+            self.assertEqual(sorted(path.name for path in render_cache.cache_path.iterdir()), ['key2', 'key3'])
+            self.assertIsNone(render_cache.get(key='key1', output_dir=output_dir))
+
+            cached_render = render_cache.get(key='key2', output_dir=output_dir)
+            self.assertEqual(cached_render.destination_path, output_dir / 'project_name')
+            self.assertEqual(
+                cached_render.cookiecutter_context,
+                {'cookiecutter': {'foo': 'bar', '_output_dir': str(output_dir.resolve())}},
+            )
+            self.assert_file_content(output_dir / 'project_name' / 'file.txt', '1234567890')
+
+            # Mark "key3" as older than "key2":
+            meta_path = render_cache.cache_path / 'key3' / 'meta.json'
+            os.utime(meta_path, times=(1, 1))
+            render_cache.store(key='key4', cookiecutter_context=context, destination_path=rendered_path)
+            self.assertEqual(sorted(path.name for path in render_cache.cache_path.iterdir()), ['key2', 'key4'])
+
+            # Too large entries are not kept:
+            Path(rendered_path, 'file.txt').write_text('X' * 101)
+            render_cache.store(key='key5', cookiecutter_context=context, destination_path=rendered_path)
+            self.assertEqual(list(render_cache.cache_path.iterdir()), [])
+
+    def test_execute_cookiecutter(self):
+        with TemporaryDirectory(prefix='test_render_cache_cookiecutter_') as main_temp_path:
+            template_path = main_temp_path / 'template'
+            file_path = template_path / '{{cookiecutter.dir_name}}' / 'file.txt'
+            file_path.parent.mkdir(parents=True)
+            file_path.write_text('Value: {{ cookiecutter.value }}')
+            Path(template_path, 'cookiecutter.json').write_text(json.dumps({'dir_name': 'a_dir', 'value': 'Foo'}))
+            git, rev1 = init_git(template_path)
+            self.assertEqual(len(get_template_git_hash(template_path)), 40)
+
+            cache_path = main_temp_path / 'cache'
+            cache_path.mkdir()
+
+            def render(output_dir, extra_context):
+                with mock.patch.dict(os.environ, XDG_CACHE_HOME=str(cache_path)):
+                    return execute_cookiecutter(
+                        template=str(template_path),
+                        output_dir=output_dir,
+                        no_input=True,
+                        extra_context=extra_context,
+                        use_cache=True,
+                    )
+
+            with AssertLogs(self) as logs:
+                context, destination_path, repo_path = render(main_temp_path / 'out1', {'value': 'Bar'})
+            logs.assert_in("Call 'cookiecutter'", 'in render cache')
+            self.assertEqual(destination_path, main_temp_path / 'out1' / 'a_dir')
+            self.assert_file_content(destination_path / 'file.txt', 'Value: Bar')
+
+            with AssertLogs(self, loggers=('manageprojects',)) as logs:
+                context2, destination_path, repo_path = render(main_temp_path / 'out2', {'value': 'Bar'})
+            logs.assert_in('Render cache hit', 'Use cached render')
+            self.assertEqual(destination_path, main_temp_path / 'out2' / 'a_dir')
+            self.assert_file_content(destination_path / 'file.txt', 'Value: Bar')
+            self.assertEqual(context2['cookiecutter']['value'], 'Bar')
+            self.assertEqual(context2['cookiecutter']['_output_dir'], str(main_temp_path / 'out2'))
+
+            # Other context -> cache miss:
+            with AssertLogs(self) as logs:
+                render(main_temp_path / 'out3', {'value': 'Other'})
+            logs.assert_in("Call 'cookiecutter'")
+            assert_is_file(main_temp_path / 'out3' / 'a_dir' / 'file.txt')
+
+            # Uncommitted changes -> cache is not used:
+            file_path.write_text('Changed: {{ cookiecutter.value }}')
+            self.assertIsNone(get_template_git_hash(template_path))
+            with AssertLogs(self) as logs:
+                context, destination_path, repo_path = render(main_temp_path / 'out4', {'value': 'Bar'})
+            logs.assert_in("Call 'cookiecutter'", 'contains uncommitted changes')
+            self.assert_file_content(destination_path / 'file.txt', 'Changed: Bar')
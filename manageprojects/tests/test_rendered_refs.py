@@ -0,0 +1,131 @@
+import inspect
+import json
+from pathlib import Path
+
+from cli_base.cli_tools.test_utils.git_utils import init_git
+from cli_base.cli_tools.test_utils.logs import AssertLogs
+
+from manageprojects.constants import DIFF_ENGINE_IN_PROCESS
+from manageprojects.patching import generate_template_patch
+from manageprojects.rendered_refs import (
+    get_project_git,
+    get_rendered_tree,
+    make_rendered_tree_diff,
+    store_rendered_tree,
+    write_rendered_tree,
+)
+from manageprojects.tests.base import BaseTestCase
+from manageprojects.utilities.temp_path import TemporaryDirectory
+
+
+TEMPLATE_CONTENT = inspect.cleandoc(
+    '''
+    # Revision {rev}
+    print('Test: {{{{ cookiecutter.value }}}}')
+    '''
+)
+
+
+class RenderedRefsTestCase(BaseTestCase):
+    def test_store_rendered_tree(self):
+        with TemporaryDirectory(prefix='test_store_rendered_tree_') as main_temp_path:
+            project_path = main_temp_path / 'project'
+            project_path.mkdir()
+            Path(project_path, 'a_file.txt').write_text('Project content')
+            git, project_rev = init_git(project_path)
+
+            self.assertIsNone(get_project_git(project_path / 'sub_dir'))
+            self.assertIsNone(get_project_git(main_temp_path))
+            self.assertEqual(get_project_git(project_path).cwd, project_path)
+
+            rendered_path = main_temp_path / 'rendered'
+            Path(rendered_path, 'sub_dir').mkdir(parents=True)
+            Path(rendered_path, 'a_file.txt').write_text('Rev 1')
+            Path(rendered_path, 'sub_dir', 'b_file.txt').write_text('Rev 1')
+
+            self.assertIsNone(get_rendered_tree(git=git, rev='abc0001'))
+            with AssertLogs(self, loggers=('manageprojects',)) as logs:
+                from_tree = write_rendered_tree(git=git, rendered_path=rendered_path)
+                store_rendered_tree(git=git, rev='abc0001', tree_hash=from_tree)
+            logs.assert_in('written as tree', 'refs/manageprojects/rendered/abc0001')
+            self.assertEqual(get_rendered_tree(git=git, rev='abc0001'), from_tree)
+
+            Path(rendered_path, 'a_file.txt').write_text('Rev 2')
+            to_tree = write_rendered_tree(git=git, rendered_path=rendered_path)
+            patch = make_rendered_tree_diff(git=git, from_tree=from_tree, to_tree=to_tree)
+            self.assertIn('--- a/a_file.txt\n+++ b/a_file.txt', patch)
+            self.assertIn('-Rev 1\n\\ No newline at end of file\n+Rev 2', patch)
+            self.assertNotIn('b_file.txt', patch)
+            self.assertIsNone(make_rendered_tree_diff(git=git, from_tree=to_tree, to_tree=to_tree))
+
+            # Only the render of the last applied revision is kept:
+            with AssertLogs(self, loggers=('manageprojects',)) as logs:
+                store_rendered_tree(git=git, rev='abc0002', tree_hash=to_tree)
+            logs.assert_in('Remove old rendered tree ref refs/manageprojects/rendered/abc0001')
+            self.assertIsNone(get_rendered_tree(git=git, rev='abc0001'))
+            self.assertEqual(get_rendered_tree(git=git, rev='abc0002'), to_tree)
+
+            # The work tree, the index and the history of the project are not changed:
+            self.assertEqual(git.status(verbose=False), [])
+            self.assertEqual(git.get_current_hash(verbose=False), project_rev)
+            self.assert_file_content(project_path / 'a_file.txt', 'Project content')
+
+    def test_generate_template_patch_with_stored_render(self):
+        with TemporaryDirectory(prefix='test_generate_template_patch_with_stored_render_') as main_temp_path:
+            repo_path = main_temp_path / 'template'
+            test_file_path = repo_path / '{{cookiecutter.dir_name}}' / 'a_file.py'
+            test_file_path.parent.mkdir(parents=True)
+            test_file_path.write_text(TEMPLATE_CONTENT.format(rev=1))
+            Path(repo_path, 'cookiecutter.json').write_text(json.dumps({'dir_name': 'a_dir', 'value': 'Foo'}))
+            template_git, from_rev = init_git(repo_path)
+
+            test_file_path.write_text(TEMPLATE_CONTENT.format(rev=2))
+            template_git.add('.', verbose=False)
+            template_git.commit('Template rev 2', verbose=False)
+            to_rev = template_git.get_current_hash(verbose=False)
+
+            project_path = main_temp_path / 'project'
+            project_path.mkdir()
+            Path(project_path, 'a_file.py').write_text('# Revision 1')
+            project_git, _ = init_git(project_path)
+
+            # Store a render of the old revision:
+            rendered_path = main_temp_path / 'rendered'
+            rendered_path.mkdir()
+            rendered_content = TEMPLATE_CONTENT.format(rev=1).replace('{{ cookiecutter.value }}', 'Bar')
+            Path(rendered_path, 'a_file.py').write_text(rendered_content)
+            from_tree = write_rendered_tree(git=project_git, rendered_path=rendered_path)
+            store_rendered_tree(git=project_git, rev=from_rev, tree_hash=from_tree)
+
+            with AssertLogs(self, loggers=('manageprojects',)) as logs:
+                result = generate_template_patch(
+                    project_path=project_path,
+                    template=str(repo_path),
+                    from_rev=from_rev,
+                    replay_context={'cookiecutter': {'value': 'Bar'}},
+                    no_input=True,
+                )
+            logs.assert_in("Call 'cookiecutter'", 'written as tree')
+
+            # Only the current revision was rendered:
+            self.assertIsNone(result.compiled_from_path)
+            self.assertEqual(result.to_rev, to_rev)
+            patch = result.patch_file_path.read_text()
+            self.assertIn('--- a/a_file.py\n+++ b/a_file.py\n@@ -1,2 +1,2 @@\n-# Revision 1\n+# Revision 2\n', patch)
+
+            # The ref of the current revision is set after the patch was applied:
+            self.assertIsNone(get_rendered_tree(git=project_git, rev=to_rev))
+
+            # The stored render can only be compared via git: The "in-process" engine renders both revisions
+            with AssertLogs(self, loggers=('manageprojects',)) as logs:
+                result = generate_template_patch(
+                    project_path=project_path,
+                    template=str(repo_path),
+                    from_rev=from_rev,
+                    replay_context={'cookiecutter': {'value': 'Bar'}},
+                    no_input=True,
+                    diff_engine=DIFF_ENGINE_IN_PROCESS,
+                )
+            logs.assert_in("Diff engine 'in-process': Ignore the stored render")
+            self.assertIsNotNone(result.compiled_from_path)
+            self.assertIn('-# Revision 1\n+# Revision 2\n', result.patch_file_path.read_text())
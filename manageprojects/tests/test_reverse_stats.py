@@ -0,0 +1,53 @@
+import json
+
+from bx_py_utils.test_utils.redirect import RedirectOut
+
+from manageprojects.reverse_stats import ReverseFileStats, ReverseStats
+from manageprojects.tests.base import BaseTestCase
+from manageprojects.utilities.temp_path import TemporaryDirectory
+
+
+class ReverseStatsTestCase(BaseTestCase):
+    def test_report(self):
+        stats = ReverseStats(
+            files=[
+                ReverseFileStats(source='README.md', binary=False, duration=0.2, hits={'{{ a }}': 3, '{{ b }}': 1}),
+                ReverseFileStats(source='logo.png', binary=True, duration=0.01, hits={}),
+                ReverseFileStats(source='setup.py', binary=False, duration=0.5, hits={'{{ a }}': 1}),
+                ReverseFileStats(source='LICENSE', binary=False, duration=0.1, hits={}),
+            ],
+            skipped=5,
+            duration=1.23456,
+        )
+        report = stats.get_report(top=2)
+        self.assertEqual(
+            report,
+            {
+                'files': 4,
+                'binary_files': 1,
+                'skipped_files': 5,
+                'duration': 1.2346,
+                'hits': 5,
+                'top_files_by_time': [
+                    {'source': 'setup.py', 'duration': 0.5, 'hits': 1},
+                    {'source': 'README.md', 'duration': 0.2, 'hits': 4},
+                ],
+                'top_keys_by_hits': [
+                    {'key': '{{ a }}', 'hits': 4, 'files': 2},
+                    {'key': '{{ b }}', 'hits': 1, 'files': 1},
+                ],
+                'zero_match_files': ['LICENSE'],
+            },
+        )
+
+        with TemporaryDirectory(prefix='test_reverse_stats_') as temp_path:
+            json_path = temp_path / 'stats.json'
+            stats.write_json(json_path, top=2)
+            self.assertEqual(json.loads(json_path.read_text()), report)
+
+        with RedirectOut() as buffer:
+            stats.print_report(top=2)
+        self.assertIn('Top 2 files by time', buffer.stdout)
+        self.assertIn('{{ a }}', buffer.stdout)
+        self.assertIn('1 text files without any match:\n * LICENSE\n', buffer.stdout)
+        self.assertIn('4 files converted in 1.23s (1 binary, 5 unchanged skipped), 5 replacements', buffer.stdout)
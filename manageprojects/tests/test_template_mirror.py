@@ -0,0 +1,117 @@
+import json
+import os
+import subprocess
+from pathlib import Path
+from unittest import mock
+
+from cli_base.cli_tools.test_utils.git_utils import init_git
+from cli_base.cli_tools.test_utils.logs import AssertLogs
+
+from manageprojects.cookiecutter_api import execute_cookiecutter, get_repo_path
+from manageprojects.template_mirror import TemplateMirror
+from manageprojects.tests.base import BaseTestCase
+from manageprojects.utilities.temp_path import TemporaryDirectory
+
+
+class TemplateMirrorTestCase(BaseTestCase):
+    def test_get_repo_path_via_mirror(self):
+        with TemporaryDirectory(prefix='test_get_repo_path_via_mirror_') as main_temp_path:
+            origin_path = main_temp_path / 'origin' / 'my_template'
+            template_path = origin_path / 'sub_template'
+            Path(template_path, '{{cookiecutter.dir_name}}').mkdir(parents=True)
+            Path(template_path, 'cookiecutter.json').write_text(json.dumps({'dir_name': 'a_dir'}))
+            file_path = template_path / '{{cookiecutter.dir_name}}' / 'file.txt'
+            file_path.write_text('Rev 1')
+            origin_git, rev1 = init_git(origin_path)
+
+            template = f'git+file://{origin_path}'
+            get_repo_path_kwargs = dict(template=template, directory='sub_template')
+            Path(main_temp_path, 'cache').mkdir()
+            cache_env = {'XDG_CACHE_HOME': str(main_temp_path / 'cache')}
+            # Cookiecutter should never clone the template:
+            clone_mock = mock.patch('cookiecutter.repository.clone', side_effect=AssertionError('clone() called'))
+            with mock.patch.dict(os.environ, cache_env), clone_mock:
+                with AssertLogs(self, loggers=('manageprojects',)) as logs:
+                    repo_path = get_repo_path(**get_repo_path_kwargs)
+                logs.assert_in('Create template mirror of file://')
+                self.assertEqual(repo_path.name, 'sub_template')
+                self.assertEqual(repo_path.parent.name, 'my_template')
+                self.assertTrue(repo_path.is_relative_to(main_temp_path / 'cache' / 'manageprojects'))
+                self.assert_file_content(repo_path / '{{cookiecutter.dir_name}}' / 'file.txt', 'Rev 1')
+
+                file_path.write_text('Rev 2')
+                origin_git.add('.', verbose=False)
+                origin_git.commit('The second commit', verbose=False)
+                rev2 = origin_git.get_current_hash(verbose=False)
+
+                # The mirror is fresh: The new commit is not fetched
+                with AssertLogs(self, loggers=('manageprojects',)) as logs:
+                    self.assertEqual(get_repo_path(**get_repo_path_kwargs), repo_path)
+                logs.assert_in('Use template mirror')
+                self.assert_file_content(repo_path / '{{cookiecutter.dir_name}}' / 'file.txt', 'Rev 1')
+
+                # A missing revision is fetched and checked out into a own worktree:
+                with AssertLogs(self, loggers=('manageprojects',)) as logs:
+                    repo_path2 = get_repo_path(checkout=rev2, **get_repo_path_kwargs)
+                logs.assert_in('Fetch template mirror', 'Add worktree of rev.')
+                self.assertNotEqual(repo_path2, repo_path)
+                self.assertEqual(repo_path2.parent.name, 'my_template')
+                self.assert_file_content(repo_path2 / '{{cookiecutter.dir_name}}' / 'file.txt', 'Rev 2')
+
+                # The checkout of rev. 1 is not changed, so it can be used at the same time:
+                self.assert_file_content(repo_path / '{{cookiecutter.dir_name}}' / 'file.txt', 'Rev 1')
+                with AssertLogs(self, loggers=('manageprojects',)) as logs:
+                    self.assertEqual(get_repo_path(checkout=rev1, **get_repo_path_kwargs), repo_path)
+                logs.assert_in('Use template mirror', 'Use worktree of rev.')
+
+                # Fetch the default branch, if the mirror is too old:
+                with AssertLogs(self, loggers=('manageprojects',)) as logs:
+                    self.assertEqual(get_repo_path(mirror_ttl=0, **get_repo_path_kwargs), repo_path2)
+                logs.assert_in('Fetch template mirror')
+                repo_path = repo_path2
+
+                # The template is resolved only once per render:
+                with mock.patch(
+                    'manageprojects.cookiecutter_api.get_repo_path', wraps=get_repo_path
+                ) as get_repo_path_mock:
+                    context, destination_path, result_repo_path = execute_cookiecutter(
+                        output_dir=main_temp_path / 'output', no_input=True, **get_repo_path_kwargs
+                    )
+                self.assertEqual(get_repo_path_mock.call_count, 1)
+                self.assertEqual(result_repo_path, repo_path)
+                self.assert_file_content(destination_path / 'file.txt', 'Rev 2')
+
+    def test_git_error(self):
+        with TemporaryDirectory(prefix='test_template_mirror_git_error_') as main_temp_path:
+            mirror = TemplateMirror(f'file://{main_temp_path}/not_existing', cache_path=main_temp_path / 'cache')
+            # The callers (e.g.: "outdated", "update-fleet") handle the error per project:
+            with self.assertRaises(subprocess.CalledProcessError), AssertLogs(self, loggers=('manageprojects',)):
+                mirror.get_checkout()
+
+    def test_evict_worktrees(self):
+        with TemporaryDirectory(prefix='test_template_mirror_evict_') as main_temp_path:
+            origin_path = main_temp_path / 'origin' / 'my_template'
+            origin_path.mkdir(parents=True)
+            file_path = origin_path / 'file.txt'
+            file_path.write_text('Rev 1')
+            origin_git, rev1 = init_git(origin_path)
+            file_path.write_text('Rev 2')
+            origin_git.add('.', verbose=False)
+            origin_git.commit('The second commit', verbose=False)
+            rev2 = origin_git.get_current_hash(verbose=False)
+
+            mirror = TemplateMirror(f'file://{origin_path}', cache_path=main_temp_path / 'cache', max_worktrees=1)
+            with AssertLogs(self, loggers=('manageprojects',)):
+                repo_path1 = mirror.get_checkout(checkout=rev1)
+                self.assert_file_content(repo_path1 / 'file.txt', 'Rev 1')
+                self.assertEqual(mirror.get_checkout(checkout=rev1), repo_path1)
+
+            with AssertLogs(self, loggers=('manageprojects',)) as logs:
+                repo_path2 = mirror.get_checkout(checkout=rev2)
+            logs.assert_in('Add worktree of rev.', 'Remove least recently used worktree')
+            self.assert_file_content(repo_path2 / 'file.txt', 'Rev 2')
+            self.assertFalse(repo_path1.parent.exists())
+            self.assertEqual([path.name for path in mirror.worktrees_path.iterdir()], [repo_path2.parent.name])
+            worktrees = mirror.git.git_verbose_check_output('worktree', 'list', '--porcelain', verbose=False)
+            self.assertIn(str(repo_path2), worktrees)
+            self.assertNotIn(str(repo_path1), worktrees)
@@ -0,0 +1,91 @@
+import json
+import logging
+from pathlib import Path
+
+from bx_py_utils.path import assert_is_dir
+from cli_base.cli_tools.test_utils.git_utils import init_git
+from cli_base.cli_tools.test_utils.logs import AssertLogs
+
+from manageprojects.cookiecutter_api import execute_cookiecutter_revisions
+from manageprojects.template_worktree import TemplateWorktree, find_git_root, get_git
+from manageprojects.tests.base import BaseTestCase
+from manageprojects.utilities.process_pool import LoggingProcessPoolExecutor
+from manageprojects.utilities.temp_path import TemporaryDirectory
+
+
+def _log_in_worker(value):
+    logging.getLogger('manageprojects.tests').info('Log from worker: %s', value)
+    return value * 2
+
+
+class TemplateWorktreeTestCase(BaseTestCase):
+    def test_template_worktree(self):
+        with TemporaryDirectory(prefix='test_template_worktree_') as main_temp_path:
+            repo_path = main_temp_path / 'repo_name'
+            template_path = repo_path / 'sub_template'
+            template_path.mkdir(parents=True)
+            file_path = template_path / 'file.txt'
+            file_path.write_text('Rev 1')
+            git, rev1 = init_git(repo_path)
+
+            file_path.write_text('Rev 2')
+            git.add('.', verbose=False)
+            git.commit('The second commit', verbose=False)
+
+            self.assertEqual(find_git_root(template_path), repo_path)
+            self.assertEqual(get_git(template_path).cwd, repo_path)
+
+            temp_path = main_temp_path / 'temp'
+            with AssertLogs(self, loggers=('manageprojects',)) as logs:
+                with TemplateWorktree(repo_path=template_path, rev=rev1, temp_path=temp_path) as worktree_path:
+                    self.assertEqual(worktree_path, temp_path / f'{rev1}_worktree' / 'repo_name' / 'sub_template')
+                    self.assert_file_content(worktree_path / 'file.txt', 'Rev 1')
+
+                    # The worktree contains a ".git" file:
+                    self.assertEqual(find_git_root(worktree_path), worktree_path.parent)
+                    self.assertEqual(get_git(worktree_path).get_current_hash(verbose=False), rev1)
+            logs.assert_in('Add git worktree', 'Remove git worktree')
+
+            self.assertFalse(worktree_path.exists())
+            self.assert_file_content(file_path, 'Rev 2')  # The main checkout is not changed
+
+    def test_logging_process_pool(self):
+        with AssertLogs(self, loggers=('manageprojects',)) as logs:
+            with LoggingProcessPoolExecutor(max_workers=2) as executor:
+                results = list(executor.map(_log_in_worker, [1, 2]))
+        self.assertEqual(results, [2, 4])
+        logs.assert_in('Log from worker: 1', 'Log from worker: 2')
+
+    def test_execute_cookiecutter_revisions(self):
+        with TemporaryDirectory(prefix='test_execute_cookiecutter_revisions_') as main_temp_path:
+            repo_path = main_temp_path / 'template'
+            file_path = repo_path / '{{cookiecutter.dir_name}}' / 'file.txt'
+            file_path.parent.mkdir(parents=True)
+            file_path.write_text('Rev 1: {{ cookiecutter.value }}')
+            Path(repo_path, 'cookiecutter.json').write_text(json.dumps({'dir_name': 'a_dir', 'value': 'Foo'}))
+            git, rev1 = init_git(repo_path)
+
+            file_path.write_text('Rev 2: {{ cookiecutter.value }}')
+            git.add('.', verbose=False)
+            git.commit('The second commit', verbose=False)
+            rev2 = git.get_current_hash(verbose=False)
+
+            with AssertLogs(self, loggers=('manageprojects',)) as logs:
+                results = execute_cookiecutter_revisions(
+                    repo_path=repo_path,
+                    revisions={rev1: main_temp_path / 'rev1', rev2: main_temp_path / 'rev2'},
+                    temp_path=main_temp_path / 'temp',
+                    template=str(repo_path),
+                    no_input=True,
+                    extra_context={'value': 'Bar'},
+                )
+            logs.assert_in('Render 2 revisions in parallel', "Call 'cookiecutter'")
+
+            self.assertEqual(sorted(results), sorted([rev1, rev2]))
+            for rev, expected in ((rev1, 'Rev 1: Bar'), (rev2, 'Rev 2: Bar')):
+                context, destination_path, template_path = results[rev]
+                self.assertEqual(context['cookiecutter']['_template'], str(repo_path))
+                self.assert_file_content(destination_path / 'file.txt', expected)
+
+            assert_is_dir(repo_path)
+            self.assertEqual(git.get_current_hash(verbose=False), rev2)
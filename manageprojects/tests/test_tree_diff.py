@@ -0,0 +1,137 @@
+import inspect
+import os
+import shutil
+from pathlib import Path
+
+from cli_base.cli_tools.git import Git
+from cli_base.cli_tools.test_utils.logs import AssertLogs
+
+from manageprojects.tests.base import BaseTestCase
+from manageprojects.tree_diff import get_blob_hash, make_tree_diff, quote_path, scan_tree, split_lines
+from manageprojects.utilities.temp_path import TemporaryDirectory
+
+
+def apply_patch(*, path: Path, patch: str) -> None:
+    patch_path = path.parent / 'test.patch'
+    patch_path.write_text(patch)
+    git = Git(cwd=path, detect_root=False)
+    git.git_verbose_check_output('apply', '--verbose', patch_path, verbose=False, exit_on_error=True)
+
+
+def assert_same_tree(test_case: BaseTestCase, path1: Path, path2: Path) -> None:
+    files1 = scan_tree(path1)
+    files2 = scan_tree(path2)
+    test_case.assertEqual(sorted(files1), sorted(files2))
+    for rel_path, file1 in files1.items():
+        file2 = files2[rel_path]
+        test_case.assertEqual(file1.mode, file2.mode, rel_path)
+        test_case.assertEqual(file1.content, file2.content, rel_path)
+
+
+class TreeDiffTestCase(BaseTestCase):
+    def test_helpers(self):
+        self.assertEqual(get_blob_hash(b''), 'e69de29bb2d1d6434b8b29ae775ad8c2e48c5391')
+        self.assertEqual(get_blob_hash(b'Rev 1'), '4ec526afe9b30814b8ad7a7b28bec96497db3455')
+        self.assertEqual(split_lines('a\r\nb\fc\nd'), ['a\r\n', 'b\fc\n', 'd'])
+        self.assertEqual(split_lines('a\n'), ['a\n'])
+        self.assertEqual(quote_path('foo/bär.txt'), 'foo/bär.txt')
+        self.assertEqual(quote_path('foo\tbar"'), '"foo\\tbar\\""')
+
+    def test_make_tree_diff(self):
+        with TemporaryDirectory(prefix='test_make_tree_diff_') as main_temp_path:
+            from_path = main_temp_path / 'from'
+            to_path = main_temp_path / 'to'
+            from_path.mkdir()
+            to_path.mkdir()
+
+            Path(from_path, 'file1.txt').write_text('Rev 1')
+            Path(to_path, 'file1.txt').write_text('Rev 2')
+
+            renamed_file_content = inspect.cleandoc(
+                '''
+                # This file is just renamed,
+                # so the content is the same ;)
+                '''
+            )
+            Path(from_path, 'old_name.txt').write_text(renamed_file_content)
+            Path(to_path, 'new_name.txt').write_text(renamed_file_content)
+
+            self.assertIsNone(make_tree_diff(from_path=from_path, to_path=from_path))
+
+            with AssertLogs(self, loggers=('manageprojects',)) as logs:
+                patch = make_tree_diff(from_path=from_path, to_path=to_path)
+            logs.assert_in('Compare 2 "from" files with 2 "to" files')
+            self.assert_content(
+                patch,
+                inspect.cleandoc(
+                    r'''
+                    diff --git a/file1.txt b/file1.txt
+                    index 4ec526a..a0423cd 100644
+                    --- a/file1.txt
+                    +++ b/file1.txt
+                    @@ -1 +1 @@
+                    -Rev 1
+                    \ No newline at end of file
+                    +Rev 2
+                    \ No newline at end of file
+                    diff --git a/old_name.txt b/new_name.txt
+                    similarity index 100%
+                    rename from old_name.txt
+                    rename to new_name.txt
+                    '''
+                ),
+            )
+
+    def test_git_apply(self):
+        with TemporaryDirectory(prefix='test_tree_diff_git_apply_') as main_temp_path:
+            from_path = main_temp_path / 'from'
+            to_path = main_temp_path / 'to'
+
+            lines = [f'Line {no}\n' for no in range(1, 30)]
+            Path(from_path, 'sub dir').mkdir(parents=True)
+            Path(from_path, 'sub dir', 'changed.txt').write_text(''.join(lines))
+            Path(from_path, 'removed.txt').write_text('This file will be removed\n')
+            Path(from_path, 'empty_removed.txt').touch()
+            Path(from_path, 'binary.bin').write_bytes(bytes(range(256)) * 10)
+            Path(from_path, 'removed.bin').write_bytes(b'\0\1\2')
+            Path(from_path, 'script.sh').write_text('#!/bin/sh\necho "Hello"\n')
+            Path(from_path, 'unchanged.txt').write_text('Not changed')
+            Path(from_path, '.git').mkdir()
+            Path(from_path, '.git', 'ignored.txt').write_text('from')
+
+            shutil.copytree(from_path, to_path, symlinks=True)
+
+            lines[2] = 'Line 3 changed\n'
+            lines.insert(20, 'A new line\n')
+            Path(to_path, 'sub dir', 'changed.txt').write_text(''.join(lines))
+            Path(to_path, 'removed.txt').unlink()
+            Path(to_path, 'empty_removed.txt').unlink()
+            Path(to_path, 'removed.bin').unlink()
+            Path(to_path, 'binary.bin').write_bytes(bytes(range(256)) * 9 + b'\0')
+            Path(to_path, 'new.bin').write_bytes(b'\0new binary')
+            Path(to_path, 'new', 'dir').mkdir(parents=True)
+            Path(to_path, 'new', 'dir', 'new.txt').write_text('A new file\nwithout newline at the end')
+            Path(to_path, 'new_empty.txt').touch()
+            Path(to_path, 'crlf.txt').write_bytes(b'Windows\r\nline endings\r\n')
+            os.chmod(to_path / 'script.sh', 0o755)
+            Path(to_path, 'symlink.txt').symlink_to('unchanged.txt')
+            Path(to_path, '.git', 'ignored.txt').write_text('to')
+
+            patch = make_tree_diff(from_path=from_path, to_path=to_path)
+            self.assertIn('diff --git a/sub dir/changed.txt b/sub dir/changed.txt', patch)
+            self.assertIn('--- a/sub dir/changed.txt\t\n', patch)
+            self.assertIn('-Line 3\n+Line 3 changed\n', patch)
+            self.assertIn('deleted file mode 100644\n', patch)
+            self.assertIn('GIT binary patch\nliteral 11\n', patch)
+            self.assertIn('old mode 100644\nnew mode 100755\n', patch)
+            self.assertIn('new file mode 120000\n', patch)
+            self.assertNotIn('unchanged.txt b/unchanged.txt', patch)
+            self.assertNotIn('ignored.txt', patch)
+
+            # Apply the patch on a copy of the "from" tree -> must result in the "to" tree:
+            applied_path = main_temp_path / 'applied'
+            shutil.copytree(from_path, applied_path, symlinks=True)
+            shutil.rmtree(applied_path / '.git')
+            apply_patch(path=applied_path, patch=patch)
+            shutil.rmtree(to_path / '.git')
+            assert_same_tree(self, applied_path, to_path)
@@ -0,0 +1,103 @@
+import json
+from pathlib import Path
+
+from bx_py_utils.test_utils.redirect import RedirectOut
+from cli_base.cli_tools.test_utils.git_utils import init_git
+from cli_base.cli_tools.test_utils.logs import AssertLogs
+
+from manageprojects.tests.base import BaseTestCase
+from manageprojects.update_plan import plan_update
+from manageprojects.utilities.temp_path import TemporaryDirectory
+
+
+class UpdatePlanTestCase(BaseTestCase):
+    def test_plan_update(self):
+        with TemporaryDirectory(prefix='test_plan_update_') as main_temp_path:
+            template_path = main_temp_path / 'template'
+            template_dir_path = template_path / '{{cookiecutter.dir_name}}'
+            template_dir_path.mkdir(parents=True)
+            Path(template_path, 'cookiecutter.json').write_text(json.dumps({'dir_name': 'a_dir'}))
+            Path(template_dir_path, 'modified.txt').write_text('one\ntwo\nthree\n')
+            Path(template_dir_path, 'conflict.txt').write_text('one\ntwo\nthree\n')
+            Path(template_dir_path, 'removed.txt').write_text('Removed\n')
+            template_git, rev1 = init_git(template_path)
+
+            Path(template_dir_path, 'modified.txt').write_text('one\nTWO\nthree\nfour\n')
+            Path(template_dir_path, 'conflict.txt').write_text('one\ntwo\nTHREE\n')
+            Path(template_dir_path, 'removed.txt').unlink()
+            Path(template_dir_path, 'image.png').write_bytes(b'\x89PNG\r\n\x1a\n\0')
+            template_git.add('.', verbose=False)
+            template_git.commit('Template rev 2', verbose=False)
+            rev2 = template_git.get_current_hash(verbose=False)
+
+            project_path = main_temp_path / 'project'
+            project_path.mkdir()
+            Path(project_path, 'modified.txt').write_text('one\ntwo\nthree\n')
+            Path(project_path, 'conflict.txt').write_text('Changed\nin the\nproject\n')
+            Path(project_path, 'removed.txt').write_text('Removed\n')
+            project_git, project_rev = init_git(project_path)
+
+            def get_git_state():
+                return (
+                    project_git.git_verbose_check_output('for-each-ref', 'refs/manageprojects', verbose=False),
+                    project_git.git_verbose_check_output('count-objects', '-v', verbose=False),
+                )
+
+            git_state = get_git_state()
+
+            with RedirectOut(), AssertLogs(self, loggers=('manageprojects',)) as logs:
+                plan = plan_update(
+                    git=project_git,
+                    project_path=project_path,
+                    template=str(template_path),
+                    from_rev=rev1,
+                    replay_context={'cookiecutter': {'dir_name': 'a_dir'}},
+                    no_input=True,
+                    repo_path=template_path,
+                )
+            # Binary patches and deletions without content (git diff --irreversible-delete) can't be applied:
+            logs.assert_in('git apply --check: 3 files will not apply cleanly')
+
+            report = plan.get_report()
+            self.assertEqual(report['to_rev'], rev2)
+            self.assertEqual(
+                {key: report[key] for key in ('files', 'added', 'removed', 'modified', 'binary', 'conflicts')},
+                {
+                    'files': 4,
+                    'added': 1,
+                    'removed': 1,
+                    'modified': 2,
+                    'binary': 1,
+                    'conflicts': ['conflict.txt', 'image.png', 'removed.txt'],
+                },
+            )
+            self.assertEqual(
+                [info['path'] for info in report['file_plans']],
+                ['conflict.txt', 'image.png', 'modified.txt', 'removed.txt'],
+            )
+            self.assertEqual(
+                report['file_plans'][2],
+                {
+                    'path': 'modified.txt',
+                    'status': 'modified',
+                    'added_lines': 2,
+                    'removed_lines': 1,
+                    'binary': False,
+                    'conflict': False,
+                },
+            )
+
+            # The project is not changed:
+            self.assertEqual(project_git.status(verbose=False), [])
+            self.assertEqual(project_git.get_current_hash(verbose=False), project_rev)
+            self.assertFalse(Path(project_path, '.manageprojects').exists())
+            # No rendered trees are stored in the project repository:
+            self.assertEqual(get_git_state(), git_state)
+
+            with RedirectOut() as buffer:
+                plan.print_report()
+            self.assertIn('4 files: 1 added, 1 removed, 2 modified (1 binary)', buffer.stdout)
+
+            json_path = main_temp_path / 'plan.json'
+            plan.write_json(json_path)
+            self.assertEqual(json.loads(json_path.read_text()), report)
@@ -0,0 +1,43 @@
+from pathlib import Path
+
+from cli_base.cli_tools.test_utils.git_utils import init_git
+
+from manageprojects.tests.base import BaseTestCase
+from manageprojects.utilities.binary_files import get_git_binary_paths, is_binary_content
+from manageprojects.utilities.temp_path import TemporaryDirectory
+
+
+class BinaryFilesTestCase(BaseTestCase):
+    def test_is_binary_content(self):
+        self.assertIs(is_binary_content(b'Foo\x00Bar'), True)
+        self.assertIs(is_binary_content(b'\x89PNG\r\n\x1a\n...'), True)
+        self.assertIs(is_binary_content(b'%PDF-1.7'), True)
+        self.assertIs(is_binary_content(b'Foo Bar'), False)
+        self.assertIs(is_binary_content('Äöü €'.encode()), False)
+        self.assertIs(is_binary_content(b''), False)
+
+        # Plain ASCII prefixes are binary only with the complete signature:
+        self.assertIs(is_binary_content(b'RIFF\x24\xf0\x01\x01WAVEfmt '), True)
+        self.assertIs(is_binary_content(b'RIFF\xff\xff\xff\xffWEBPVP8 '), True)
+        self.assertIs(is_binary_content(b'RIFF format notes\n'), False)
+        self.assertIs(is_binary_content(b'BZh91AY&SY\xfe\xa1'), True)
+        self.assertIs(is_binary_content(b'BZh9\x17rE8P\x90'), True)  # Empty bzip2 file
+        self.assertIs(is_binary_content(b'BZh is a bzip2 header\n'), False)
+
+    def test_get_git_binary_paths(self):
+        with TemporaryDirectory(prefix='test_get_git_binary_paths_') as temp_path:
+            Path(temp_path, '.gitattributes').write_text('*.dat -text\n*.img binary\n')
+            Path(temp_path, 'sub dir').mkdir()
+            file_paths = [
+                temp_path / 'text.txt',
+                temp_path / 'data.dat',
+                temp_path / 'sub dir' / 'disk.img',
+            ]
+            for file_path in file_paths:
+                file_path.write_text('Foo Bar')
+            git, _ = init_git(temp_path)
+
+            binary_paths = get_git_binary_paths(git=git, file_paths=file_paths)
+            self.assertEqual(binary_paths, {temp_path / 'data.dat', temp_path / 'sub dir' / 'disk.img'})
+
+            self.assertEqual(get_git_binary_paths(git=git, file_paths=[]), set())
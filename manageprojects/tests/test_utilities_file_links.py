@@ -0,0 +1,120 @@
+import json
+import os
+from pathlib import Path
+from unittest import mock
+
+from cli_base.cli_tools.test_utils.logs import AssertLogs
+
+from manageprojects.constants import LINK_MODE_COPY, LINK_MODE_HARDLINK, LINK_MODE_REFLINK
+from manageprojects.cookiecutter_api import execute_cookiecutter
+from manageprojects.tests.base import BaseTestCase
+from manageprojects.utilities.file_links import LinkingShutil, copy_file, link_file
+from manageprojects.utilities.file_links_benchmark import benchmark_file_links
+from manageprojects.utilities.temp_path import TemporaryDirectory
+
+
+class FileLinksTestCase(BaseTestCase):
+    def test_link_file(self):
+        with TemporaryDirectory(prefix='test_link_file_') as temp_path:
+            src_path = temp_path / 'source.png'
+            src_path.write_bytes(b'\x89PNG\r\n\x1a\n')
+            src_path.chmod(0o640)
+
+            with mock.patch('manageprojects.utilities.file_links.copy_file_range_file', return_value=False):
+                self.assertEqual(link_file(src_path, temp_path / 'copy.png', link_mode=LINK_MODE_COPY), 'copy')
+            self.assertNotEqual(Path(temp_path, 'copy.png').stat().st_ino, src_path.stat().st_ino)
+            if hasattr(os, 'copy_file_range'):
+                method = link_file(src_path, temp_path / 'in_kernel.png', link_mode=LINK_MODE_COPY)
+                self.assertIn(method, ('copy_file_range', 'copy'))  # Depends on the file system
+                self.assertEqual(Path(temp_path, 'in_kernel.png').read_bytes(), b'\x89PNG\r\n\x1a\n')
+
+            # Fallback to a copy, if the file system doesn't support reflinks:
+            with mock.patch('manageprojects.utilities.file_links.reflink_file', return_value=False), mock.patch(
+                'manageprojects.utilities.file_links.copy_file_range_file', return_value=False
+            ):
+                self.assertEqual(link_file(src_path, temp_path / 'clone.png', link_mode=LINK_MODE_REFLINK), 'copy')
+                self.assertEqual(
+                    link_file(src_path, temp_path / 'link.png', link_mode=LINK_MODE_HARDLINK), 'hardlink'
+                )
+            self.assertEqual(Path(temp_path, 'clone.png').read_bytes(), b'\x89PNG\r\n\x1a\n')
+            link_path = temp_path / 'link.png'
+            self.assertEqual(link_path.stat().st_ino, src_path.stat().st_ino)
+
+            linking_shutil = LinkingShutil(LINK_MODE_HARDLINK)
+            with mock.patch('manageprojects.utilities.file_links.reflink_file', return_value=False):
+                linking_shutil.copy2(src_path, temp_path / 'copy2.png')
+                linking_shutil.copymode(src_path, temp_path / 'copy2.png')
+            self.assertEqual(linking_shutil.counts, {'hardlink': 1})
+            self.assertEqual(Path(temp_path, 'copy2.png').stat().st_ino, src_path.stat().st_ino)
+
+    def test_copy_file(self):
+        with TemporaryDirectory(prefix='test_copy_file_') as temp_path:
+            src_path = temp_path / 'src.bin'
+            src_path.write_bytes(b'\x00\xff' * 100_000)
+            os.utime(src_path, (1_000_000_000, 1_000_000_000))
+
+            dst_path = temp_path / 'dst.bin'
+            dst_path.write_bytes(b'Will be overwritten' * 200_000)
+            self.assertNotEqual(copy_file(src_path, dst_path), 'hardlink')
+
+            self.assertEqual(dst_path.read_bytes(), b'\x00\xff' * 100_000)
+            self.assertEqual(dst_path.stat().st_mtime, 1_000_000_000)
+
+    def test_benchmark_file_links(self):
+        with TemporaryDirectory(prefix='test_benchmark_file_links_') as temp_path:
+            # e.g.: No reflinks on ext4:
+            with mock.patch.dict(
+                'manageprojects.utilities.file_links_benchmark.BENCHMARK_METHODS',
+                {'reflink': lambda src_path, dst_path: False},
+            ):
+                results = benchmark_file_links(temp_path, file_count=3, file_size=100)
+            self.assertEqual(
+                [result.method for result in results], ['read/write', 'copy', 'copy_file_range', 'reflink', 'hardlink']
+            )
+            self.assertEqual(results[0].speedup, 1)
+            self.assertIsNone(results[3].duration)
+            self.assertEqual(list(temp_path.iterdir()), [])  # Cleaned up
+
+    def test_execute_cookiecutter_with_links(self):
+        with TemporaryDirectory(prefix='test_execute_cookiecutter_with_links_') as main_temp_path:
+            repo_path = main_temp_path / 'template'
+            dir_path = repo_path / '{{cookiecutter.dir_name}}'
+            Path(dir_path, 'fonts').mkdir(parents=True)
+            Path(repo_path, 'cookiecutter.json').write_text(
+                json.dumps({'dir_name': 'a_dir', '_copy_without_render': ['fonts']})
+            )
+            Path(dir_path, 'README.txt').write_text('{{ cookiecutter.dir_name }}')
+            Path(dir_path, 'image.png').write_bytes(b'\x89PNG\r\n\x1a\n\0')
+            Path(dir_path, 'fonts', 'font.woff').write_bytes(b'wOFF\0')
+
+            Path(main_temp_path, 'cache').mkdir()
+            with mock.patch.dict('os.environ', {'XDG_CACHE_HOME': str(main_temp_path / 'cache')}), mock.patch(
+                'manageprojects.utilities.file_links.reflink_file', return_value=False
+            ), mock.patch('manageprojects.utilities.file_links.copy_file_range_file', return_value=False):
+                with AssertLogs(self, loggers=('manageprojects',)) as logs:
+                    _, destination_path, _ = execute_cookiecutter(
+                        template=str(repo_path),
+                        output_dir=main_temp_path / 'hardlinks',
+                        no_input=True,
+                        link_mode=LINK_MODE_HARDLINK,
+                    )
+                logs.assert_in("Unrendered files created via hardlink: {'hardlink': 2}")
+                for rel_path in ('image.png', 'fonts/font.woff'):
+                    self.assertEqual(
+                        Path(destination_path, rel_path).stat().st_ino, Path(dir_path, rel_path).stat().st_ino
+                    )
+                self.assert_file_content(destination_path / 'README.txt', 'a_dir')
+
+                # Hooks may modify the files: Only copy-on-write links are allowed
+                Path(repo_path, 'hooks').mkdir()
+                Path(repo_path, 'hooks', 'post_gen_project.py').write_text('# Do nothing')
+                with AssertLogs(self, loggers=('manageprojects',)) as logs:
+                    _, destination_path, _ = execute_cookiecutter(
+                        template=str(repo_path),
+                        output_dir=main_temp_path / 'with_hooks',
+                        no_input=True,
+                        link_mode=LINK_MODE_HARDLINK,
+                    )
+                logs.assert_in('Use only copy-on-write links', "created via reflink: {'copy': 2}")
+                image_path = destination_path / 'image.png'
+                self.assertNotEqual(image_path.stat().st_ino, Path(dir_path, 'image.png').stat().st_ino)
@@ -0,0 +1,105 @@
+import os
+from pathlib import Path
+from unittest import mock
+
+from cli_base.cli_tools.test_utils.logs import AssertLogs
+
+from manageprojects.tests.base import BaseTestCase
+from manageprojects.utilities.file_transaction import FileTransaction, recover_transaction
+from manageprojects.utilities.temp_path import TemporaryDirectory
+
+
+class FileTransactionTestCase(BaseTestCase):
+    def make_transaction(self, root_path: Path) -> FileTransaction:
+        Path(root_path, 'unchanged.txt').write_text('Unchanged')
+        script_path = Path(root_path, 'script.sh')
+        script_path.write_text('old')
+        script_path.chmod(0o755)
+        Path(root_path, 'link').symlink_to('unchanged.txt')
+
+        transaction = FileTransaction(root_path=root_path, transaction_path=root_path / '.transaction')
+        transaction.write_bytes('script.sh', b'new')
+        transaction.write_bytes('sub/dir/new.txt', b'New file')
+        transaction.symlink('link', 'sub/dir/new.txt')
+        self.assertEqual(len(transaction), 3)
+        return transaction
+
+    def assert_old_state(self, root_path: Path):
+        self.assert_file_content(root_path / 'script.sh', 'old')
+        self.assertFalse(Path(root_path, 'sub', 'dir', 'new.txt').exists())
+        self.assertEqual(os.readlink(root_path / 'link'), 'unchanged.txt')
+
+    def assert_new_state(self, root_path: Path):
+        self.assert_file_content(root_path / 'script.sh', 'new')
+        self.assertEqual(Path(root_path, 'script.sh').stat().st_mode & 0o777, 0o755)
+        self.assert_file_content(root_path / 'sub' / 'dir' / 'new.txt', 'New file')
+        self.assertEqual(os.readlink(root_path / 'link'), 'sub/dir/new.txt')
+        self.assert_file_content(root_path / 'unchanged.txt', 'Unchanged')
+        self.assertFalse(Path(root_path, '.transaction').exists())
+
+    def test_commit(self):
+        with TemporaryDirectory(prefix='test_file_transaction_') as temp_path:
+            transaction = self.make_transaction(temp_path)
+            self.assert_old_state(temp_path)  # Nothing written before the commit
+
+            with AssertLogs(self, loggers=('manageprojects',)) as logs:
+                transaction.commit()
+            logs.assert_in('Apply 3 files via')
+            self.assert_new_state(temp_path)
+            self.assertFalse(recover_transaction(root_path=temp_path, transaction_path=temp_path / '.transaction'))
+
+            # Discard staged files:
+            transaction.write_bytes('script.sh', b'discarded')
+            transaction.discard()
+            self.assert_new_state(temp_path)
+
+    def test_interrupted(self):
+        with TemporaryDirectory(prefix='test_file_transaction_') as temp_path:
+            transaction_path = temp_path / '.transaction'
+
+            # Killed while staging: Nothing was applied
+            self.make_transaction(temp_path)
+            with AssertLogs(self, loggers=('manageprojects',)) as logs:
+                self.assertTrue(recover_transaction(root_path=temp_path, transaction_path=transaction_path))
+            logs.assert_in('Remove unprepared transaction')
+            self.assert_old_state(temp_path)
+            self.assertFalse(transaction_path.exists())
+
+        # Killed after the first file is renamed into place:
+        for rollback in (False, True):
+            with self.subTest(rollback=rollback), TemporaryDirectory(prefix='test_file_transaction_') as temp_path:
+                transaction_path = temp_path / '.transaction'
+                transaction = self.make_transaction(temp_path)
+                transaction.prepare()
+                os.replace(transaction_path / 'staged' / '0', temp_path / 'script.sh')
+                self.assert_file_content(temp_path / 'script.sh', 'new')
+
+                with AssertLogs(self, loggers=('manageprojects',)) as logs:
+                    recover_transaction(root_path=temp_path, transaction_path=transaction_path, rollback=rollback)
+                if rollback:
+                    logs.assert_in('Rollback interrupted transaction')
+                    self.assert_old_state(temp_path)
+                    self.assertEqual(Path(temp_path, 'script.sh').stat().st_mode & 0o777, 0o755)
+                else:
+                    logs.assert_in('Resume interrupted transaction')
+                    self.assert_new_state(temp_path)
+                self.assertFalse(transaction_path.exists())
+
+    def test_backup_without_hardlinks(self):
+        with TemporaryDirectory(prefix='test_file_transaction_') as temp_path:
+            transaction = self.make_transaction(temp_path)
+            # e.g.: The file system doesn't support hardlinks -> The files are copied
+            with mock.patch.object(os, 'link', side_effect=OSError('Not supported')):
+                transaction.prepare()
+
+            backup_path = temp_path / '.transaction' / 'backup'
+            self.assert_file_content(backup_path / '0', 'old')
+            self.assertEqual(Path(backup_path, '0').stat().st_mode & 0o777, 0o755)
+            self.assertFalse(Path(backup_path, '0').samefile(temp_path / 'script.sh'))
+            self.assertEqual(os.readlink(backup_path / '2'), 'unchanged.txt')
+
+            os.replace(temp_path / '.transaction' / 'staged' / '0', temp_path / 'script.sh')
+            with AssertLogs(self, loggers=('manageprojects',)) as logs:
+                recover_transaction(root_path=temp_path, transaction_path=temp_path / '.transaction', rollback=True)
+            logs.assert_in('Rollback interrupted transaction')
+            self.assert_old_state(temp_path)
@@ -0,0 +1,98 @@
+import json
+import os
+from pathlib import Path
+from unittest import mock
+
+from cli_base.cli_tools.test_utils.git_utils import init_git
+from cli_base.cli_tools.test_utils.logs import AssertLogs
+
+from manageprojects.rendered_refs import write_rendered_tree, write_virtual_tree
+from manageprojects.tests.base import BaseTestCase
+from manageprojects.tree_diff import MODE_EXECUTABLE, make_tree_diff
+from manageprojects.utilities.temp_path import TemporaryDirectory
+from manageprojects.virtual_tree import VirtualTree, render_virtual_tree
+
+
+class VirtualTreeTestCase(BaseTestCase):
+    def test_virtual_tree(self):
+        with TemporaryDirectory(prefix='test_virtual_tree_') as main_temp_path:
+            rendered_path = main_temp_path / 'rendered'
+            Path(rendered_path, 'sub_dir').mkdir(parents=True)
+            Path(rendered_path, 'a_file.txt').write_text('Rev 1')
+            Path(rendered_path, 'sub_dir', 'b_file.txt').write_text('A bigger file')
+            script_path = Path(rendered_path, 'script.sh')
+            script_path.write_text('#!/bin/sh')
+            script_path.chmod(0o755)
+            os.symlink('a_file.txt', rendered_path / 'link.txt')
+
+            # Only 'a_file.txt' and 'link.txt' fit into memory:
+            spill_path = main_temp_path / 'spill'
+            tree = VirtualTree.from_path(rendered_path, spill_path=spill_path, max_memory=6)
+            self.assertEqual(sorted(tree), ['a_file.txt', 'link.txt', 'script.sh', 'sub_dir/b_file.txt'])
+            self.assertEqual(tree.memory_size, len('Rev 1') + len('a_file.txt'))
+            self.assertEqual(tree.spilled_count, 2)
+            self.assertIsNone(tree['a_file.txt'].path)
+            self.assertEqual(tree['sub_dir/b_file.txt'].path, spill_path / 'sub_dir' / 'b_file.txt')
+            self.assertEqual(tree['script.sh'].mode, MODE_EXECUTABLE)
+            self.assertEqual(tree['link.txt'].content, b'a_file.txt')
+            self.assertEqual(tree['sub_dir/b_file.txt'].content, b'A bigger file')
+            self.assert_file_content(rendered_path / 'sub_dir' / 'b_file.txt', 'A bigger file')  # not moved
+
+            # Diff and hash the virtual tree:
+            self.assertIsNone(make_tree_diff(from_path=rendered_path, to_path=tree))
+            Path(rendered_path, 'a_file.txt').write_text('Rev 2')
+            patch = make_tree_diff(from_path=tree, to_path=rendered_path)
+            self.assertIn('-Rev 1\n\\ No newline at end of file\n+Rev 2', patch)
+
+            project_path = main_temp_path / 'project'
+            project_path.mkdir()
+            Path(project_path, 'a_file.txt').write_text('Project content')
+            git, project_rev = init_git(project_path)
+            with AssertLogs(self, loggers=('manageprojects',)) as logs:
+                tree_hash = write_virtual_tree(git=git, tree=tree)
+            logs.assert_in('Virtual tree with 4 files written as tree')
+
+            Path(rendered_path, 'a_file.txt').write_text('Rev 1')
+            self.assertEqual(tree_hash, write_rendered_tree(git=git, rendered_path=rendered_path))
+            self.assertEqual(git.status(verbose=False), [])
+
+            output_path = main_temp_path / 'output'
+            tree.write_to(output_path)
+            self.assertIsNone(make_tree_diff(from_path=rendered_path, to_path=output_path))
+
+    def test_render_virtual_tree(self):
+        with TemporaryDirectory(prefix='test_render_virtual_tree_') as main_temp_path:
+            repo_path = main_temp_path / 'template'
+            Path(repo_path, '{{cookiecutter.dir_name}}').mkdir(parents=True)
+            Path(repo_path, 'cookiecutter.json').write_text(json.dumps({'dir_name': 'a_dir', 'value': 'Foo'}))
+            Path(repo_path, '{{cookiecutter.dir_name}}', 'a_file.txt').write_text('Value: {{ cookiecutter.value }}')
+            init_git(repo_path)
+
+            Path(main_temp_path, 'cache').mkdir()
+            cache_env = {'XDG_CACHE_HOME': str(main_temp_path / 'cache')}
+            render_kwargs = dict(
+                template=str(repo_path), no_input=True, extra_context={'value': 'Bar'}, use_cache=True
+            )
+            with mock.patch.dict(os.environ, cache_env):
+                with AssertLogs(self, loggers=('manageprojects',)) as logs:
+                    context, tree, result_repo_path = render_virtual_tree(
+                        temp_path=main_temp_path / 'temp1', **render_kwargs
+                    )
+                logs.assert_in("Call 'cookiecutter'", 'in render cache')
+                self.assertEqual(context['cookiecutter']['value'], 'Bar')
+                self.assertEqual(result_repo_path, repo_path)
+                self.assertEqual(tree['a_file.txt'].content, b'Value: Bar')
+                self.assertFalse(Path(main_temp_path, 'temp1', 'render').exists())
+
+                # The second render is read from the cache:
+                execute_mock = mock.patch(
+                    'manageprojects.virtual_tree.execute_cookiecutter', side_effect=AssertionError('Not cached')
+                )
+                with AssertLogs(self, loggers=('manageprojects',)) as logs, execute_mock:
+                    context, tree, result_repo_path = render_virtual_tree(
+                        temp_path=main_temp_path / 'temp2', **render_kwargs
+                    )
+                logs.assert_in('Use cached render')
+                self.assertEqual(context['cookiecutter']['value'], 'Bar')
+                self.assertEqual(tree['a_file.txt'].content, b'Value: Bar')
+                self.assertFalse(Path(main_temp_path, 'temp2').exists())
@@ -0,0 +1,337 @@
+"""
+    Create a git compatible patch between two directory trees without calling git.
+"""
+
+from __future__ import annotations
+
+import base64
+import dataclasses
+import difflib
+import hashlib
+import logging
+import os
+import stat
+import zlib
+from collections.abc import Mapping
+from pathlib import Path
+
+
+logger = logging.getLogger(__name__)
+
+NULL_HASH = '0' * 40
+ABBREV_LENGTH = 7  # Same as git's default "core.abbrev"
+CONTEXT_LINES = 3  # Same as git's default "diff.context"
+BINARY_CHECK_SIZE = 8000  # Git checks the first 8000 bytes for NUL bytes to detect binary files
+BINARY_LINE_SIZE = 52  # Max. bytes per line in a "GIT binary patch"
+
+MODE_FILE = '100644'
+MODE_EXECUTABLE = '100755'
+MODE_SYMLINK = '120000'
+
+
+@dataclasses.dataclass
+class TreeFile:
+    """
+    A file in a directory tree, with lazy loaded content and git blob hash.
+    The content of a file in a virtual tree is set directly, see: manageprojects.virtual_tree
+    """
+
+    path: Path | None
+    mode: str
+    size: int
+
+    _content: bytes | None = dataclasses.field(default=None, repr=False)
+    _blob_hash: str | None = dataclasses.field(default=None, repr=False)
+
+    @property
+    def content(self) -> bytes:
+        if self._content is None:
+            assert self.path, 'A virtual file without content'
+            if self.mode == MODE_SYMLINK:
+                self._content = os.fsencode(os.readlink(self.path))
+            else:
+                self._content = self.path.read_bytes()
+        return self._content
+
+    @property
+    def blob_hash(self) -> str:
+        """
+        The same hash as "git hash-object" would create.
+        """
+        if self._blob_hash is None:
+            self._blob_hash = get_blob_hash(self.content)
+        return self._blob_hash
+
+    def is_binary(self) -> bool:
+        return b'\0' in self.content[:BINARY_CHECK_SIZE]
+
+
+def get_blob_hash(content: bytes) -> str:
+    header = f'blob {len(content)}\0'.encode('ASCII')
+    return hashlib.sha1(header + content).hexdigest()
+
+
+def get_git_mode(st_mode: int) -> str:
+    if stat.S_ISLNK(st_mode):
+        return MODE_SYMLINK
+    if st_mode & stat.S_IXUSR:
+        return MODE_EXECUTABLE
+    return MODE_FILE
+
+
+def scan_tree(root: Path) -> dict[str, TreeFile]:
+    """
+    Collect all files (and symlinks) in `root`, mapped by their relative posix path.
+    ".git" directories are ignored.
+    """
+    files = {}
+    for dir_path, dir_names, file_names in os.walk(root):
+        if '.git' in dir_names:
+            dir_names.remove('.git')
+
+        # Symlinks to directories are not followed by os.walk(), but git handles them as "files":
+        names = file_names + [name for name in dir_names if os.path.islink(os.path.join(dir_path, name))]
+        for name in names:
+            path = Path(dir_path, name)
+            st = path.lstat()
+            rel_path = path.relative_to(root).as_posix()
+            files[rel_path] = TreeFile(path=path, mode=get_git_mode(st.st_mode), size=st.st_size)
+    return files
+
+
+def is_unchanged(from_file: TreeFile, to_file: TreeFile) -> bool:
+    if from_file.mode != to_file.mode:
+        return False
+    if from_file.size != to_file.size:
+        # Short-cut: No need to read the file content
+        return False
+    return from_file.blob_hash == to_file.blob_hash
+
+
+def quote_path(path: str) -> str:
+    """
+    Quote file names like git's quote_c_style(), if needed.
+    Non-ASCII characters are left as they are (like git with "core.quotePath=false")
+    """
+    if not any(char in '"\\' or ord(char) < 0x20 or ord(char) == 0x7F for char in path):
+        return path
+
+    escapes = {
+        '"': '\\"',
+        '\\': '\\\\',
+        '\a': '\\a',
+        '\b': '\\b',
+        '\t': '\\t',
+        '\n': '\\n',
+        '\v': '\\v',
+        '\f': '\\f',
+        '\r': '\\r',
+    }
+    quoted = []
+    for char in path:
+        if char in escapes:
+            quoted.append(escapes[char])
+        elif ord(char) < 0x20 or ord(char) == 0x7F:
+            quoted.append(f'\\{ord(char):03o}')
+        else:
+            quoted.append(char)
+    return '"' + ''.join(quoted) + '"'
+
+
+def _prefixed(prefix: str, path: str) -> str:
+    return quote_path(f'{prefix}{path}')
+
+
+def _file_header_name(prefix: str, path: str) -> str:
+    name = _prefixed(prefix, path)
+    if ' ' in name:
+        # git adds a tab, so "git apply" can detect the end of the file name:
+        name += '\t'
+    return name
+
+
+def _abbrev(blob_hash: str) -> str:
+    return blob_hash[:ABBREV_LENGTH]
+
+
+def split_lines(content: str) -> list[str]:
+    """
+    Split like git: only at line feeds and keep the line endings.
+    (str.splitlines() would also split at e.g.: carriage returns, form feeds and unicode line separators)
+    """
+    parts = content.split('\n')
+    lines = [f'{part}\n' for part in parts[:-1]]
+    if parts[-1]:
+        lines.append(parts[-1])
+    return lines
+
+
+def decode_text(tree_file: TreeFile | None) -> str | None:
+    """
+    Returns the file content as text or None if it's a binary file.
+    """
+    if tree_file is None:
+        return ''
+    if tree_file.is_binary():
+        return None
+    try:
+        return tree_file.content.decode('UTF-8')
+    except UnicodeDecodeError:
+        return None
+
+
+def text_hunks(*, from_text: str, to_text: str, from_name: str, to_name: str) -> list[str]:
+    diff_lines = difflib.unified_diff(
+        split_lines(from_text),
+        split_lines(to_text),
+        fromfile=from_name,
+        tofile=to_name,
+        n=CONTEXT_LINES,
+    )
+    lines = []
+    for line in diff_lines:
+        if line.endswith('\n'):
+            lines.append(line)
+        else:
+            lines.append(f'{line}\n')
+            lines.append('\\ No newline at end of file\n')
+    return lines
+
+
+def encode_binary_hunk(content: bytes) -> list[str]:
+    """
+    Encode the content as "literal" hunk of a "GIT binary patch"
+    """
+    compressed = zlib.compress(content)
+    lines = [f'literal {len(content)}\n']
+    for pos in range(0, len(compressed), BINARY_LINE_SIZE):
+        chunk = compressed[pos:pos + BINARY_LINE_SIZE]
+        length = len(chunk)
+        length_char = chr(ord('A') + length - 1) if length <= 26 else chr(ord('a') + length - 27)
+        encoded = base64.b85encode(chunk, pad=True).decode('ASCII')
+        lines.append(f'{length_char}{encoded}\n')
+    lines.append('\n')
+    return lines
+
+
+def binary_hunks(*, from_content: bytes, to_content: bytes) -> list[str]:
+    return [
+        'GIT binary patch\n',
+        *encode_binary_hunk(to_content),  # forward hunk
+        *encode_binary_hunk(from_content),  # reverse hunk
+    ]
+
+
+def file_diff(
+    *,
+    from_path: str | None,
+    from_file: TreeFile | None,
+    to_path: str | None,
+    to_file: TreeFile | None,
+) -> str:
+    """
+    Create the git diff of one file. Both paths are given for a modification/rename.
+    """
+    a_path = from_path or to_path
+    b_path = to_path or from_path
+    assert a_path and b_path
+
+    lines = [f'diff --git {_prefixed("a/", a_path)} {_prefixed("b/", b_path)}\n']
+
+    from_hash = from_file.blob_hash if from_file else NULL_HASH
+    to_hash = to_file.blob_hash if to_file else NULL_HASH
+    index_mode = ''
+    if from_file is None:
+        assert to_file
+        lines.append(f'new file mode {to_file.mode}\n')
+    elif to_file is None:
+        lines.append(f'deleted file mode {from_file.mode}\n')
+    elif from_file.mode != to_file.mode:
+        lines.append(f'old mode {from_file.mode}\n')
+        lines.append(f'new mode {to_file.mode}\n')
+    else:
+        index_mode = f' {to_file.mode}'
+
+    if from_path and to_path and from_path != to_path:
+        # Only renames of unchanged files are detected:
+        lines.append('similarity index 100%\n')
+        lines.append(f'rename from {quote_path(from_path)}\n')
+        lines.append(f'rename to {quote_path(to_path)}\n')
+
+    if from_hash == to_hash:
+        # Pure rename and/or mode change
+        return ''.join(lines)
+
+    from_text = decode_text(from_file)
+    to_text = decode_text(to_file)
+    if from_text is None or to_text is None:
+        # "git apply" needs the full hashes for binary patches:
+        lines.append(f'index {from_hash}..{to_hash}{index_mode}\n')
+        lines += binary_hunks(
+            from_content=from_file.content if from_file else b'',
+            to_content=to_file.content if to_file else b'',
+        )
+        return ''.join(lines)
+
+    lines.append(f'index {_abbrev(from_hash)}..{_abbrev(to_hash)}{index_mode}\n')
+    lines += text_hunks(
+        from_text=from_text,
+        to_text=to_text,
+        from_name=_file_header_name('a/', a_path) if from_file else '/dev/null',
+        to_name=_file_header_name('b/', b_path) if to_file else '/dev/null',
+    )
+    return ''.join(lines)
+
+
+def make_tree_diff(from_path: Path | Mapping[str, TreeFile], to_path: Path | Mapping[str, TreeFile]) -> str | None:
+    """
+    Create a git compatible patch between from_path and to_path, without calling git.
+    Both can be a directory or a already scanned/virtual tree.
+    Identical files are skipped by comparing size and hash. Renames are detected, if the content is unchanged.
+    """
+    from_files = scan_tree(from_path) if isinstance(from_path, Path) else from_path
+    to_files = scan_tree(to_path) if isinstance(to_path, Path) else to_path
+    logger.info('Compare %i "from" files with %i "to" files', len(from_files), len(to_files))
+
+    removed = sorted(from_files.keys() - to_files.keys())
+    added = sorted(to_files.keys() - from_files.keys())
+
+    # Detect renames of unchanged files:
+    removed_by_hash: dict[str, list[str]] = {}
+    for path in removed:
+        removed_by_hash.setdefault(from_files[path].blob_hash, []).append(path)
+    renames = {}
+    for path in added:
+        if candidates := removed_by_hash.get(to_files[path].blob_hash):
+            renames[path] = candidates.pop(0)
+    renamed_sources = set(renames.values())
+
+    entries: list[tuple[str, str | None, str | None]] = []  # (sort key, from path, to path)
+    for path in sorted(from_files.keys() & to_files.keys()):
+        if is_unchanged(from_files[path], to_files[path]):
+            continue
+        entries.append((path, path, path))
+    for path in added:
+        entries.append((path, renames.get(path), path))
+    for path in removed:
+        if path not in renamed_sources:
+            entries.append((path, path, None))
+    entries.sort()
+
+    patch = []
+    for _, from_rel_path, to_rel_path in entries:
+        logger.info('diff: %r -> %r', from_rel_path, to_rel_path)
+        patch.append(
+            file_diff(
+                from_path=from_rel_path,
+                from_file=from_files[from_rel_path] if from_rel_path else None,
+                to_path=to_rel_path,
+                to_file=to_files[to_rel_path] if to_rel_path else None,
+            )
+        )
+
+    if not patch:
+        logger.warning('No diff between %i "from" and %i "to" files !', len(from_files), len(to_files))
+        return None
+
+    return ''.join(patch)
@@ -0,0 +1,242 @@
+"""
+    Plan a update without changing the project: Which files will be added, removed or modified,
+    how many lines are changed and which patches will not apply cleanly.
+
+    The plan uses the same render and diff as the update itself (see: manageprojects.patching),
+    the patch is only written into a temporary directory and checked via "git apply --check".
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import json
+import logging
+import subprocess
+import time
+from pathlib import Path
+from typing import Optional
+
+from cli_base.cli_tools.git import Git
+from rich import print  # noqa
+from rich.table import Table
+
+from manageprojects.constants import DEFAULT_DIFF_ENGINE
+from manageprojects.patching import generate_template_patch
+from manageprojects.utilities.temp_path import TemporaryDirectory
+
+
+logger = logging.getLogger(__name__)
+
+FILE_ADDED = 'added'
+FILE_REMOVED = 'removed'
+FILE_MODIFIED = 'modified'
+
+
+@dataclasses.dataclass
+class FilePlan:
+    path: str  # Relative to the git root of the project
+    status: str  # One of FILE_ADDED, FILE_REMOVED, FILE_MODIFIED
+    added_lines: int
+    removed_lines: int
+    binary: bool
+    conflict: bool  # The patch of this file will not apply cleanly
+
+
+@dataclasses.dataclass
+class UpdatePlan:
+    project_path: Path
+    from_rev: str
+    to_rev: str
+    files: list[FilePlan] = dataclasses.field(default_factory=list)
+    render_duration: float = 0  # Render the template versions and create the patch in seconds
+    check_duration: float = 0  # Check the patch against the project in seconds
+
+    def get_report(self) -> dict:
+        status_counts = {status: 0 for status in (FILE_ADDED, FILE_REMOVED, FILE_MODIFIED)}
+        for file_plan in self.files:
+            status_counts[file_plan.status] += 1
+        return dict(
+            project_path=str(self.project_path),
+            from_rev=self.from_rev,
+            to_rev=self.to_rev,
+            files=len(self.files),
+            **status_counts,
+            binary=sum(file_plan.binary for file_plan in self.files),
+            added_lines=sum(file_plan.added_lines for file_plan in self.files),
+            removed_lines=sum(file_plan.removed_lines for file_plan in self.files),
+            conflicts=sorted(file_plan.path for file_plan in self.files if file_plan.conflict),
+            render_duration=round(self.render_duration, 4),
+            check_duration=round(self.check_duration, 4),
+            file_plans=[dataclasses.asdict(file_plan) for file_plan in self.files],
+        )
+
+    def write_json(self, file_path: Path) -> None:
+        logger.info('Write update plan to %s', file_path)
+        file_path.write_text(json.dumps(self.get_report(), indent=2), encoding='UTF-8')
+
+    def print_report(self) -> None:
+        report = self.get_report()
+
+        table = Table(title=f'Update plan from rev. {self.from_rev} to rev. {self.to_rev}')
+        table.add_column('File')
+        table.add_column('Status')
+        table.add_column('+', justify='right')
+        table.add_column('-', justify='right')
+        table.add_column('Conflict')
+        for file_plan in self.files:
+            if file_plan.binary:
+                added_lines = removed_lines = 'bin'
+            else:
+                added_lines, removed_lines = str(file_plan.added_lines), str(file_plan.removed_lines)
+            table.add_row(
+                file_plan.path, file_plan.status, added_lines, removed_lines, 'yes' if file_plan.conflict else ''
+            )
+        print(table)
+
+        print(
+            f'{report["files"]} files: {report["added"]} added, {report["removed"]} removed,'
+            f' {report["modified"]} modified ({report["binary"]} binary),'
+            f' +{report["added_lines"]} -{report["removed_lines"]} lines,'
+            f' {len(report["conflicts"])} conflicts.'
+            f' Render: {report["render_duration"]:.2f}s, check: {report["check_duration"]:.2f}s'
+        )
+
+
+def get_patch_file_status(patch: str) -> list[str]:
+    """
+    Returns the status of every file in the order of the git patch.
+
+    >>> get_patch_file_status('diff --git a/a b/a\\nnew file mode 100644\\ndiff --git a/b b/b\\nindex 1..2 100644')
+    ['added', 'modified']
+    """
+    status = []
+    for line in patch.splitlines():
+        if line.startswith('diff --git '):
+            status.append(FILE_MODIFIED)
+        elif line.startswith('new file mode '):
+            status[-1] = FILE_ADDED
+        elif line.startswith('deleted file mode '):
+            status[-1] = FILE_REMOVED
+    return status
+
+
+def get_patch_numstat(*, git: Git, patch_file_path: Path) -> list[tuple[str, Optional[int], Optional[int]]]:
+    """
+    Returns (path, added lines, removed lines) of every file in the order of the git patch.
+    The line numbers are None for binary files.
+    """
+    output: str = git.git_verbose_check_output('apply', '--numstat', '-z', str(patch_file_path), verbose=False)
+    numstat: list[tuple[str, Optional[int], Optional[int]]] = []
+    for entry in filter(None, output.split('\0')):
+        added, removed, path = entry.split('\t', 2)
+        if added == '-':
+            numstat.append((path, None, None))
+        else:
+            numstat.append((path, int(added), int(removed)))
+    return numstat
+
+
+def check_patch(*, git: Git, patch_file_path: Path) -> set[str]:
+    """
+    Returns the paths of all files, that the patch will not apply cleanly to.
+    Use the same options as the update itself, but nothing is written.
+    """
+    process = subprocess.run(
+        [
+            git.git_bin,
+            'apply',
+            '--check',
+            '--verbose',
+            '--ignore-whitespace',
+            '-C1',
+            '--recount',
+            str(patch_file_path),
+        ],
+        cwd=git.cwd,
+        env=git.env,
+        capture_output=True,
+        text=True,
+    )
+    conflicts = set()
+    current_path = None
+    for line in process.stderr.splitlines():
+        if line.startswith('Checking patch ') and line.endswith('...'):
+            current_path = line.removeprefix('Checking patch ').removesuffix('...')
+            current_path = current_path.rpartition(' => ')[2]  # Renamed file: "old => new"
+        elif line.startswith('error: ') and current_path:
+            conflicts.add(current_path)
+    logger.info('git apply --check: %i files will not apply cleanly', len(conflicts))
+    return conflicts
+
+
+def plan_update(
+    *,
+    git: Git,
+    project_path: Path,
+    template: str,  # CookieCutter Template path or GitHub url
+    from_rev: str,
+    replay_context: dict,
+    directory: Optional[str] = None,  # Directory name of the CookieCutter Template
+    password: Optional[str] = None,
+    config_file: Optional[Path] = None,  # Optional path to 'cookiecutter_config.yaml'
+    cleanup: bool = True,  # Remove temp files if not exceptions happens
+    no_input: bool = False,  # Prompt the user at command line for manual configuration?
+    diff_engine: str = DEFAULT_DIFF_ENGINE,  # How to create the patch, see: constants.DIFF_ENGINES
+    use_cache: bool = True,  # Reuse cached renders, see: manageprojects.render_cache
+    repo_path: Optional[Path] = None,  # Use this template checkout instead of checkout the template again
+    incremental: bool = False,  # Render only the changed template files, see: manageprojects.incremental_render
+) -> Optional[UpdatePlan]:
+    """
+    Create the update patch like a update and check it against the project.
+    Returns None, if there is nothing to update.
+    """
+    with TemporaryDirectory(prefix=f'manageprojects_plan_{project_path.name}_', cleanup=cleanup) as temp_path:
+        start_time = time.monotonic()
+        result = generate_template_patch(
+            project_path=project_path,
+            template=template,
+            directory=directory,
+            from_rev=from_rev,
+            replay_context=replay_context,
+            password=password,
+            config_file=config_file,
+            cleanup=cleanup,
+            no_input=no_input,
+            diff_engine=diff_engine,
+            use_cache=use_cache,
+            repo_path=repo_path,
+            incremental=incremental,
+            patch_file_path=temp_path / 'update.patch',
+            store=False,  # The plan must not change the project repository
+        )
+        render_duration = time.monotonic() - start_time
+        if not result:
+            return None
+
+        start_time = time.monotonic()
+        patch = result.patch_file_path.read_text()
+        file_status = get_patch_file_status(patch)
+        numstat = get_patch_numstat(git=git, patch_file_path=result.patch_file_path)
+        assert len(file_status) == len(numstat), f'{len(file_status)} != {len(numstat)}'
+        conflicts = check_patch(git=git, patch_file_path=result.patch_file_path)
+        check_duration = time.monotonic() - start_time
+
+    files = [
+        FilePlan(
+            path=path,
+            status=status,
+            added_lines=added_lines or 0,
+            removed_lines=removed_lines or 0,
+            binary=added_lines is None,
+            conflict=path in conflicts,
+        )
+        for status, (path, added_lines, removed_lines) in zip(file_status, numstat)
+    ]
+    return UpdatePlan(
+        project_path=project_path,
+        from_rev=from_rev,
+        to_rev=result.to_rev,
+        files=files,
+        render_duration=render_duration,
+        check_duration=check_duration,
+    )
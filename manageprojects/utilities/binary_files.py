@@ -0,0 +1,69 @@
+import logging
+import re
+import subprocess
+from pathlib import Path
+
+from cli_base.cli_tools.git import Git
+
+from manageprojects.constants import BINARY_SNIFF_SIZE
+
+
+logger = logging.getLogger(__name__)
+
+
+# File signatures of common binary files in project trees, that may not contain a NUL byte in the header:
+BINARY_MAGIC_NUMBERS = (
+    b'\x89PNG\r\n\x1a\n',
+    b'\xff\xd8\xff',  # JPEG
+    b'GIF87a',
+    b'GIF89a',
+    b'%PDF-',
+    b'PK\x03\x04',  # zip, wheel, jar, docx etc.
+    b'\x1f\x8b',  # gzip
+    b'\xfd7zXZ\x00',  # xz
+    b'7z\xbc\xaf\x27\x1c',
+    b'\x7fELF',
+    b'wOFF',  # woff font
+    b'wOF2',  # woff2 font
+    b'SQLite format 3\x00',
+)
+
+# Signatures with a plain ASCII prefix, that a text file may start with, too: Match the complete signature
+BINARY_SIGNATURES_RE = re.compile(
+    rb'RIFF.{4}(?:WAVE|WEBP|AVI )'  # wav, webp, avi
+    rb'|BZh[1-9](?:1AY&SY|\x17rE8P\x90)',  # bzip2: Block size, then the block or end of stream magic
+    re.DOTALL,
+)
+
+
+def is_binary_content(header: bytes) -> bool:
+    """
+    Detect binary content by the first bytes of a file, like git: NUL bytes or a known file signature.
+    """
+    return b'\x00' in header or header.startswith(BINARY_MAGIC_NUMBERS) or bool(BINARY_SIGNATURES_RE.match(header))
+
+
+def is_binary_file(file_path: Path) -> bool:
+    with file_path.open('rb') as f:
+        header = f.read(BINARY_SNIFF_SIZE)
+    return is_binary_content(header)
+
+
+def get_git_binary_paths(*, git: Git, file_paths: list[Path]) -> set[Path]:
+    """
+    Returns all files that are marked as binary via .gitattributes, e.g.: "*.png binary" or "*.dat -text"
+    """
+    if not file_paths:
+        return set()
+    stdin = '\0'.join(str(file_path.relative_to(git.cwd)) for file_path in file_paths)
+    output = subprocess.check_output(
+        [git.git_bin, 'check-attr', '-z', '--stdin', 'text'], input=stdin, cwd=git.cwd, env=git.env, text=True
+    )
+    values = output.split('\0')
+    binary_paths = set()
+    # The output is: <path> NUL <attribute> NUL <info> NUL
+    for file_name, info in zip(values[0::3], values[2::3]):
+        if info == 'unset':
+            binary_paths.add(git.cwd / file_name)
+    logger.info('%i files are marked as binary via .gitattributes', len(binary_paths))
+    return binary_paths
@@ -11,10 +11,11 @@ class GenerateFilesWrapper:
     Capture the effective Cookiecutter Template Context
     """
 
-    def __init__(self):
+    def __init__(self, generate_files_func=generate_files):
+        self.generate_files_func = generate_files_func
         self.context = None
 
     def __call__(self, **kwargs):
         logger.debug('GenerateFilesWrapper called with: %s', kwargs)
         self.context = kwargs['context']
-        return generate_files(**kwargs)
+        return self.generate_files_func(**kwargs)
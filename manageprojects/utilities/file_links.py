@@ -0,0 +1,133 @@
+"""
+    Create files (e.g.: "_copy_without_render" paths, images, fonts, cached renders) with the cheapest
+    available primitive of the file system, used by all file and tree copies in manageprojects.
+
+    "reflink": Clone the file via the FICLONE ioctl. The data blocks are shared copy-on-write,
+    so both files can be modified independently. Only supported by some file systems (e.g.: btrfs, XFS).
+
+    "hardlink": Try a reflink first, then a hardlink. Both paths are the same inode, so the
+    destination must never be modified. Only for read-only scratch trees!
+
+    Every mode falls back to a copy in the kernel via os.copy_file_range() and then to shutil.copyfile(),
+    that uses sendfile() on Linux. Use "./dev-cli.py benchmark-file-links" to compare them.
+"""
+
+from __future__ import annotations
+
+import collections
+import logging
+import os
+import shutil
+from pathlib import Path
+
+from manageprojects.constants import LINK_MODE_COPY, LINK_MODE_HARDLINK, LINK_MODE_REFLINK, LINK_MODES
+
+
+logger = logging.getLogger(__name__)
+
+FICLONE = 0x40049409  # from linux/fs.h
+
+
+def reflink_file(src_path, dst_path) -> bool:
+    """
+    Clone the file content copy-on-write. Returns False if the file system doesn't support it.
+    """
+    try:
+        import fcntl
+    except ImportError:  # e.g.: Windows
+        return False
+
+    with open(src_path, 'rb') as src, open(dst_path, 'wb') as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        except OSError as err:
+            logger.debug('Reflink %s failed: %s', src_path, err)
+            return False
+    return True
+
+
+def copy_file_range_file(src_path, dst_path) -> bool:
+    """
+    Copy the file content in the kernel, without copying the data into user space.
+    Returns False if copy_file_range() is not available or not supported by the file system.
+    """
+    if not hasattr(os, 'copy_file_range'):
+        return False
+
+    with open(src_path, 'rb') as src, open(dst_path, 'wb') as dst:
+        try:
+            while os.copy_file_range(src.fileno(), dst.fileno(), 2**30):
+                pass
+        except OSError as err:
+            # e.g.: Across file systems with old kernels
+            logger.debug('copy_file_range() %s failed: %s', src_path, err)
+            return False
+    return True
+
+
+def link_file(src_path, dst_path, *, link_mode: str) -> str:
+    """
+    Create `dst_path` with the content of `src_path`, like shutil.copyfile().
+    Returns the used method: "reflink", "hardlink", "copy_file_range" or "copy"
+    """
+    assert link_mode in LINK_MODES, f'Unknown link mode: {link_mode!r}'
+    if link_mode != LINK_MODE_COPY:
+        if reflink_file(src_path, dst_path):
+            return 'reflink'
+        if link_mode == LINK_MODE_HARDLINK:
+            Path(dst_path).unlink(missing_ok=True)
+            try:
+                os.link(src_path, dst_path)
+            except OSError as err:
+                # e.g.: Across file systems
+                logger.debug('Hardlink %s failed: %s', src_path, err)
+            else:
+                return 'hardlink'
+    if copy_file_range_file(src_path, dst_path):
+        return 'copy_file_range'
+    shutil.copyfile(src_path, dst_path)
+    return 'copy'
+
+
+def copy_file(src_path: Path, dst_path: Path, *, link_mode: str = LINK_MODE_REFLINK) -> str:
+    """
+    Like shutil.copy2(): Create `dst_path` with the content and the metadata of `src_path`.
+    """
+    method = link_file(src_path, dst_path, link_mode=link_mode)
+    if method != 'hardlink':
+        shutil.copystat(src_path, dst_path)
+    return method
+
+
+class LinkingShutil:
+    """
+    Replacement of the "shutil" module in cookiecutter.generate, that links the unrendered files.
+    With LINK_MODE_HARDLINK the created tree is read-only: A write into a hardlinked file would
+    change the template checkout or the render cache, too. Templates with hooks get only reflinks,
+    see: manageprojects.cookiecutter_api.execute_cookiecutter()
+    """
+
+    def __init__(self, link_mode: str):
+        self.link_mode = link_mode
+        self.counts: collections.Counter[str] = collections.Counter()  # Created files by method
+
+    def __getattr__(self, name):
+        return getattr(shutil, name)
+
+    def copyfile(self, src, dst, *, follow_symlinks=True):
+        self.counts[link_file(src, dst, link_mode=self.link_mode)] += 1
+        return dst
+
+    def copymode(self, src, dst, *, follow_symlinks=True):
+        if not os.path.samefile(src, dst):  # Don't change the mode of the hardlinked source
+            shutil.copymode(src, dst, follow_symlinks=follow_symlinks)
+
+    def copy2(self, src, dst, *, follow_symlinks=True):
+        self.copyfile(src, dst)
+        if not os.path.samefile(src, dst):
+            shutil.copystat(src, dst, follow_symlinks=follow_symlinks)
+        return dst
+
+    def copytree(self, src, dst, **kwargs):
+        kwargs.setdefault('copy_function', self.copy2)
+        return shutil.copytree(src, dst, **kwargs)
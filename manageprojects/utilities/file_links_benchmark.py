@@ -0,0 +1,113 @@
+"""
+    Compare the file copy primitives of manageprojects.utilities.file_links on one file system,
+    e.g.: ext4, btrfs, XFS or tmpfs support different primitives.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import logging
+import os
+import shutil
+import time
+from pathlib import Path
+
+from rich import print  # noqa
+from rich.table import Table
+
+from manageprojects.constants import FILE_LINKS_BENCHMARK_FILES, FILE_LINKS_BENCHMARK_SIZE
+from manageprojects.utilities.file_links import copy_file_range_file, reflink_file
+from manageprojects.utilities.temp_path import TemporaryDirectory
+
+
+logger = logging.getLogger(__name__)
+
+
+def read_write_file(src_path, dst_path) -> bool:
+    """
+    The baseline: Copy the data through user space.
+    """
+    with open(src_path, 'rb') as src, open(dst_path, 'wb') as dst:
+        shutil.copyfileobj(src, dst)
+    return True
+
+
+def copyfile_file(src_path, dst_path) -> bool:
+    """
+    The "copy" fallback of file_links.link_file(): shutil.copyfile() uses sendfile() on Linux.
+    """
+    shutil.copyfile(src_path, dst_path)
+    return True
+
+
+def hardlink_file(src_path, dst_path) -> bool:
+    try:
+        os.link(src_path, dst_path)
+    except OSError as err:
+        logger.debug('Hardlink %s failed: %s', src_path, err)
+        return False
+    return True
+
+
+BENCHMARK_METHODS = {
+    'read/write': read_write_file,
+    'copy': copyfile_file,
+    'copy_file_range': copy_file_range_file,
+    'reflink': reflink_file,
+    'hardlink': hardlink_file,
+}
+
+
+@dataclasses.dataclass
+class BenchmarkResult:
+    method: str  # Key of BENCHMARK_METHODS
+    duration: float | None  # Time to create all files in seconds, None if not supported
+    speedup: float | None = None  # Compared to "read/write"
+
+
+def benchmark_file_links(
+    path: Path | None = None,  # Directory on the file system to benchmark, default: the temp directory
+    *,
+    file_count: int = FILE_LINKS_BENCHMARK_FILES,
+    file_size: int = FILE_LINKS_BENCHMARK_SIZE,
+) -> list[BenchmarkResult]:
+    results = []
+    with TemporaryDirectory(prefix='manageprojects_benchmark_', dir=path) as temp_path:
+        src_paths = []
+        for number in range(file_count):
+            src_path = temp_path / f'{number}.bin'
+            src_path.write_bytes(os.urandom(file_size))
+            src_paths.append(src_path)
+
+        for method, func in BENCHMARK_METHODS.items():
+            dst_path = temp_path / method.replace('/', '_')
+            dst_path.mkdir()
+            start_time = time.perf_counter()
+            for src_path in src_paths:
+                if not func(src_path, dst_path / src_path.name):
+                    logger.info('%s is not supported in %s', method, temp_path)
+                    duration = None
+                    break
+            else:
+                duration = time.perf_counter() - start_time
+            results.append(BenchmarkResult(method=method, duration=duration))
+            shutil.rmtree(dst_path)
+
+    baseline = results[0].duration
+    for result in results:
+        if baseline and result.duration:
+            result.speedup = baseline / result.duration
+    return results
+
+
+def print_benchmark_results(results: list[BenchmarkResult], *, file_count: int, file_size: int) -> None:
+    table = Table(title=f'Create {file_count} files with {file_size} Bytes')
+    table.add_column('Method')
+    table.add_column('Seconds', justify='right')
+    table.add_column('Speedup', justify='right')
+    for result in results:
+        if result.duration is None:
+            table.add_row(result.method, 'not supported', '')
+        else:
+            table.add_row(result.method, f'{result.duration:.4f}', f'{result.speedup:.1f}x')
+    print(table)
@@ -0,0 +1,193 @@
+"""
+    Apply many file changes to a directory as one transaction.
+
+    1. All new file contents are written into a staging directory on the same file system
+       and the existing files are hardlinked as backup.
+    2. All staged files are fsynced at once and a journal with all files is written.
+    3. All staged files are renamed into place in one pass.
+
+    If the process is killed while renaming, the journal allows to resume or to rollback
+    the transaction, see: recover_transaction()
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+from pathlib import Path
+
+from manageprojects.utilities.file_links import copy_file
+
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_NAME = 'journal.json'
+
+
+def fsync_path(path: Path) -> None:
+    """
+    Flush a file or a directory (e.g.: after renames) to disk.
+    """
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError as err:
+        # e.g.: Directories can't be opened on Windows
+        logger.debug('Fsync %s failed: %s', path, err)
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class FileTransaction:
+    """
+    Collect file writes and apply them via commit(), e.g.:
+
+        transaction = FileTransaction(root_path=project_path, transaction_path=project_path / '.transaction')
+        transaction.write_bytes('foo/bar.txt', b'content')
+        transaction.commit()
+
+    The file mode of existing files is not changed, like shutil.copyfile() does.
+    """
+
+    def __init__(self, *, root_path: Path, transaction_path: Path):
+        self.root_path = root_path
+        self.transaction_path = transaction_path
+        self.staged_path = transaction_path / 'staged'
+        self.backup_path = transaction_path / 'backup'
+        self.journal_path = transaction_path / JOURNAL_NAME
+        self.files: list[str] = []  # Relative paths, the index is the name of the staged file
+
+    def __len__(self):
+        return len(self.files)
+
+    def _stage_path(self, rel_path: str) -> Path:
+        assert rel_path not in self.files, f'{rel_path} was already written'
+        assert not Path(rel_path).is_absolute(), f'{rel_path} is not relative'
+        if not self.files:
+            if self.transaction_path.exists():
+                raise FileExistsError(f'Unfinished transaction found: {self.transaction_path}')
+            self.staged_path.mkdir(parents=True)
+        staged_file_path = self.staged_path / str(len(self.files))
+        self.files.append(rel_path)
+        return staged_file_path
+
+    def write_bytes(self, rel_path: str, content: bytes) -> None:
+        self._stage_path(rel_path).write_bytes(content)
+
+    def symlink(self, rel_path: str, target: str) -> None:
+        os.symlink(target, self._stage_path(rel_path))
+
+    def discard(self) -> None:
+        """
+        Remove all staged files. The directory is not touched.
+        """
+        if self.files:
+            shutil.rmtree(self.transaction_path)
+            self.files = []
+
+    def prepare(self) -> None:
+        """
+        Backup the existing files, sync all staged files and write the journal.
+        """
+        journal_files = []
+        for index, rel_path in enumerate(self.files):
+            file_path = self.root_path / rel_path
+            staged_file_path = self.staged_path / str(index)
+            exists = file_path.exists() or file_path.is_symlink()
+            if exists:
+                if not self.backup_path.exists():
+                    self.backup_path.mkdir()
+                backup_file_path = self.backup_path / str(index)
+                try:
+                    os.link(file_path, backup_file_path, follow_symlinks=False)
+                except OSError as err:
+                    logger.debug('Hardlink %s failed: %s', file_path, err)
+                    if file_path.is_symlink():
+                        os.symlink(os.readlink(file_path), backup_file_path)
+                    else:
+                        copy_file(file_path, backup_file_path)
+                if not file_path.is_symlink() and not staged_file_path.is_symlink():
+                    shutil.copymode(file_path, staged_file_path)
+            if not staged_file_path.is_symlink():
+                fsync_path(staged_file_path)
+            journal_files.append(dict(path=rel_path, exists=exists))
+
+        for path in (self.staged_path, self.backup_path):
+            if path.exists():
+                fsync_path(path)
+
+        self.journal_path.write_text(json.dumps(dict(files=journal_files), indent=1), encoding='UTF-8')
+        fsync_path(self.journal_path)
+        fsync_path(self.transaction_path)
+
+    def commit(self) -> None:
+        if not self.files:
+            return
+        logger.info('Apply %i files via %s', len(self.files), self.transaction_path)
+        self.prepare()
+        apply_journal(self.transaction_path, root_path=self.root_path)
+        self.files = []
+
+
+def read_journal(transaction_path: Path) -> list[dict]:
+    journal = json.loads(Path(transaction_path, JOURNAL_NAME).read_text(encoding='UTF-8'))
+    return journal['files']
+
+
+def apply_journal(transaction_path: Path, *, root_path: Path) -> None:
+    """
+    Rename all staged files into place. Files that are already renamed are skipped, so it can be resumed.
+    """
+    parent_paths = set()
+    for index, entry in enumerate(read_journal(transaction_path)):
+        staged_file_path = Path(transaction_path, 'staged', str(index))
+        if not staged_file_path.exists() and not staged_file_path.is_symlink():
+            continue  # Already applied
+        file_path = root_path / entry['path']
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(staged_file_path, file_path)
+        parent_paths.add(file_path.parent)
+
+    for parent_path in parent_paths:
+        fsync_path(parent_path)
+    shutil.rmtree(transaction_path)
+
+
+def rollback_journal(transaction_path: Path, *, root_path: Path) -> None:
+    """
+    Restore all files that are already renamed into place.
+    """
+    for index, entry in enumerate(read_journal(transaction_path)):
+        staged_file_path = Path(transaction_path, 'staged', str(index))
+        if staged_file_path.exists() or staged_file_path.is_symlink():
+            continue  # Not applied
+        file_path = root_path / entry['path']
+        if entry['exists']:
+            os.replace(Path(transaction_path, 'backup', str(index)), file_path)
+        else:
+            file_path.unlink(missing_ok=True)
+    shutil.rmtree(transaction_path)
+
+
+def recover_transaction(*, root_path: Path, transaction_path: Path, rollback: bool = False) -> bool:
+    """
+    Finish a interrupted transaction. Returns False if there is no transaction.
+    A transaction without journal was not prepared: Nothing was applied and the staged files are removed.
+    Otherwise the transaction is completed or, with `rollback`, all applied files are restored.
+    """
+    if not transaction_path.exists():
+        return False
+    if not Path(transaction_path, JOURNAL_NAME).exists():
+        logger.warning('Remove unprepared transaction %s', transaction_path)
+        shutil.rmtree(transaction_path)
+    elif rollback:
+        logger.warning('Rollback interrupted transaction %s', transaction_path)
+        rollback_journal(transaction_path, root_path=root_path)
+    else:
+        logger.warning('Resume interrupted transaction %s', transaction_path)
+        apply_journal(transaction_path, root_path=root_path)
+    return True
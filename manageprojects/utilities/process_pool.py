@@ -0,0 +1,58 @@
+import logging
+import logging.handlers
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+
+logger = logging.getLogger(__name__)
+
+
+def _init_worker_logging(log_queue, levels: dict) -> None:
+    """
+    Send the log records of the worker process to the main process.
+    """
+    # Remove inherited handlers (e.g.: after fork), the main process will handle the records:
+    for existing_logger in [logging.root, *logging.root.manager.loggerDict.values()]:
+        if isinstance(existing_logger, logging.Logger):
+            existing_logger.handlers.clear()
+
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    for logger_name, level in levels.items():
+        worker_logger = logging.getLogger(logger_name)
+        worker_logger.setLevel(level)
+        worker_logger.addHandler(queue_handler)
+        worker_logger.propagate = False  # Don't forward the same record twice
+
+
+class _ForwardHandler(logging.Handler):
+    """
+    Handle log records from worker processes, like they are created in the main process.
+    """
+
+    def handle(self, record):
+        record_logger = logging.getLogger(record.name)
+        if record_logger.isEnabledFor(record.levelno):
+            record_logger.handle(record)
+
+
+class LoggingProcessPoolExecutor(ProcessPoolExecutor):
+    """
+    ProcessPoolExecutor that forwards the log output of the worker processes into the main process.
+    So the log file and captured test logs contain the worker logs, too.
+    """
+
+    def __init__(self, max_workers=None, forward_loggers=('manageprojects', 'cookiecutter')):
+        self._log_queue = multiprocessing.Queue()
+        self._log_listener = logging.handlers.QueueListener(self._log_queue, _ForwardHandler())
+        self._log_listener.start()
+
+        levels = {name: logging.getLogger(name).getEffectiveLevel() for name in forward_loggers}
+        super().__init__(
+            max_workers=max_workers,
+            initializer=_init_worker_logging,
+            initargs=(self._log_queue, levels),
+        )
+
+    def shutdown(self, wait=True, **kwargs):
+        super().shutdown(wait=wait, **kwargs)
+        self._log_listener.stop()
@@ -30,3 +30,29 @@ def get_mp_config_path() -> Path:
     mp_config_path = user_config_path / 'manageprojects'
     mp_config_path.mkdir(exist_ok=True)
     return mp_config_path
+
+
+def get_user_cache_path() -> Path:
+    if cache_dir := os.environ.get('XDG_CACHE_HOME'):
+        cache_path = Path(cache_dir)
+        if cache_path.is_dir():
+            return cache_path
+
+    cache_path = Path.home() / '.cache'
+    if cache_path.is_dir():
+        return cache_path
+
+    cache_path = Path.home() / 'Library' / 'Caches'
+    if cache_path.is_dir():
+        return cache_path
+
+    cache_path = get_mp_config_path() / 'cache'
+    logger.warning('Fallback user cache path to: %s', cache_path)
+    return cache_path
+
+
+def get_mp_cache_path() -> Path:
+    user_cache_path = get_user_cache_path()
+    mp_cache_path = user_cache_path / 'manageprojects'
+    mp_cache_path.mkdir(parents=True, exist_ok=True)
+    return mp_cache_path
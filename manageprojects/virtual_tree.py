@@ -0,0 +1,125 @@
+"""
+    Rendered Cookiecutter templates as virtual file tree: relative path -> file mode and content.
+
+    The file contents are held in memory, until the memory limit is reached. The content of all
+    further files is spilled into a directory and read lazily. Diffing, hashing and overwriting
+    can work on the virtual tree, without a temporary copy of the rendered files.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import shutil
+from pathlib import Path
+
+from manageprojects.constants import LINK_MODE_HARDLINK, VIRTUAL_TREE_MAX_MEMORY
+from manageprojects.cookiecutter_api import execute_cookiecutter, get_render_cache
+from manageprojects.tree_diff import MODE_EXECUTABLE, MODE_SYMLINK, TreeFile, scan_tree
+from manageprojects.utilities.file_links import link_file
+
+
+logger = logging.getLogger(__name__)
+
+
+class VirtualTree(dict):
+    """
+    Mapping of the relative posix path -> TreeFile
+    """
+
+    def __init__(self, *, spill_path: Path, max_memory: int = VIRTUAL_TREE_MAX_MEMORY):
+        super().__init__()
+        self.spill_path = spill_path
+        self.max_memory = max_memory
+        self.memory_size = 0
+        self.spilled_count = 0
+
+    def add_path(self, rel_path: str, tree_file: TreeFile, *, move: bool = False) -> None:
+        """
+        Add the file from disk: Read the content into memory or spill the file.
+        The source file may be moved into the spill directory, if `move` is True.
+        """
+        if tree_file.mode == MODE_SYMLINK or self.memory_size + tree_file.size <= self.max_memory:
+            content = tree_file.content
+            self.memory_size += len(content)
+            self[rel_path] = TreeFile(path=None, mode=tree_file.mode, size=tree_file.size, _content=content)
+            return
+
+        assert tree_file.path, f'No file of {rel_path} to spill'
+        spill_file_path = self.spill_path / rel_path
+        spill_file_path.parent.mkdir(parents=True, exist_ok=True)
+        if move:
+            os.replace(tree_file.path, spill_file_path)
+        else:
+            # The spilled files are only read:
+            link_file(tree_file.path, spill_file_path, link_mode=LINK_MODE_HARDLINK)
+        self.spilled_count += 1
+        self[rel_path] = TreeFile(path=spill_file_path, mode=tree_file.mode, size=tree_file.size)
+
+    def write_to(self, destination: Path) -> None:
+        """
+        Create all files of the virtual tree in `destination`.
+        """
+        for rel_path, tree_file in self.items():
+            file_path = destination / rel_path
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            if tree_file.mode == MODE_SYMLINK:
+                os.symlink(os.fsdecode(tree_file.content), file_path)
+                continue
+            file_path.write_bytes(tree_file.content)
+            if tree_file.mode == MODE_EXECUTABLE:
+                file_path.chmod(0o755)
+
+    @classmethod
+    def from_path(
+        cls, root: Path, *, spill_path: Path, max_memory: int = VIRTUAL_TREE_MAX_MEMORY, move: bool = False
+    ) -> VirtualTree:
+        tree = cls(spill_path=spill_path, max_memory=max_memory)
+        for rel_path, tree_file in sorted(scan_tree(root).items()):
+            tree.add_path(rel_path, tree_file, move=move)
+        logger.info(
+            'Virtual tree of %s: %i files, %i Bytes in memory, %i files spilled to %s',
+            root,
+            len(tree),
+            tree.memory_size,
+            tree.spilled_count,
+            spill_path,
+        )
+        return tree
+
+
+def render_virtual_tree(
+    *,
+    temp_path: Path,  # Used to render the template and to spill files, if the memory limit is exceeded
+    max_memory: int = VIRTUAL_TREE_MAX_MEMORY,
+    **kwargs,  # Arguments for execute_cookiecutter()
+) -> tuple[dict, VirtualTree, Path]:
+    """
+    Render the template and returns the Cookiecutter context, the rendered files and the template path.
+    A cached render is read directly from the render cache, without a copy.
+    """
+    spill_path = temp_path / 'spill'
+    render_cache, cache_key, repo_path = get_render_cache(**kwargs)
+    if render_cache and cache_key:
+        if cached_render := render_cache.get_tree(key=cache_key):
+            logger.info('Use cached render: %r', cached_render.destination_path)
+            try:
+                tree = VirtualTree.from_path(
+                    cached_render.destination_path, spill_path=spill_path, max_memory=max_memory
+                )
+            except OSError as err:
+                # e.g.: Removed by a other process in the meantime
+                logger.warning('Read cached render %s failed: %s', cached_render.destination_path, err)
+            else:
+                return cached_render.cookiecutter_context, tree, repo_path
+
+    # Cookiecutter and its hooks need a real directory:
+    output_dir = temp_path / 'render'
+    # The render is only read: Don't copy the unrendered files
+    kwargs.update(repo_path=repo_path, use_cache=False, link_mode=LINK_MODE_HARDLINK)
+    cookiecutter_context, destination_path, repo_path = execute_cookiecutter(output_dir=output_dir, **kwargs)
+    if render_cache and cache_key:
+        render_cache.store(key=cache_key, cookiecutter_context=cookiecutter_context, destination_path=destination_path)
+    tree = VirtualTree.from_path(destination_path, spill_path=spill_path, max_memory=max_memory, move=True)
+    shutil.rmtree(output_dir)
+    return cookiecutter_context, tree, repo_path